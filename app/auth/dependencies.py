@@ -40,3 +40,14 @@ def get_current_active_user(
             detail="Inactive user"
         )
     return current_user
+
+def get_current_admin_user(
+    current_user: User = Depends(get_current_active_user)
+) -> User:
+    """Dependency to require an active admin user - returns ORM model."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
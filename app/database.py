@@ -5,6 +5,7 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.exc import SQLAlchemyError
 
 from .config import settings
+from .query_stats import install_query_listeners
 
 def get_engine(database_url: str = settings.DATABASE_URL):
     """
@@ -17,8 +18,9 @@ def get_engine(database_url: str = settings.DATABASE_URL):
         Engine: A new SQLAlchemy Engine instance.
     """
     try:
-        # Create an engine instance with echo=True to log SQL queries (useful for learning)
-        engine = create_engine(database_url, echo=True)
+        # Statement logging is opt-in (DB_ECHO); per-request counts, DB time and
+        # the slow-query log come from the listeners in app/query_stats.py
+        engine = create_engine(database_url, echo=settings.DB_ECHO)
         return engine
     except SQLAlchemyError as e:
         print(f"Error creating engine: {e}")
@@ -40,6 +42,9 @@ def get_sessionmaker(engine):
         bind=engine        # Bind the sessionmaker to the provided engine
     )
 
+# Time and attribute every SQL statement issued by any engine
+install_query_listeners()
+
 # Initialize engine and SessionLocal using the factory functions
 engine = get_engine()
 SessionLocal = get_sessionmaker(engine)
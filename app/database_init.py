@@ -1,14 +1,125 @@
+import argparse
+import sys
+from typing import Iterable, List, Optional
+
+from sqlalchemy import bindparam, inspect, select, text, update
+
 from app.database import engine, Base
 from app.models.user import User
 from app.models.pet import Pet
 from app.models.activity import Activity
 from app.models.medication import Medication
 
+# Columns added to tables that already existed, with the default existing rows get
+# (create_all only creates missing tables, it never alters one)
+ADDED_COLUMNS = [
+    ("users", "is_admin", "FALSE"),
+    ("users", "timezone", "'UTC'"),
+    ("users", "digest_enabled", "TRUE"),
+    ("users", "digest_sent_on", None),
+    ("reminders", "notified_at", None),
+    ("reminders", "lease_owner", None),
+    ("reminders", "lease_expires_at", None),
+    ("reminders", "updated_at", None),
+    ("medications", "schedule", None),
+    ("medications", "doses_until", None),
+]
+
 def init_db():
     Base.metadata.create_all(bind=engine)
 
 def drop_db():
     Base.metadata.drop_all(bind=engine)
 
+def add_missing_columns(bind) -> List[str]:
+    """
+    ALTER TABLE ... ADD COLUMN for every ADDED_COLUMNS entry the database lacks.
+
+    Checked against the live schema rather than IF NOT EXISTS, which SQLite
+    does not support, so running it again is a no-op.
+    """
+    existing = inspect(bind)
+    statements = []
+    for table_name, column_name, default in ADDED_COLUMNS:
+        if not existing.has_table(table_name):
+            continue
+        if column_name in {column["name"] for column in existing.get_columns(table_name)}:
+            continue
+        column = Base.metadata.tables[table_name].c[column_name]
+        statement = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(dialect=bind.dialect)}"
+        if default is not None:
+            statement += f" DEFAULT {default}"
+        if not column.nullable:
+            statement += " NOT NULL"
+        statements.append(statement)
+    with bind.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+    return statements
+
+def backfill_medication_schedules(bind) -> int:
+    """
+    Parse the frequency of medications saved before schedules existed.
+
+    ``updated_at`` is left as it was (the medication did not change); the dose
+    horizon runner materializes their doses on its next pass.
+    """
+    from app.services.medication_schedule import parse_frequency
+
+    with bind.begin() as connection:
+        rows = connection.execute(
+            select(Medication.id, Medication.frequency, Medication.start_date)
+            .where(Medication.schedule.is_(None), Medication.frequency.is_not(None))
+        ).all()
+        updates = []
+        for medication_id, frequency, start_date in rows:
+            recurrence = parse_frequency(frequency, start_date)
+            if recurrence is not None:
+                updates.append({"b_id": medication_id, "b_schedule": recurrence.to_dict()})
+        if updates:
+            connection.execute(
+                update(Medication.__table__)
+                .where(Medication.__table__.c.id == bindparam("b_id"))
+                .values(schedule=bindparam("b_schedule"), updated_at=Medication.__table__.c.updated_at),
+                updates,
+            )
+    return len(updates)
+
+def upgrade_db(bind=engine) -> List[str]:
+    """
+    Bring an existing database up to the current models: new tables and indexes,
+    added columns, backfilled schedules and (PostgreSQL) full-text search columns.
+    """
+    from app.services.search_service import install_search_vectors
+
+    Base.metadata.create_all(bind=bind)
+    changes = add_missing_columns(bind)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind, checkfirst=True)
+    if bind.dialect.name == "postgresql":
+        install_search_vectors(bind)
+    backfilled = backfill_medication_schedules(bind)
+    if backfilled:
+        changes.append(f"Backfilled schedule for {backfilled} medications")
+    return changes
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """
+    python -m app.database_init            create missing tables
+    python -m app.database_init upgrade    also add new columns to existing tables
+    """
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema")
+    parser.add_argument("command", nargs="?", choices=["init", "upgrade"], default="init")
+    args = parser.parse_args(argv)
+
+    if args.command == "init":
+        init_db()
+        return 0
+    for change in upgrade_db(engine):
+        print(change)
+    print("Database is up to date")
+    return 0
+
 if __name__ == "__main__":
-    init_db() # pragma: no cover
\ No newline at end of file
+    sys.exit(main()) # pragma: no cover
@@ -0,0 +1,13 @@
+# app/middleware/__init__.py
+
+from .compression import CompressionMiddleware
+from .db_timing import DBTimingMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+
+__all__ = [
+    "CompressionMiddleware",
+    "DBTimingMiddleware",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+]
@@ -0,0 +1,62 @@
+# app/middleware/db_timing.py
+
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.metrics import route_template
+from app.query_stats import QueryStats, current_query_stats
+from app.services.metrics_service import registry
+
+db_queries_per_request = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per request by route template.",
+    ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+db_time_seconds = registry.histogram(
+    "http_request_db_seconds", "Time spent in the database per request by route template.",
+    ("route",),
+)
+
+
+class DBTimingMiddleware:
+    """
+    Attribute SQL statements and DB time to the request that issued them.
+
+    Adds ``X-DB-Queries`` and a ``Server-Timing`` header (``db`` and total
+    ``app`` durations) to every HTTP response. Statements executed while a
+    streaming body is being sent are still recorded in the metrics, but
+    cannot be reflected in the already-sent headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(route=lambda: route_template(scope))
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - start) * 1000
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(stats.count)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            route = route_template(scope)
+            db_queries_per_request.observe(stats.count, route=route)
+            db_time_seconds.observe(stats.duration, route=route)
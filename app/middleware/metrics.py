@@ -0,0 +1,66 @@
+# app/middleware/metrics.py
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics_service import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+    http_response_size_bytes,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Label a request by its path template (``/pets/{id}``), never the raw path.
+
+    FastAPI stores the matched APIRoute in ``scope["route"]``; mounts such as
+    /static only leave their root_path behind. Anything else is collapsed into
+    a single label to keep metric cardinality bounded.
+    """
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    if "endpoint" in scope and scope.get("root_path"):
+        return f"{scope['root_path']}/{{path}}"
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Record per-route latency, status codes, response sizes and in-flight requests."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            http_requests_in_flight.dec(method=method)
+            route = route_template(scope)
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+            http_request_duration_seconds.observe(duration, method=method, route=route)
+            http_response_size_bytes.observe(response_size, method=method, route=route)
@@ -0,0 +1,112 @@
+# app/middleware/profiling.py
+
+import logging
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.database import get_db
+from app.models.user import User
+from app.services.profiler_service import RequestProfiler, profile_store
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+
+def is_admin_token(scope: Scope, authorization: str) -> bool:
+    """
+    Resolve a bearer token to an active admin user.
+
+    Uses the app's get_db (honouring dependency overrides) so the check
+    runs against the same database as the endpoints. The query is blocking;
+    call it through run_in_threadpool from async code.
+    """
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    user_id = User.verify_token(token)
+    if user_id is None:
+        return False
+
+    app = scope.get("app")
+    overrides = getattr(app, "dependency_overrides", {}) or {}
+    db_factory = overrides.get(get_db, get_db)
+    db_gen = db_factory()
+    db = next(db_gen)
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        return bool(user and user.is_active and user.is_admin)
+    finally:
+        db_gen.close()
+
+
+class ProfilingMiddleware:
+    """
+    Profile a single request when ``X-Profile: 1`` is sent by an admin.
+
+    Requires PROFILING_ENABLED. For any other caller the header is ignored
+    and the request is served normally. The pstats report is stored
+    in memory and its id returned in ``X-Profile-Id``; fetch it from
+    ``/admin/profiler/requests/{id}``.
+
+    cProfile records the event loop thread from the first to the last byte
+    of the response, so the report also contains whatever other requests'
+    coroutines ran while this one awaited, and it misses sync endpoints and
+    dependencies that Starlette runs in the threadpool. Profile on an
+    otherwise idle instance and read it as "where the loop spent its time".
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER) not in ("1", "true") or not await run_in_threadpool(
+            is_admin_token, scope, headers.get("authorization", "")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = RequestProfiler()
+        if not profiler.start():
+            async def send_busy(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message)["X-Profile-Status"] = "busy"
+                await send(message)
+
+            await self.app(scope, receive, send_busy)
+            return
+
+        start_message = None
+
+        async def send_deferred(message: Message) -> None:
+            # Hold the start message until the body is done so the profile
+            # id can be added as a header
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is not None and not message.get("more_body", False):
+                profiler.stop()
+                profile_id = profile_store.add(scope["method"], scope["path"], profiler.report())
+                MutableHeaders(scope=start_message)["X-Profile-Id"] = profile_id
+                logger.info(f"Profiled {scope['method']} {scope['path']}: {profile_id}")
+                await send(start_message)
+                start_message = None
+            elif start_message is not None:
+                # Streaming body: send headers now, without a profile id
+                await send(start_message)
+                start_message = None
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_deferred)
+        finally:
+            profiler.stop()
@@ -2,6 +2,13 @@ from .user import User
 from .pet import Pet
 from .activity import Activity
 from .medication import Medication
+from .medication_dose import MedicationDose
+from .dose_log import DoseLog
+from .medication_adherence_weekly import MedicationAdherenceWeekly
 from .reminder import Reminder
+from .pet_activity_daily import PetActivityDaily
+from .notification import Notification
+from .email_outbox import EmailOutbox
+from .rate_limit_bucket import RateLimitBucket
 
-__all__ = ["User", "Pet", "Activity", "Medication", "Reminder"]
\ No newline at end of file
+__all__ = ["User", "Pet", "Activity", "Medication", "MedicationDose", "DoseLog", "MedicationAdherenceWeekly", "Reminder", "PetActivityDaily", "Notification", "EmailOutbox", "RateLimitBucket"]
\ No newline at end of file
@@ -1,12 +1,17 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 
 from app.database import Base
+from app.models.search_vector import add_search_vector
 
 class Activity(Base):
     __tablename__ = "activities"
+    __table_args__ = (
+        # Activity lists filter by pet and sort newest first
+        Index("ix_activities_pet_id_activity_date", "pet_id", "activity_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     pet_id = Column(Integer, ForeignKey("pets.id", ondelete="CASCADE"), nullable=False)
@@ -22,3 +27,6 @@ class Activity(Base):
 
     # Reference to pets table
     pet = relationship("Pet", back_populates="activities")
+
+# Full-text search (GET /search): generated tsvector + GIN index on PostgreSQL
+add_search_vector(Activity.__table__, [("title", "A"), ("description", "B"), ("notes", "C")])
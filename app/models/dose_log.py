@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.database import Base
+
+class DoseLog(Base):
+    """
+    A medication dose checked off as given (or skipped).
+
+    ``scheduled_at`` ties the entry to one of the medication's scheduled doses;
+    it is None for doses outside the schedule (e.g. "as needed"), which do not
+    count towards adherence.
+    """
+    __tablename__ = "dose_log"
+    __table_args__ = (
+        # A scheduled dose is checked off at most once
+        UniqueConstraint("medication_id", "scheduled_at", name="uq_dose_log_medication_id_scheduled_at"),
+        Index("ix_dose_log_medication_id_given_at", "medication_id", "given_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    medication_id = Column(Integer, ForeignKey("medications.id", ondelete="CASCADE"), nullable=False)
+    pet_id = Column(Integer, ForeignKey("pets.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    scheduled_at = Column(DateTime, nullable=True)  # UTC; the scheduled dose this checks off
+    given_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # UTC
+    status = Column(String(20), nullable=False, default="given")  # given, skipped
+    notes = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Reference to medications table
+    medication = relationship("Medication", back_populates="dose_logs")
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from app.database import Base
+from datetime import datetime
+
+class EmailOutbox(Base):
+    """
+    Outgoing email, written in the same transaction as the change that
+    triggered it and delivered by the background EmailOutboxWorker.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # The worker polls for pending messages that are due
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String(120), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_content = Column(Text, nullable=False)
+    text_content = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, sent, failed, skipped
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    lease_owner = Column(String(64), nullable=True)  # worker currently sending it
+    lease_expires_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
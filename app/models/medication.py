@@ -1,17 +1,20 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Float, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Float, Boolean, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from app.database import Base
+from app.models.search_vector import add_search_vector
 
 class Medication(Base):
     __tablename__ = "medications"
 
     id = Column(Integer, primary_key=True, index=True)
-    pet_id = Column(Integer, ForeignKey("pets.id", ondelete="CASCADE"), nullable=False)
+    pet_id = Column(Integer, ForeignKey("pets.id", ondelete="CASCADE"), nullable=False, index=True)
     name = Column(String(200), nullable=False)  # Medication name
     dosage = Column(String(100), nullable=False)  # e.g., "10mg", "1 tablet"
     frequency = Column(String(100), nullable=False)  # e.g., "twice daily", "every 8 hours"
+    schedule = Column(JSON, nullable=True)  # frequency parsed at write time (Recurrence.to_dict), None if unrecognized
+    doses_until = Column(DateTime, nullable=True)  # medication_doses are materialized up to here
     route = Column(String(50), nullable=True)  # oral, topical, injection, etc.
     reason = Column(Text, nullable=True)  # Why the medication is prescribed
     prescribing_vet = Column(String(200), nullable=True)
@@ -24,3 +27,13 @@ class Medication(Base):
 
     # Reference to pets table
     pet = relationship("Pet", back_populates="medications")
+
+    # Materialized upcoming doses
+    doses = relationship("MedicationDose", back_populates="medication", cascade="all, delete-orphan")
+
+    # Doses checked off, and their weekly adherence rollup
+    dose_logs = relationship("DoseLog", back_populates="medication", cascade="all, delete-orphan")
+    adherence_weekly = relationship("MedicationAdherenceWeekly", back_populates="medication", cascade="all, delete-orphan")
+
+# Full-text search (GET /search): generated tsvector + GIN index on PostgreSQL
+add_search_vector(Medication.__table__, [("name", "A"), ("reason", "B"), ("notes", "C")])
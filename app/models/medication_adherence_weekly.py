@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+class MedicationAdherenceWeekly(Base):
+    """
+    Per medication, per week (Monday, in the owner's timezone) dose counts.
+
+    ``expected`` follows the materialized medication_doses rows and
+    ``given`` / ``skipped`` the dose_log entries for scheduled doses; both are
+    maintained incrementally by AdherenceService in the same transaction as
+    the write. `python -m app.services.adherence_service` rebuilds or checks it.
+    """
+    __tablename__ = "medication_adherence_weekly"
+
+    medication_id = Column(Integer, ForeignKey("medications.id", ondelete="CASCADE"), primary_key=True)
+    week_start = Column(Date, primary_key=True)
+    expected = Column(Integer, nullable=False, default=0)
+    given = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+
+    # Reference to medications table
+    medication = relationship("Medication", back_populates="adherence_weekly")
+
+    @property
+    def adherence(self):
+        """Share of scheduled doses given (0-1), or None with nothing scheduled."""
+        if not self.expected:
+            return None
+        return min(1.0, self.given / self.expected)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+class MedicationDose(Base):
+    """
+    One scheduled dose of a medication, materialized from its parsed schedule.
+
+    Rows cover a rolling horizon (DOSE_HORIZON_DAYS) ahead of now and are
+    rewritten when the medication changes; see MedicationScheduleService.
+    """
+    __tablename__ = "medication_doses"
+    __table_args__ = (
+        UniqueConstraint("medication_id", "scheduled_at", name="uq_medication_doses_medication_id_scheduled_at"),
+        # "Doses due in the next N hours" for a user is one range scan
+        Index("ix_medication_doses_user_id_scheduled_at", "user_id", "scheduled_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    medication_id = Column(Integer, ForeignKey("medications.id", ondelete="CASCADE"), nullable=False)
+    pet_id = Column(Integer, ForeignKey("pets.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    scheduled_at = Column(DateTime, nullable=False)  # UTC
+
+    # Reference to medications table
+    medication = relationship("Medication", back_populates="doses")
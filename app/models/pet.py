@@ -4,6 +4,7 @@ from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 
 from app.database import Base
+from app.models.search_vector import add_search_vector
 
 class Pet(Base):
     __tablename__ = "pets"
@@ -25,14 +26,20 @@ class Pet(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Reference to a users table
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     user = relationship("User", back_populates="pets")
     
     # Activities relationship
     activities = relationship("Activity", back_populates="pet", cascade="all, delete-orphan")
     
+    # Daily activity rollup (rows go away with the pet)
+    activity_daily = relationship("PetActivityDaily", back_populates="pet", cascade="all, delete-orphan")
+    
     # Medications relationship
     medications = relationship("Medication", back_populates="pet", cascade="all, delete-orphan")
     
     # Reminders relationship
     reminders = relationship("Reminder", back_populates="pet", cascade="all, delete-orphan")
+
+# Full-text search (GET /search): generated tsvector + GIN index on PostgreSQL
+add_search_vector(Pet.__table__, [("medical_notes", "B")])
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, Float
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+class PetActivityDaily(Base):
+    """
+    Per pet, per day, per activity type totals of the activities table.
+
+    Maintained incrementally by ActivityRollupService in the same transaction
+    as the activity write; `python -m app.services.rollup_service` rebuilds or
+    checks it.
+    """
+    __tablename__ = "pet_activity_daily"
+
+    pet_id = Column(Integer, ForeignKey("pets.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    activity_type = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    total_duration = Column(Integer, nullable=False, default=0)  # minutes
+    total_distance = Column(Float, nullable=False, default=0.0)  # miles
+
+    # Reference to pets table
+    pet = relationship("Pet", back_populates="activity_daily")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Float, String
+from app.database import Base
+
+class RateLimitBucket(Base):
+    """
+    Token bucket shared by all app processes (RATE_LIMIT_BACKEND=database).
+
+    ``tokens`` is the balance as of ``updated_at`` (Unix seconds); refill is
+    computed on the next request rather than written by a background job.
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(255), primary_key=True)  # group:scope:subject
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)
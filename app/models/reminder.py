@@ -1,20 +1,30 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
 from datetime import datetime
 
 class Reminder(Base):
     __tablename__ = "reminders"
+    __table_args__ = (
+        Index("ix_reminders_user_id_reminder_date", "user_id", "reminder_date"),
+        # The scheduler scans for pending reminders by due time
+        Index("ix_reminders_reminder_date_notified_at", "reminder_date", "notified_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     pet_id = Column(Integer, ForeignKey("pets.id", ondelete="CASCADE"), nullable=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
     reminder_type = Column(String, nullable=False)  # medication, appointment, vaccination, grooming, other
     reminder_date = Column(DateTime, nullable=False)
     is_completed = Column(Boolean, default=False)
+    notified_at = Column(DateTime, nullable=True)  # set once the scheduler has fired it
+    lease_owner = Column(String(64), nullable=True)  # scheduler worker currently dispatching it
+    lease_expires_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="reminders")
@@ -0,0 +1,39 @@
+from typing import Dict, Sequence, Tuple
+
+from sqlalchemy import DDL, Table, event
+
+# Text search configuration used for both the stored vectors and the queries
+SEARCH_CONFIG = "english"
+
+# Table name -> tsvector expression, for SearchService (and install_search_vectors on old databases)
+SEARCH_VECTORS: Dict[str, str] = {}
+
+
+def search_vector_expression(weighted_columns: Sequence[Tuple[str, str]]) -> str:
+    """setweight(to_tsvector(...), 'A') || ... over (column, weight) pairs."""
+    return " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted_columns
+    )
+
+
+def search_vector_ddl(table_name: str) -> Tuple[str, str]:
+    """Idempotent ADD COLUMN / CREATE INDEX statements for one table."""
+    return (
+        f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTORS[table_name]}) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_vector ON {table_name} USING GIN (search_vector)",
+    )
+
+
+def add_search_vector(table: Table, weighted_columns: Sequence[Tuple[str, str]]) -> None:
+    """
+    Give a table a generated ``search_vector`` tsvector column with a GIN index.
+
+    PostgreSQL only, and not mapped on the model: the database keeps it in
+    step with the text columns on every write, and other dialects never see
+    it (SearchService falls back to an in-memory index there).
+    """
+    SEARCH_VECTORS[table.name] = search_vector_expression(weighted_columns)
+    for statement in search_vector_ddl(table.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 import uuid
 from typing import Optional, Dict, Any
 
-from sqlalchemy import Column, String, DateTime, Boolean
+from sqlalchemy import Column, String, DateTime, Date, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.exc import IntegrityError
@@ -22,9 +22,17 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = "your-secret-key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Event stream tickets go in a URL (EventSource cannot send headers), so
+# they only live long enough to open the stream and cannot call the API
+EVENTS_TICKET_SECONDS = 60
+EVENTS_SCOPE = "events"
 
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        # The daily digest walks one timezone at a time, skipping users already sent today
+        Index("ix_users_timezone_digest_sent_on", "timezone", "digest_sent_on"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     first_name = Column(String(50), nullable=False)
@@ -34,9 +42,13 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     is_verified = Column(Boolean, default=False, nullable=False)
+    is_admin = Column(Boolean, default=False, nullable=False)
     verification_token = Column(String(255), nullable=True)
     verification_token_expires = Column(DateTime, nullable=True)
     last_login = Column(DateTime, nullable=True)
+    timezone = Column(String(64), default="UTC", nullable=False)  # IANA name, e.g. "America/New_York"
+    digest_enabled = Column(Boolean, default=True, nullable=False)  # daily digest email
+    digest_sent_on = Column(Date, nullable=True)  # local date of the last digest
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -45,6 +57,9 @@ class User(Base):
     
     # Relationship to reminders
     reminders = relationship("Reminder", back_populates="user", cascade="all, delete-orphan")
+    
+    # Relationship to notifications
+    notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<User(name={self.first_name} {self.last_name}, email={self.email})>"
@@ -67,15 +82,34 @@ class User(Base):
         return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
     @staticmethod
-    def verify_token(token: str) -> Optional[UUID]:
-        """Verify and decode a JWT token."""
+    def _token_subject(token: str, scope: Optional[str]) -> Optional[UUID]:
+        """User id from a JWT issued for ``scope`` (None for access tokens)."""
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            if payload.get("scope") != scope:
+                return None
             user_id = payload.get("sub")
             return uuid.UUID(user_id) if user_id else None
         except (JWTError, ValueError):
             return None
 
+    @staticmethod
+    def verify_token(token: str) -> Optional[UUID]:
+        """Verify and decode a JWT access token."""
+        return User._token_subject(token, None)
+
+    @staticmethod
+    def create_events_ticket(user_id) -> str:
+        """Short-lived JWT that only opens the /events stream."""
+        return User.create_access_token(
+            {"sub": str(user_id), "scope": EVENTS_SCOPE}, timedelta(seconds=EVENTS_TICKET_SECONDS)
+        )
+
+    @staticmethod
+    def verify_events_ticket(ticket: str) -> Optional[UUID]:
+        """User id from an events ticket; access tokens are not accepted."""
+        return User._token_subject(ticket, EVENTS_SCOPE)
+
     @staticmethod
     def create_verification_token() -> str:
         """Create a unique verification token."""
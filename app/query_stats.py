@@ -0,0 +1,94 @@
+# app/query_stats.py
+
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.slow_query")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)"
+_PLACEHOLDER_LIST = re.compile(r"\(\s*" + _PLACEHOLDER + r"(?:\s*,\s*" + _PLACEHOLDER + r")+\s*\)")
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class QueryStats:
+    """SQL statements and DB time accumulated for a single request."""
+    count: int = 0
+    duration: float = 0.0  # seconds
+    route: Optional[Callable[[], str]] = field(default=None, repr=False)
+
+    def route_label(self) -> str:
+        return self.route() if self.route else "<none>"
+
+
+# Set by DBTimingMiddleware; the QueryStats object is mutated in place so
+# queries issued from threadpool workers (copied contexts) still count.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a statement to its shape so slow-query logs group cleanly.
+
+    Literals become ``?`` and bind lists of any length collapse to ``(?...)``.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _POSTCOMPILE.sub("(?...)", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # The execution context lives exactly as long as the statement, so a
+    # failed statement cannot leave a stale start time behind
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = getattr(context, "_query_start_time", None)
+    if start_time is None:
+        return
+    elapsed = time.perf_counter() - start_time
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= settings.SLOW_QUERY_MS:
+        slow_query_logger.warning(json.dumps({
+            "event": "slow_query",
+            "route": stats.route_label() if stats else "<none>",
+            "duration_ms": round(elapsed_ms, 2),
+            "sql": normalize_sql(statement),
+            "executemany": bool(executemany),
+        }))
+
+
+def install_query_listeners() -> None:
+    """
+    Attach timing hooks to every Engine (idempotent).
+
+    Registered on the Engine class so engines created elsewhere (tests,
+    scripts) are covered as well.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 class ActivityCreate(BaseModel):
     pet_id: int
@@ -44,3 +44,25 @@ class ActivityUpdate(BaseModel):
 
     class Config:
         from_attributes = True
+
+class ActivityBulkCreate(BaseModel):
+    activities: List[ActivityCreate] = Field(..., min_length=1, max_length=500)
+
+class ActivityBulkError(BaseModel):
+    index: int  # position in the submitted list
+    detail: str
+
+class ActivityBulkResult(BaseModel):
+    created: List[ActivityRead]
+    failed: List[ActivityBulkError] = []  # items that were not stored
+    enrichment_failed: List[ActivityBulkError] = []  # stored with default type/title
+
+class ActivityDailyRead(BaseModel):
+    day: date
+    activity_type: str
+    count: int
+    total_duration: int  # minutes
+    total_distance: float  # miles
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
+
+class HealthScoreRead(BaseModel):
+    pet_id: int
+    as_of: datetime
+    score: int  # 0-100 composite
+    components: Dict[str, float]  # activity, consistency, trend, adherence (each 0-1)
+    activity_count: int
+    minutes_7d: float
+    minutes_30d: float
+    avg_daily_minutes_30d: float
+    rolling_minutes_7d: List[float]  # 7-day rolling minutes for each of the last 30 days, oldest first
+    distance_30d: float
+    weekly_distance: List[float]  # miles per week, oldest first
+    distance_trend: float  # change in weekly miles per week
+    medication_adherence: Optional[float]
+    active_days_30d: int
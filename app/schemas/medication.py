@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+from datetime import date, datetime
 from typing import Optional
 
+from app.services.rollup_service import naive_utc
+
 class MedicationCreate(BaseModel):
     pet_id: int
     name: str = Field(..., min_length=1, max_length=200)
@@ -31,6 +33,7 @@ class MedicationRead(BaseModel):
     end_date: Optional[datetime]
     is_active: bool
     notes: Optional[str]
+    schedule: Optional[dict] = None  # parsed frequency; None if it was not understood
     created_at: datetime
     updated_at: datetime
 
@@ -51,3 +54,54 @@ class MedicationUpdate(BaseModel):
 
     class Config:
         from_attributes = True
+
+class MedicationDoseRead(BaseModel):
+    id: int
+    medication_id: int
+    pet_id: int
+    pet_name: str
+    name: str
+    dosage: str
+    route: Optional[str]
+    scheduled_at: datetime
+    status: Optional[str] = None  # given / skipped once checked off
+
+    class Config:
+        from_attributes = True
+
+class DoseLogCreate(BaseModel):
+    # Omit to check off the nearest scheduled dose that is still open
+    scheduled_at: Optional[datetime] = None
+    given_at: datetime = Field(default_factory=datetime.utcnow)
+    status: str = Field("given", pattern="^(given|skipped)$")
+    notes: Optional[str] = None
+
+    @field_validator("scheduled_at", "given_at")
+    @classmethod
+    def to_naive_utc(cls, v):
+        # Dose times are stored and matched as naive UTC
+        return naive_utc(v)
+
+class DoseLogRead(BaseModel):
+    id: int
+    medication_id: int
+    pet_id: int
+    scheduled_at: Optional[datetime]
+    given_at: datetime
+    status: str
+    notes: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class MedicationAdherenceRead(BaseModel):
+    medication_id: int
+    pet_id: int
+    pet_name: str
+    name: str
+    week_start: date
+    expected: int
+    given: int
+    skipped: int
+    adherence: Optional[float]  # given / expected (0-1); None when nothing was scheduled
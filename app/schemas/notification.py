@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class NotificationRead(BaseModel):
+    id: int
+    kind: str
+    reminder_id: Optional[int]
+    title: str
+    body: Optional[str]
+    created_at: datetime
+    read_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
+from uuid import UUID
 
 class ReminderCreate(BaseModel):
     pet_id: Optional[int] = None
@@ -12,7 +13,7 @@ class ReminderCreate(BaseModel):
 
 class ReminderRead(BaseModel):
     id: int
-    user_id: int
+    user_id: UUID
     pet_id: Optional[int]
     title: str
     description: Optional[str]
@@ -20,6 +21,7 @@ class ReminderRead(BaseModel):
     reminder_date: datetime
     is_completed: bool
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class SearchResult(BaseModel):
+    type: str  # activity, medication, pet
+    id: int
+    pet_id: int
+    pet_name: str
+    title: str
+    highlight: str  # HTML-escaped excerpt, matches wrapped in <mark>
+    rank: float
+    date: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
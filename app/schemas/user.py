@@ -1,7 +1,8 @@
 from typing import Optional
 from uuid import UUID
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, ConfigDict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from pydantic import BaseModel, EmailStr, ConfigDict, Field, field_validator
 
 class UserResponse(BaseModel):
     """Schema for user response data"""
@@ -11,12 +12,31 @@ class UserResponse(BaseModel):
     first_name: str
     last_name: str
     is_active: bool
+    timezone: str = "UTC"
+    digest_enabled: bool = True
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)  # Enable mapping from ORM objects
 
 
+class UserPreferencesUpdate(BaseModel):
+    """Schema for notification preferences (omitted fields are left unchanged)"""
+    timezone: Optional[str] = Field(None, max_length=64, examples=["America/New_York"])
+    digest_enabled: Optional[bool] = None
+
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, v):
+        if v is None:
+            return v
+        try:
+            ZoneInfo(v)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone: {v}")
+        return v
+
+
 class Token(BaseModel):
     """Schema for authentication token response"""
     access_token: str
@@ -48,6 +68,12 @@ class TokenData(BaseModel):
     user_id: Optional[UUID] = None
 
 
+class EventsTicket(BaseModel):
+    """Schema for a short-lived /events stream ticket"""
+    ticket: str
+    expires_in: int  # seconds
+
+
 class UserLogin(BaseModel):
     """Schema for user login"""
     username: str
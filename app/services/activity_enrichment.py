@@ -0,0 +1,135 @@
+# app/services/activity_enrichment.py
+
+import asyncio
+import json
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Descriptions per LLM prompt; the AI rate limit charges a bulk import per batch
+ENRICH_BATCH_SIZE = 25
+
+ACTIVITY_TYPES = {"walk", "feeding", "medication", "vet_visit", "grooming", "play", "training", "other"}
+
+BATCH_SYSTEM_PROMPT = """You are an expert pet activity analyzer. You will receive a JSON array of pet activities, each with an index "i", the pet and a free-text description. For EVERY item return an object with:
+- i: the same index
+- activity_type: one of (walk, feeding, medication, vet_visit, grooming, play, training, other)
+- title: a brief title (max 50 chars)
+- duration: estimated duration in minutes (if mentioned or can be inferred, null otherwise)
+- distance: distance in miles (for walks, if mentioned, null otherwise)
+- notes: any additional relevant notes or details
+
+Return ONLY valid JSON of the form {"results": [...]}, no markdown or explanation."""
+
+
+class ActivityEnrichmentService:
+    """Service for AI categorization of many activity descriptions at once."""
+
+    @staticmethod
+    def build_batch_messages(items: Sequence[Tuple[int, str, str]]) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for one batch.
+
+        Args:
+            items: (index, pet label, description) tuples
+
+        Returns:
+            list: Chat completion messages
+        """
+        payload = [{"i": index, "pet": pet, "description": description} for index, pet, description in items]
+        return [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": json.dumps(payload)},
+        ]
+
+    @staticmethod
+    def parse_batch_response(content: str, indexes: Sequence[int]) -> Dict[int, dict]:
+        """
+        Map a batch response back to item indexes.
+
+        Items the model skipped or returned malformed are left out, so the
+        caller can report them individually.
+
+        Raises:
+            ValueError: If the response is not the expected JSON object.
+        """
+        data = json.loads(content)
+        results = data.get("results") if isinstance(data, dict) else data
+        if not isinstance(results, list):
+            raise ValueError("Batch response has no results list")
+
+        wanted = set(indexes)
+        parsed = {}
+        for result in results:
+            if not isinstance(result, dict) or result.get("i") not in wanted:
+                continue
+            activity_type = result.get("activity_type")
+            parsed[result["i"]] = {
+                "activity_type": activity_type if activity_type in ACTIVITY_TYPES else "other",
+                "title": str(result.get("title") or "")[:50] or None,
+                "duration": result.get("duration") if isinstance(result.get("duration"), int) else None,
+                "distance": result.get("distance") if isinstance(result.get("distance"), (int, float)) else None,
+                "notes": result.get("notes"),
+            }
+        return parsed
+
+    @staticmethod
+    def batch_count(item_count: int, batch_size: int = ENRICH_BATCH_SIZE) -> int:
+        """LLM requests ``enrich`` makes for ``item_count`` descriptions."""
+        return -(-item_count // batch_size)
+
+    @staticmethod
+    async def enrich(
+        client,
+        model: str,
+        items: Sequence[Tuple[int, str, str]],
+        batch_size: int = ENRICH_BATCH_SIZE,
+        concurrency: int = 4
+    ) -> Tuple[Dict[int, dict], Dict[int, str]]:
+        """
+        Categorize descriptions with one LLM request per batch.
+
+        Batches run concurrently in the threadpool (the OpenAI client is
+        synchronous). A failed batch fails only its own items.
+
+        Args:
+            client: OpenAI client
+            model: Model name
+            items: (index, pet label, description) tuples
+            batch_size: Descriptions per prompt
+            concurrency: Batches in flight at once
+
+        Returns:
+            tuple: ({index: extracted fields}, {index: error message})
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        batches = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+
+        async def run_batch(batch) -> Tuple[Dict[int, dict], Dict[int, str]]:
+            indexes = [index for index, _, _ in batch]
+            async with semaphore:
+                try:
+                    response = await run_in_threadpool(
+                        client.chat.completions.create,
+                        model=model,
+                        messages=ActivityEnrichmentService.build_batch_messages(batch),
+                        temperature=0.3
+                    )
+                    parsed = ActivityEnrichmentService.parse_batch_response(
+                        response.choices[0].message.content, indexes
+                    )
+                except Exception as e:
+                    logger.error(f"AI batch parsing error ({len(batch)} items): {str(e)}")
+                    return {}, {index: "AI enrichment failed" for index in indexes}
+            missing = {index: "AI returned no result for this item" for index in indexes if index not in parsed}
+            return parsed, missing
+
+        enriched: Dict[int, dict] = {}
+        errors: Dict[int, str] = {}
+        for parsed, failed in await asyncio.gather(*(run_batch(batch) for batch in batches)):
+            enriched.update(parsed)
+            errors.update(failed)
+        return enriched, errors
@@ -0,0 +1,353 @@
+# app/services/adherence_service.py
+
+import argparse
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models.dose_log import DoseLog
+from app.models.medication import Medication
+from app.models.medication_adherence_weekly import MedicationAdherenceWeekly
+from app.models.medication_dose import MedicationDose
+from app.models.pet import Pet
+from app.models.user import User
+from app.services.digest_service import _zone
+from app.services.rollup_service import _dialect_name
+
+# (medication_id, week_start) -> [expected, given, skipped]
+AdherenceKey = Tuple[int, date]
+AdherenceDeltas = Dict[AdherenceKey, List[int]]
+
+# A check-off without a scheduled time is matched to the nearest open dose this close
+MATCH_WINDOW = timedelta(hours=6)
+
+
+def week_start(value: datetime, tz_name: str) -> date:
+    """Monday of the local week containing ``value`` (naive UTC)."""
+    local_day = value.replace(tzinfo=timezone.utc).astimezone(_zone(tz_name)).date()
+    return local_day - timedelta(days=local_day.weekday())
+
+
+@dataclass
+class WeeklyAdherence:
+    medication_id: int
+    name: str
+    pet_id: int
+    pet_name: str
+    week_start: date
+    expected: int
+    given: int
+    skipped: int
+
+    @property
+    def adherence(self) -> Optional[float]:
+        """Share of due doses given (0-1), or None with nothing due."""
+        if self.expected <= 0:
+            return None
+        return min(1.0, self.given / self.expected)
+
+
+def _deltas() -> AdherenceDeltas:
+    return defaultdict(lambda: [0, 0, 0])
+
+
+class AdherenceService:
+    """
+    Service for dose check-offs and the medication_adherence_weekly rollup.
+
+    Like pet_activity_daily, the rollup is never recomputed on read: every
+    write that changes scheduled doses or dose_log applies its +/- counts
+    with one upsert in the same transaction.
+    """
+
+    @staticmethod
+    def apply(db, deltas: AdherenceDeltas) -> None:
+        """
+        Add (or, with negative values, subtract) counts in one upsert.
+
+        Rows left with nothing expected, given or skipped are deleted.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+
+        insert_fn = postgresql_insert if _dialect_name(db) == "postgresql" else sqlite_insert
+        stmt = insert_fn(MedicationAdherenceWeekly).values([
+            {"medication_id": medication_id, "week_start": week, "expected": expected, "given": given,
+             "skipped": skipped}
+            for (medication_id, week), (expected, given, skipped) in deltas.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MedicationAdherenceWeekly.medication_id, MedicationAdherenceWeekly.week_start],
+            set_={
+                "expected": MedicationAdherenceWeekly.expected + stmt.excluded.expected,
+                "given": MedicationAdherenceWeekly.given + stmt.excluded.given,
+                "skipped": MedicationAdherenceWeekly.skipped + stmt.excluded.skipped,
+            }
+        )
+        db.execute(stmt)
+
+        if any(value < 0 for delta in deltas.values() for value in delta):
+            db.execute(
+                delete(MedicationAdherenceWeekly).where(
+                    MedicationAdherenceWeekly.medication_id.in_({key[0] for key in deltas}),
+                    MedicationAdherenceWeekly.expected <= 0,
+                    MedicationAdherenceWeekly.given <= 0,
+                    MedicationAdherenceWeekly.skipped <= 0,
+                )
+            )
+
+    @staticmethod
+    def doses_changed(
+        db,
+        added: Iterable[Tuple[int, datetime, str]] = (),
+        removed: Iterable[Tuple[int, datetime, str]] = ()
+    ) -> None:
+        """Count materialized doses in or out of ``expected``; (medication_id, scheduled_at, timezone) each."""
+        deltas = _deltas()
+        for sign, doses in ((1, added), (-1, removed)):
+            for medication_id, scheduled_at, tz_name in doses:
+                deltas[(medication_id, week_start(scheduled_at, tz_name))][0] += sign
+        AdherenceService.apply(db, deltas)
+
+    @staticmethod
+    def contribution(log: DoseLog, tz_name: str) -> AdherenceDeltas:
+        """What one dose_log entry adds (nothing for doses outside the schedule)."""
+        deltas = _deltas()
+        if log.scheduled_at is not None:
+            deltas[(log.medication_id, week_start(log.scheduled_at, tz_name))][
+                1 if log.status == "given" else 2
+            ] += 1
+        return deltas
+
+    @staticmethod
+    def log_dose(
+        db,
+        medication: Medication,
+        user,
+        given_at: datetime,
+        status: str = "given",
+        scheduled_at: Optional[datetime] = None,
+        notes: Optional[str] = None
+    ) -> DoseLog:
+        """
+        Check off a dose, in the caller's transaction.
+
+        With ``scheduled_at`` the entry is for that scheduled dose; without it
+        the nearest dose within MATCH_WINDOW of ``given_at`` that is not yet
+        checked off is used, and failing that the entry is unscheduled.
+
+        Raises:
+            ValueError: No such scheduled dose, or it was already checked off
+        """
+        checked_off = select(DoseLog.scheduled_at).where(
+            DoseLog.medication_id == medication.id, DoseLog.scheduled_at.is_not(None)
+        )
+        if scheduled_at is not None:
+            exists = db.scalar(select(MedicationDose.id).where(
+                MedicationDose.medication_id == medication.id, MedicationDose.scheduled_at == scheduled_at
+            ))
+            if exists is None:
+                raise ValueError("No dose of this medication is scheduled at that time")
+            if db.scalar(checked_off.where(DoseLog.scheduled_at == scheduled_at)) is not None:
+                raise ValueError("This dose has already been logged")
+        else:
+            candidates = db.scalars(select(MedicationDose.scheduled_at).where(
+                MedicationDose.medication_id == medication.id,
+                MedicationDose.scheduled_at >= given_at - MATCH_WINDOW,
+                MedicationDose.scheduled_at <= given_at + MATCH_WINDOW,
+                MedicationDose.scheduled_at.not_in(checked_off),
+            )).all()
+            if candidates:
+                scheduled_at = min(candidates, key=lambda when: abs(when - given_at))
+
+        log = DoseLog(
+            medication_id=medication.id,
+            pet_id=medication.pet_id,
+            user_id=user.id,
+            scheduled_at=scheduled_at,
+            given_at=given_at,
+            status=status,
+            notes=notes,
+        )
+        db.add(log)
+        db.flush()
+        AdherenceService.apply(db, AdherenceService.contribution(log, user.timezone or "UTC"))
+        return log
+
+    @staticmethod
+    def remove_log(db, log: DoseLog, user) -> None:
+        """Undo a check-off."""
+        deltas = AdherenceService.contribution(log, user.timezone or "UTC")
+        db.delete(log)
+        AdherenceService.apply(db, {key: [-value for value in delta] for key, delta in deltas.items()})
+
+    @staticmethod
+    def aggregate(db, medication_ids: Optional[Iterable[int]] = None) -> Dict[AdherenceKey, Tuple[int, int, int]]:
+        """Weekly counts recomputed from medication_doses and dose_log."""
+        medication_ids = list(medication_ids) if medication_ids is not None else None
+        counts = _deltas()
+        doses = select(MedicationDose.medication_id, MedicationDose.scheduled_at, User.timezone) \
+            .join(User, MedicationDose.user_id == User.id)
+        logs = select(DoseLog.medication_id, DoseLog.scheduled_at, User.timezone, DoseLog.status) \
+            .join(User, DoseLog.user_id == User.id).where(DoseLog.scheduled_at.is_not(None))
+        if medication_ids is not None:
+            doses = doses.where(MedicationDose.medication_id.in_(medication_ids))
+            logs = logs.where(DoseLog.medication_id.in_(medication_ids))
+        for medication_id, scheduled_at, tz_name in db.execute(doses):
+            counts[(medication_id, week_start(scheduled_at, tz_name or "UTC"))][0] += 1
+        for medication_id, scheduled_at, tz_name, status in db.execute(logs):
+            counts[(medication_id, week_start(scheduled_at, tz_name or "UTC"))][1 if status == "given" else 2] += 1
+        return {key: tuple(value) for key, value in counts.items()}
+
+    @staticmethod
+    def rebuild(db, medication_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recompute the rollup (backfill / repair); the caller commits.
+
+        Returns:
+            int: Rollup rows written
+        """
+        medication_ids = list(medication_ids) if medication_ids is not None else None
+        clear = delete(MedicationAdherenceWeekly)
+        if medication_ids is not None:
+            clear = clear.where(MedicationAdherenceWeekly.medication_id.in_(medication_ids))
+        db.execute(clear)
+        rows = [
+            {"medication_id": medication_id, "week_start": week, "expected": expected, "given": given,
+             "skipped": skipped}
+            for (medication_id, week), (expected, given, skipped) in AdherenceService.aggregate(db, medication_ids).items()
+        ]
+        if rows:
+            db.execute(insert(MedicationAdherenceWeekly), rows)
+        return len(rows)
+
+    @staticmethod
+    def check(db, medication_ids: Optional[Iterable[int]] = None) -> List[dict]:
+        """
+        Compare the rollup with a fresh aggregate.
+
+        Returns:
+            list: One entry per mismatching (medication_id, week_start) with the
+            expected and stored (expected, given, skipped); missing rows are None
+        """
+        medication_ids = list(medication_ids) if medication_ids is not None else None
+        expected = AdherenceService.aggregate(db, medication_ids)
+        stored_query = select(
+            MedicationAdherenceWeekly.medication_id, MedicationAdherenceWeekly.week_start,
+            MedicationAdherenceWeekly.expected, MedicationAdherenceWeekly.given, MedicationAdherenceWeekly.skipped,
+        )
+        if medication_ids is not None:
+            stored_query = stored_query.where(MedicationAdherenceWeekly.medication_id.in_(medication_ids))
+        stored = {(row[0], row[1]): tuple(row[2:]) for row in db.execute(stored_query)}
+
+        mismatches = []
+        for key in sorted(expected.keys() | stored.keys()):
+            want, have = expected.get(key), stored.get(key)
+            if want != have:
+                mismatches.append({"medication_id": key[0], "week_start": key[1], "expected": want, "stored": have})
+        return mismatches
+
+    @staticmethod
+    def weekly(
+        db,
+        user_id,
+        since: date,
+        pet_id: Optional[int] = None,
+        now: Optional[datetime] = None,
+        tz_name: str = "UTC"
+    ) -> List[WeeklyAdherence]:
+        """
+        Weekly adherence for a user's medications from ``since`` to the current week.
+
+        The rollup's ``expected`` counts every materialized dose, including
+        the ones still ahead; for the current week, doses that are not due yet
+        and not already checked off are left out so they do not count as missed.
+        """
+        now = now or datetime.utcnow()
+        current_week = week_start(now, tz_name)
+        stmt = (
+            select(MedicationAdherenceWeekly, Medication.name, Medication.pet_id, Pet.name)
+            .join(Medication, MedicationAdherenceWeekly.medication_id == Medication.id)
+            .join(Pet, Medication.pet_id == Pet.id)
+            .where(Pet.user_id == user_id, MedicationAdherenceWeekly.week_start >= since,
+                   MedicationAdherenceWeekly.week_start <= current_week)
+            .order_by(MedicationAdherenceWeekly.week_start.desc(), Medication.name)
+        )
+        if pet_id is not None:
+            stmt = stmt.where(Medication.pet_id == pet_id)
+        rows = db.execute(stmt).all()
+
+        not_due = defaultdict(int)
+        current_ids = {row.medication_id for row, *_ in rows if row.week_start == current_week}
+        if current_ids:
+            pending = db.execute(
+                select(MedicationDose.medication_id, MedicationDose.scheduled_at)
+                .outerjoin(DoseLog, (DoseLog.medication_id == MedicationDose.medication_id)
+                           & (DoseLog.scheduled_at == MedicationDose.scheduled_at))
+                .where(MedicationDose.medication_id.in_(current_ids), MedicationDose.scheduled_at > now,
+                       MedicationDose.scheduled_at < now + timedelta(days=7), DoseLog.id.is_(None))
+            )
+            for medication_id, scheduled_at in pending:
+                if week_start(scheduled_at, tz_name) == current_week:
+                    not_due[medication_id] += 1
+
+        return [
+            WeeklyAdherence(
+                medication_id=row.medication_id, name=name, pet_id=pet_id_, pet_name=pet_name,
+                week_start=row.week_start,
+                expected=row.expected - (not_due[row.medication_id] if row.week_start == current_week else 0),
+                given=row.given, skipped=row.skipped,
+            )
+            for row, name, pet_id_, pet_name in rows
+        ]
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """
+    python -m app.services.adherence_service rebuild [--medication-id N ...]
+    python -m app.services.adherence_service check [--medication-id N ...] [--repair]
+    """
+    parser = argparse.ArgumentParser(description="Maintain the medication_adherence_weekly rollup")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--medication-id", type=int, action="append", help="Limit to a medication (repeatable)")
+    parser.add_argument("--repair", action="store_true", help="check: rebuild the medications that mismatch")
+    args = parser.parse_args(argv)
+
+    from app.database import Base, SessionLocal, engine
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rows = AdherenceService.rebuild(db, args.medication_id)
+            db.commit()
+            print(f"Rebuilt medication_adherence_weekly: {rows} rows")
+            return 0
+
+        mismatches = AdherenceService.check(db, args.medication_id)
+        for mismatch in mismatches[:50]:
+            print(f"medication {mismatch['medication_id']} week of {mismatch['week_start']}: "
+                  f"expected {mismatch['expected']}, stored {mismatch['stored']}")
+        if not mismatches:
+            print("medication_adherence_weekly is consistent")
+            return 0
+        print(f"{len(mismatches)} mismatching rows", file=sys.stderr)
+        if args.repair:
+            AdherenceService.rebuild(db, {mismatch["medication_id"] for mismatch in mismatches})
+            db.commit()
+            print("Repaired")
+            return 0
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # pragma: no cover
@@ -0,0 +1,246 @@
+# app/services/asset_service.py
+
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.middleware.compression import HAS_BROTLI, compress_bytes, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+PRECOMPRESS_EXTENSIONS = (".js", ".css", ".html", ".svg", ".json", ".txt", ".map")
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+FINGERPRINT_LENGTH = 12
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# js/dashboard.3f2a1b9c0d4e.js -> ("js/dashboard", "3f2a1b9c0d4e", ".js")
+FINGERPRINTED_PATH = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<ext>\.[^./]+)$" % FINGERPRINT_LENGTH)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves ``.br``/``.gz`` siblings built ahead of time.
+
+    Variants are produced once by :meth:`precompress` (at build or startup)
+    with maximum compression settings, so requests never pay for
+    compression - they only pick the right file.
+
+    Files under ``fingerprint_dirs`` are also reachable through
+    content-hashed URLs (see :meth:`build_manifest` / :meth:`asset_url`),
+    which are served with a one-year immutable Cache-Control.
+    """
+
+    def __init__(
+        self,
+        *args,
+        min_size: int = 1024,
+        fingerprint_dirs: Sequence[str] = ("js", "styles"),
+        auto_reload: bool = False,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.min_size = min_size
+        self.fingerprint_dirs = tuple(fingerprint_dirs)
+        self.auto_reload = auto_reload
+        # original full path -> {encoding: (variant path, stat_result)}
+        self._variants: Dict[str, Dict[str, Tuple[str, os.stat_result]]] = {}
+        # logical path -> fingerprinted path, and the reverse
+        self.manifest: Dict[str, str] = {}
+        self._reverse_manifest: Dict[str, str] = {}
+        self._manifest_mtimes: Dict[str, float] = {}
+
+    def _fingerprint(self, logical_path: str) -> Optional[str]:
+        full_path = os.path.join(self.directory, logical_path)
+        try:
+            with open(full_path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:FINGERPRINT_LENGTH]
+            mtime = os.stat(full_path).st_mtime
+        except FileNotFoundError:
+            return None
+        stem, ext = os.path.splitext(logical_path)
+        hashed = f"{stem}.{digest}{ext}"
+
+        previous = self.manifest.get(logical_path)
+        if previous:
+            self._reverse_manifest.pop(previous, None)
+        self.manifest[logical_path] = hashed
+        self._reverse_manifest[hashed] = logical_path
+        self._manifest_mtimes[logical_path] = mtime
+        return hashed
+
+    def build_manifest(self) -> Dict[str, str]:
+        """
+        Fingerprint every file under ``fingerprint_dirs``.
+
+        Returns:
+            dict: Logical path (``js/dashboard.js``) to hashed path
+            (``js/dashboard.3f2a1b9c0d4e.js``)
+        """
+        for subdir in self.fingerprint_dirs:
+            root_dir = os.path.join(self.directory, subdir)
+            for root, _, files in os.walk(root_dir):
+                for name in files:
+                    if name.endswith(tuple(ENCODING_SUFFIXES.values())):
+                        continue
+                    logical_path = os.path.relpath(os.path.join(root, name), self.directory)
+                    self._fingerprint(logical_path.replace(os.sep, "/"))
+        logger.info(f"Built static asset manifest with {len(self.manifest)} entries")
+        return dict(self.manifest)
+
+    def asset_url(self, logical_path: str) -> str:
+        """
+        Resolve a logical asset path to its public URL.
+
+        Used as a Jinja global: ``{{ asset_url('js/dashboard.js') }}``.
+        Unknown paths fall back to the plain, revalidated URL.
+        """
+        hashed = self.manifest.get(logical_path)
+        if hashed and self.auto_reload:
+            full_path = os.path.join(self.directory, logical_path)
+            try:
+                if os.stat(full_path).st_mtime != self._manifest_mtimes.get(logical_path):
+                    hashed = self._fingerprint(logical_path)
+            except FileNotFoundError:
+                hashed = None
+        return f"/static/{hashed or logical_path}"
+
+    def _resolve_fingerprint(self, path: str) -> Tuple[str, bool]:
+        """
+        Map a request path to the file on disk.
+
+        Returns:
+            tuple: (logical path, immutable) - immutable is only True when the
+            hash matches the current content.
+        """
+        logical_path = self._reverse_manifest.get(path)
+        if logical_path:
+            return logical_path, True
+        match = FINGERPRINTED_PATH.match(path)
+        if match:
+            # Stale hash from an older deploy: serve current content, but
+            # make the browser revalidate instead of caching it forever
+            candidate = match.group("stem") + match.group("ext")
+            if candidate in self.manifest:
+                return candidate, False
+        return path, False
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        logical_path, immutable = self._resolve_fingerprint(path.replace(os.sep, "/"))
+        response = await super().get_response(logical_path, scope)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        return response
+
+    def _iter_sources(self) -> Iterable[str]:
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(PRECOMPRESS_EXTENSIONS):
+                    yield os.path.join(root, name)
+
+    def _build_variants(self, source: str, source_stat: os.stat_result) -> Dict[str, Tuple[str, os.stat_result]]:
+        """Compressed variants of one source, rewriting those older than it."""
+        encodings = ["gzip"] + (["br"] if HAS_BROTLI else [])
+        data = None
+        variants = {}
+        for encoding in encodings:
+            variant_path = source + ENCODING_SUFFIXES[encoding]
+            try:
+                variant_stat = os.stat(variant_path)
+                fresh = variant_stat.st_mtime >= source_stat.st_mtime
+            except FileNotFoundError:
+                fresh = False
+
+            if not fresh:
+                if data is None:
+                    with open(source, "rb") as f:
+                        data = f.read()
+                compressed = compress_bytes(data, encoding, gzip_level=9, brotli_quality=11)
+                with open(variant_path, "wb") as f:
+                    f.write(compressed)
+                variant_stat = os.stat(variant_path)
+
+            variants[encoding] = (variant_path, variant_stat)
+        self._variants[os.path.realpath(source)] = variants
+        return variants
+
+    def precompress(self) -> Dict[str, int]:
+        """
+        Write maximum-effort compressed variants next to each text asset.
+
+        Variants newer than their source are reused, so repeated startups
+        are cheap.
+
+        Returns:
+            dict: {"files": n, "original_bytes": x, "compressed_bytes": y}
+        """
+        stats = {"files": 0, "original_bytes": 0, "compressed_bytes": 0}
+
+        for source in self._iter_sources():
+            source_stat = os.stat(source)
+            if source_stat.st_size < self.min_size:
+                continue
+
+            variants = self._build_variants(source, source_stat)
+            stats["files"] += 1
+            stats["original_bytes"] += source_stat.st_size
+            stats["compressed_bytes"] += min(v[1].st_size for v in variants.values())
+
+        logger.info(
+            f"Precompressed {stats['files']} static assets: "
+            f"{stats['original_bytes']} -> {stats['compressed_bytes']} bytes"
+        )
+        return stats
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        variants = self._variants.get(os.path.realpath(full_path))
+        if not variants:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        if self.auto_reload and any(v[1].st_mtime < stat_result.st_mtime for v in variants.values()):
+            # Edited since precompress(): never pair old bytes with the new fingerprint
+            variants = self._build_variants(str(full_path), stat_result)
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(
+            request_headers.get("accept-encoding", ""),
+            brotli_available="br" in variants,
+        )
+        if encoding is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+
+        variant_path, variant_stat = variants[encoding]
+        media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+        response = FileResponse(
+            variant_path,
+            status_code=status_code,
+            stat_result=variant_stat,
+            media_type=media_type,
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+if __name__ == "__main__":
+    # Build-time precompression: python -m app.services.asset_service
+    logging.basicConfig(level=logging.INFO)
+    static = PrecompressedStaticFiles(directory="static")  # pragma: no cover
+    static.precompress()  # pragma: no cover
+    static.build_manifest()  # pragma: no cover
@@ -0,0 +1,212 @@
+# app/services/chat_cache.py
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.services.metrics_service import registry
+from app.services.search_service import tokenize
+
+# Words that do not change what is being asked ("my dog just ate some chocolate")
+FILLER_WORDS = frozenset(
+    "i im i'm me my mine we our you your he she him her his they their them please hi hello hey thanks "
+    "thank some just so really very do does did can could would should will am".split()
+)
+
+NUM_PERM = 64  # MinHash signature length
+BANDS = 16  # LSH bands of 4 rows: questions at Jaccard 0.8 share a band with probability > 0.999
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)  # fixed seed: the same question always gets the same signature
+_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+cache_requests_total = registry.counter(
+    "vet_chat_cache_requests_total", "Vet chat questions by cache outcome (hit, miss, bypass).",
+    ("result",),
+)
+cache_saved_seconds_total = registry.counter(
+    "vet_chat_cache_saved_seconds_total", "LLM time saved by cache hits (the original call's latency).",
+)
+llm_seconds = registry.histogram(
+    "vet_chat_llm_seconds", "Vet chat LLM call latency in seconds.",
+)
+cache_entries = registry.gauge(
+    "vet_chat_cache_entries", "Answers held in the vet chat cache.",
+)
+
+
+def shingles(question: str) -> FrozenSet[str]:
+    """Stemmed words and word pairs of a question, ignoring punctuation, case, stopwords and filler."""
+    words = [word for word in tokenize(question) if word not in FILLER_WORDS]
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def minhash(features: Iterable[str]) -> np.ndarray:
+    """NUM_PERM-value MinHash signature of a feature set."""
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little") % _PRIME
+         for feature in features),
+        dtype=np.uint64,
+    )
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class CachedAnswer:
+    id: int
+    context: str
+    features: FrozenSet[str]
+    bands: Tuple[int, ...]
+    response: str
+    latency: float  # seconds the original LLM call took
+    created_at: float
+    hits: int = 0
+
+
+@dataclass
+class CacheLookup:
+    entry: Optional[CachedAnswer]
+    similarity: float = 0.0
+    candidates: int = 0
+
+
+class SemanticCache:
+    """
+    In-process cache of vet chat answers to first-turn questions, keyed by meaning.
+
+    Questions are reduced to a set of stemmed words and word pairs. A MinHash
+    signature of that set is split into LSH bands, so a lookup only compares
+    the question with stored ones that share a band - a handful of set
+    intersections whatever the cache size. The best candidate is a hit when its
+    exact Jaccard similarity reaches ``threshold`` and it is within ``ttl``.
+    Answers are partitioned by ``context`` (the pet details in the prompt);
+    the oldest entries are evicted past ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        ttl: float = 86400.0,
+        max_entries: int = 5000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, int], Set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def band_keys(features: FrozenSet[str]) -> Tuple[int, ...]:
+        rows = minhash(features).reshape(BANDS, NUM_PERM // BANDS)
+        return tuple(hash(row.tobytes()) for row in rows)
+
+    def _remove(self, entry: CachedAnswer) -> None:
+        self._entries.pop(entry.id, None)
+        for band, key in enumerate(entry.bands):
+            bucket = self._buckets.get((entry.context, band, key))
+            if bucket is not None:
+                bucket.discard(entry.id)
+                if not bucket:
+                    del self._buckets[(entry.context, band, key)]
+
+    def lookup(self, question: str, context: str) -> CacheLookup:
+        features = shingles(question)
+        if not features:
+            return CacheLookup(None)
+        bands = self.band_keys(features)
+        now = self.clock()
+        with self._lock:
+            candidate_ids = set()
+            for band, key in enumerate(bands):
+                candidate_ids |= self._buckets.get((context, band, key), set())
+            best, best_similarity = None, 0.0
+            for entry_id in candidate_ids:
+                entry = self._entries[entry_id]
+                if now - entry.created_at > self.ttl:
+                    self._remove(entry)
+                    continue
+                similarity = jaccard(features, entry.features)
+                if similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+            if best is None or best_similarity < self.threshold:
+                return CacheLookup(None, best_similarity, len(candidate_ids))
+            best.hits += 1
+            return CacheLookup(best, best_similarity, len(candidate_ids))
+
+    def store(self, question: str, context: str, response: str, latency: float) -> Optional[CachedAnswer]:
+        features = shingles(question)
+        if not features:
+            return None
+        bands = self.band_keys(features)
+        with self._lock:
+            self._next_id += 1
+            entry = CachedAnswer(self._next_id, context, features, bands, response, latency, self.clock())
+            self._entries[entry.id] = entry
+            for band, key in enumerate(bands):
+                self._buckets.setdefault((context, band, key), set()).add(entry.id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries.values())))
+            cache_entries.set(len(self._entries))
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            cache_entries.set(0)
+
+
+# Pet details the vet prompt includes (besides the name, which answers must not use,
+# and medical notes, which bypass the cache)
+CONTEXT_FIELDS = ("species", "breed", "age", "weight")
+
+
+def pet_context(pets: List[dict]) -> str:
+    """
+    Cache partition for a question: every pet detail that shapes the answer.
+
+    A 10 lb and a 90 lb dog get different answers (toxic doses scale with
+    weight), so species, breed, age and weight must all match for a hit.
+    """
+    profiles = sorted({
+        "|".join(str(pet.get(name) or "").strip().lower() for name in CONTEXT_FIELDS) for pet in pets
+    } - {"|" * (len(CONTEXT_FIELDS) - 1)})
+    return ";".join(profiles) or "any"
+
+
+def bypass_reason(pets: List[dict], conversation_history: List[dict]) -> Optional[str]:
+    """Why a question must not be answered from (or stored in) the cache, if it must not."""
+    if conversation_history:
+        return "follow-up"  # the answer depends on the conversation so far
+    if any(pet.get("medical_notes") for pet in pets):
+        return "medical-notes"  # the answer is about this pet's history
+    return None
+
+
+def is_shareable(response: str, pets: List[dict]) -> bool:
+    """An answer that names the user's pet is personal and is not cached."""
+    names = [str(pet.get("name") or "").strip() for pet in pets]
+    return not any(
+        re.search(rf"\b{re.escape(name)}\b", response, re.IGNORECASE) for name in names if len(name) > 1
+    )
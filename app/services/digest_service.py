@@ -0,0 +1,323 @@
+# app/services/digest_service.py
+
+import argparse
+import asyncio
+import logging
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, or_, select, update
+
+from app.models.email_outbox import EmailOutbox
+from app.models.medication import Medication
+from app.models.pet import Pet
+from app.models.pet_activity_daily import PetActivityDaily
+from app.models.reminder import Reminder
+from app.models.user import User
+from app.services.email_templates import email_templates
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_DAYS = 7  # activity summary covers the week (of UTC days) before the digest day
+MEDICATION_LOOKAHEAD_DAYS = 7  # medications whose end_date falls within this window
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def local_day_window(tz_name: str, now: datetime) -> Tuple[date, datetime, datetime]:
+    """
+    The local calendar day containing ``now`` (naive UTC) in a timezone.
+
+    Returns:
+        tuple: (local date, start, end) with start/end as naive UTC, like the stored dates
+    """
+    zone = _zone(tz_name)
+    local_day = now.replace(tzinfo=timezone.utc).astimezone(zone).date()
+    start = datetime.combine(local_day, time.min, tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+    end = datetime.combine(local_day + timedelta(days=1), time.min, tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+    return local_day, start, end
+
+
+def _local(value: datetime, tz_name: str) -> datetime:
+    return value.replace(tzinfo=timezone.utc).astimezone(_zone(tz_name))
+
+
+@dataclass
+class DigestRunResult:
+    timezones: List[str]
+    users: int = 0  # users claimed for today's digest
+    queued: int = 0  # digests written to the outbox (users with nothing to report get none)
+
+
+class DigestService:
+    """
+    Service for the daily digest email.
+
+    Users are processed one timezone bucket at a time, in chunks: each chunk is
+    claimed with one UPDATE ... RETURNING that stamps digest_sent_on (so a
+    rerun or a second replica never sends a user two digests on the same local
+    day), its content is gathered with three set-based queries for the whole
+    chunk, and the rendered digests are bulk-inserted into the email outbox in
+    the same transaction. Memory is bounded by the chunk size, not the number
+    of users.
+    """
+
+    @staticmethod
+    def due_timezones(db, now: datetime, hour: int) -> List[str]:
+        """
+        Timezones in use whose local time has reached ``hour`` today.
+
+        Later hours are included so a run missed while the app was down is
+        caught up; digest_sent_on keeps it to one digest per day.
+        """
+        names = db.scalars(select(User.timezone).distinct()).all()
+        return sorted(name for name in names if _local(now, name).hour >= hour)
+
+    @staticmethod
+    def claim_chunk(db, tz_name: str, local_day: date, chunk_size: int) -> List[Tuple]:
+        """Stamp up to ``chunk_size`` pending users; returns (id, email, first_name) for each won."""
+        ids = db.scalars(
+            select(User.id).where(
+                User.timezone == tz_name,
+                User.digest_enabled.is_(True),
+                User.is_active.is_(True),
+                User.is_verified.is_(True),
+                or_(User.digest_sent_on.is_(None), User.digest_sent_on < local_day),
+            ).order_by(User.id).limit(chunk_size)
+        ).all()
+        if not ids:
+            return []
+        return db.execute(
+            update(User).where(
+                User.id.in_(ids),
+                or_(User.digest_sent_on.is_(None), User.digest_sent_on < local_day),
+            ).values(digest_sent_on=local_day)
+            .returning(User.id, User.email, User.first_name)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+    @staticmethod
+    def gather(db, user_ids: List, tz_name: str, local_day: date, start: datetime, end: datetime) -> Dict:
+        """
+        Digest content for a chunk of users (three queries, whatever the chunk size).
+
+        Returns:
+            dict: user_id -> {"reminders": [...], "medications": [...], "activity": [...]}
+        """
+        content: Dict = defaultdict(lambda: {"reminders": [], "medications": [], "activity": []})
+
+        for user_id, title, reminder_date, pet_name in db.execute(
+            select(Reminder.user_id, Reminder.title, Reminder.reminder_date, Pet.name)
+            .outerjoin(Pet, Reminder.pet_id == Pet.id)
+            .where(Reminder.user_id.in_(user_ids), Reminder.is_completed.is_(False),
+                   Reminder.reminder_date >= start, Reminder.reminder_date < end)
+            .order_by(Reminder.reminder_date)
+        ):
+            content[user_id]["reminders"].append({
+                "title": title, "pet_name": pet_name, "time": _local(reminder_date, tz_name).strftime("%H:%M"),
+            })
+
+        for user_id, name, pet_name, end_date in db.execute(
+            select(Pet.user_id, Medication.name, Pet.name, Medication.end_date)
+            .join(Pet, Medication.pet_id == Pet.id)
+            .where(Pet.user_id.in_(user_ids), Medication.is_active.is_(True),
+                   Medication.end_date >= start,
+                   Medication.end_date < end + timedelta(days=MEDICATION_LOOKAHEAD_DAYS))
+            .order_by(Medication.end_date)
+        ):
+            content[user_id]["medications"].append({
+                "name": name, "pet_name": pet_name, "end_date": _local(end_date, tz_name).strftime("%B %d"),
+            })
+
+        # From the daily rollup rather than the raw activities table. Its days are
+        # UTC days, so "the week before the digest day" is the seven UTC days before
+        # the user's local date: activities near local midnight can land a day early
+        # or late (by the timezone's UTC offset), which is fine for a weekly summary.
+        for user_id, pet_name, count, minutes, distance in db.execute(
+            select(Pet.user_id, Pet.name, func.sum(PetActivityDaily.count),
+                   func.sum(PetActivityDaily.total_duration), func.sum(PetActivityDaily.total_distance))
+            .join(Pet, PetActivityDaily.pet_id == Pet.id)
+            .where(Pet.user_id.in_(user_ids),
+                   PetActivityDaily.day >= local_day - timedelta(days=ACTIVITY_DAYS),
+                   PetActivityDaily.day < local_day)
+            .group_by(Pet.id, Pet.user_id, Pet.name)
+            .order_by(Pet.name)
+        ):
+            content[user_id]["activity"].append({
+                "pet_name": pet_name, "count": int(count), "minutes": int(minutes or 0), "distance": float(distance or 0),
+            })
+
+        return content
+
+    @staticmethod
+    def run_timezone(db, tz_name: str, now: datetime, chunk_size: int = 500) -> Tuple[int, int]:
+        """
+        Queue today's digests for one timezone bucket, committing per chunk.
+
+        Returns:
+            tuple: (users claimed, digests queued)
+        """
+        local_day, start, end = local_day_window(tz_name, now)
+        day_label = f"{local_day:%A, %B} {local_day.day}"
+        users = queued = 0
+        while True:
+            try:
+                chunk = DigestService.claim_chunk(db, tz_name, local_day, chunk_size)
+                if not chunk:
+                    return users, queued
+                content = DigestService.gather(db, [row[0] for row in chunk], tz_name, local_day, start, end)
+
+                messages = []
+                for user_id, email, first_name in chunk:
+                    sections = content.get(user_id)
+                    if not sections:
+                        continue  # nothing to report
+                    rendered = email_templates.render("digest", user_name=first_name, day=day_label, **sections)
+                    messages.append({
+                        "to_email": email, "subject": rendered.subject, "html_content": rendered.html,
+                        "text_content": rendered.text, "status": "pending", "attempts": 0,
+                        "next_attempt_at": now, "created_at": now, "updated_at": now,
+                    })
+                if messages:
+                    db.execute(insert(EmailOutbox), messages)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            users += len(chunk)
+            queued += len(messages)
+
+    @staticmethod
+    def run(db, now: datetime, hour: int, chunk_size: int = 500,
+            timezones: Optional[Iterable[str]] = None) -> DigestRunResult:
+        """
+        Queue digests for every timezone that is due (or the given ones).
+
+        Args:
+            db: Database session; committed once per chunk
+            now: Current time (naive UTC)
+            hour: Local hour from which digests go out
+            chunk_size: Users claimed, queried and rendered together
+            timezones: Run these buckets regardless of the hour
+        """
+        zones = list(timezones) if timezones is not None else DigestService.due_timezones(db, now, hour)
+        result = DigestRunResult(timezones=zones)
+        for tz_name in zones:
+            users, queued = DigestService.run_timezone(db, tz_name, now, chunk_size)
+            result.users += users
+            result.queued += queued
+        if result.users:
+            logger.info(f"Daily digest: {result.queued} emails queued for {result.users} users "
+                        f"in {len(zones)} timezones")
+        return result
+
+
+class DigestRunner:
+    """Runs DigestService shortly after every hour boundary (and once at startup)."""
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        hour: int = 7,
+        chunk_size: int = 500,
+        email_outbox=None,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self.session_factory = session_factory
+        self.hour = hour
+        self.chunk_size = chunk_size
+        # Optional EmailOutboxWorker, woken once digests are queued
+        self.email_outbox = email_outbox
+        self.clock = clock
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def run_once(self) -> DigestRunResult:
+        db = self.session_factory()
+        try:
+            return DigestService.run(db, self.clock(), self.hour, self.chunk_size)
+        finally:
+            db.close()
+
+    async def tick(self) -> DigestRunResult:
+        result = await run_in_threadpool(self.run_once)
+        if result.queued and self.email_outbox is not None:
+            self.email_outbox.notify()
+        return result
+
+    def seconds_until_next_run(self) -> float:
+        now = self.clock()
+        # A minute past the hour, so a zone that just reached its digest hour is included
+        next_run = now.replace(minute=1, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(hours=1)
+        return (next_run - now).total_seconds()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Daily digest error: {str(e)}")
+            await asyncio.sleep(self.seconds_until_next_run())
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """
+    python -m app.services.digest_service [--timezone TZ ...] [--chunk-size N]
+
+    Queues today's digests now (due timezones, or the given ones regardless of
+    the hour); the app's outbox worker sends them.
+    """
+    from app.config import settings
+    from app.database import Base, SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Queue the daily digest emails")
+    parser.add_argument("--timezone", action="append", help="Run this timezone bucket now (repeatable)")
+    parser.add_argument("--chunk-size", type=int, default=settings.DIGEST_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        result = DigestService.run(db, datetime.utcnow(), settings.DIGEST_HOUR, args.chunk_size, args.timezone)
+    finally:
+        db.close()
+    print(f"Queued {result.queued} digests for {result.users} users in {len(result.timezones)} timezones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # pragma: no cover
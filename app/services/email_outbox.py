@@ -0,0 +1,407 @@
+# app/services/email_outbox.py
+
+import asyncio
+import logging
+import math
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+import aiosmtplib
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, or_, select, update
+
+from app.config import settings
+from app.models.email_outbox import EmailOutbox
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+# First retry after 30s, doubling per attempt, never more than an hour apart
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+# Pooled connections idle for longer are re-checked with NOOP before reuse
+# (servers typically drop idle clients after a few minutes)
+IDLE_CHECK_SECONDS = 60
+
+# Bound on each SMTP step (connect with STARTTLS and login, NOOP, send); a
+# message takes at most a NOOP check, a reconnect and the send
+SMTP_TIMEOUT_SECONDS = 30
+MESSAGE_SECONDS = 3 * SMTP_TIMEOUT_SECONDS
+
+# Delivered, skipped and failed messages are deleted after EMAIL_RETENTION_DAYS,
+# checked this often and deleted this many rows per transaction
+PURGE_INTERVAL = timedelta(hours=1)
+PURGE_CHUNK_SIZE = 1000
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before the next try after ``attempts`` failed sends."""
+    return timedelta(seconds=min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1)))
+
+
+def default_smtp_factory() -> aiosmtplib.SMTP:
+    """Unconnected client for the configured server; connect() does STARTTLS and login."""
+    return aiosmtplib.SMTP(
+        hostname=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        username=settings.SMTP_USER,
+        password=settings.SMTP_PASSWORD,
+        start_tls=settings.SMTP_START_TLS,
+        timeout=SMTP_TIMEOUT_SECONDS,
+    )
+
+
+class SMTPConnectionPool:
+    """
+    A few authenticated SMTP connections shared by the outbox worker.
+
+    Opening a connection costs a TCP handshake, STARTTLS and AUTH - several
+    round trips that dwarf the cost of sending one message - so connections
+    are kept open and reused across messages and batches. At most ``size``
+    are open at once; a connection that errors is closed and replaced.
+    """
+
+    def __init__(self, size: int = 2, factory: Callable[[], aiosmtplib.SMTP] = default_smtp_factory):
+        self.size = size
+        self.factory = factory
+        self.connects = 0
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = self.factory()
+        await asyncio.wait_for(smtp.connect(), timeout=SMTP_TIMEOUT_SECONDS)
+        self.connects += 1
+        return smtp
+
+    async def _checkout(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            smtp, idle_since = self._idle.pop()
+            if not smtp.is_connected:
+                continue
+            if time.monotonic() - idle_since > IDLE_CHECK_SECONDS:
+                try:
+                    await smtp.noop()
+                except aiosmtplib.SMTPException:
+                    smtp.close()
+                    continue
+            return smtp
+        return await self._connect()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Borrow a connected client; it goes back to the pool unless the block raised."""
+        async with self._slots:
+            smtp = await self._checkout()
+            try:
+                yield smtp
+            except BaseException:
+                smtp.close()
+                raise
+            self._idle.append((smtp, time.monotonic()))
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+
+@dataclass
+class OutboxMessage:
+    """A claimed outbox row, detached from its session."""
+    id: int
+    to_email: str
+    subject: str
+    html_content: str
+    text_content: Optional[str]
+    attempts: int
+
+
+class EmailOutboxService:
+    """Service for queueing outgoing email."""
+
+    @staticmethod
+    def enqueue(
+        db,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None
+    ) -> EmailOutbox:
+        """
+        Queue an email in the caller's transaction.
+
+        Nothing is sent until the caller commits, so an email is never sent for
+        a change that rolled back, and one is never lost for a change that
+        committed.
+        """
+        message = EmailOutbox(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+        )
+        db.add(message)
+        return message
+
+    @staticmethod
+    def enqueue_verification(db, user) -> EmailOutbox:
+        """Queue the verification email for a user's current token."""
+        subject, html_content, text_content = EmailService.create_verification_email(
+            user.email, user.first_name, user.verification_token
+        )
+        return EmailOutboxService.enqueue(db, user.email, subject, html_content, text_content)
+
+
+class EmailOutboxWorker:
+    """
+    Background sender for the email_outbox table.
+
+    Each pass claims up to ``batch_size`` due messages with the same
+    conditional lease UPDATE the reminder scheduler uses (so several replicas
+    never send a message twice), sends them concurrently over the connection
+    pool, and records the outcome in one transaction. Failed sends are retried
+    with exponential backoff until ``max_attempts``, then marked failed.
+    The lease outlasts a whole batch sent at the worst-case time per message
+    (``batch_size / pool.size`` rounds of MESSAGE_SECONDS), so it cannot expire
+    and let another worker resend messages still in flight. Finished rows are
+    purged after ``retention_days``; the html bodies are most of the table.
+    Handlers call ``notify`` after committing so new mail goes out at once
+    instead of at the next poll.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        pool: Optional[SMTPConnectionPool] = None,
+        batch_size: int = 50,
+        max_attempts: int = 6,
+        lease_seconds: int = 120,
+        poll_interval: float = 5.0,
+        retention_days: Optional[int] = 30,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self.session_factory = session_factory
+        self.pool = pool or SMTPConnectionPool()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        # lease_seconds is the margin for claiming and recording around the sends
+        rounds = math.ceil(batch_size / self.pool.size)
+        self.lease = timedelta(seconds=rounds * MESSAGE_SECONDS + lease_seconds)
+        self.poll_interval = poll_interval
+        self.retention = timedelta(days=retention_days) if retention_days else None
+        self._purged_at: Optional[datetime] = None
+        self.clock = clock
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[:64]
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def notify(self) -> None:
+        """Wake the worker; called by handlers after committing queued mail."""
+        if self._wake is not None:
+            self._wake.set()
+
+    # ---- database work (threadpool) ----
+
+    def claim(self, now: datetime) -> List[OutboxMessage]:
+        """Lease the next due batch; returns the messages this worker won."""
+        db = self.session_factory()
+        try:
+            ids = db.scalars(
+                select(EmailOutbox.id).where(
+                    EmailOutbox.status == "pending",
+                    EmailOutbox.next_attempt_at <= now,
+                    or_(EmailOutbox.lease_expires_at.is_(None), EmailOutbox.lease_expires_at < now),
+                ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(self.batch_size)
+            ).all()
+            if not ids:
+                return []
+            db.execute(
+                update(EmailOutbox).where(
+                    EmailOutbox.id.in_(ids),
+                    EmailOutbox.status == "pending",
+                    or_(EmailOutbox.lease_expires_at.is_(None), EmailOutbox.lease_expires_at < now),
+                ).values(lease_owner=self.worker_id, lease_expires_at=now + self.lease)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            rows = db.execute(
+                select(EmailOutbox.id, EmailOutbox.to_email, EmailOutbox.subject, EmailOutbox.html_content,
+                       EmailOutbox.text_content, EmailOutbox.attempts)
+                .where(EmailOutbox.id.in_(ids), EmailOutbox.lease_owner == self.worker_id,
+                       EmailOutbox.status == "pending")
+                .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            ).all()
+            return [OutboxMessage(*row) for row in rows]
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def record(self, results: List[Tuple[OutboxMessage, str, Optional[str]]], now: datetime) -> None:
+        """
+        Store send outcomes and release the leases.
+
+        Args:
+            results: (message, "sent" | "skipped" | "error", error text) per message
+            now: Time of the send
+        """
+        db = self.session_factory()
+        try:
+            for message, outcome, error in results:
+                attempts = message.attempts + 1
+                values = {"attempts": attempts, "lease_owner": None, "lease_expires_at": None, "last_error": error,
+                          "updated_at": now}
+                if outcome == "sent":
+                    values.update(status="sent", sent_at=now)
+                elif outcome == "skipped":
+                    values.update(status="skipped")
+                elif attempts >= self.max_attempts:
+                    values.update(status="failed")
+                else:
+                    values.update(next_attempt_at=now + retry_delay(attempts))
+                db.execute(
+                    update(EmailOutbox).where(
+                        EmailOutbox.id == message.id, EmailOutbox.lease_owner == self.worker_id
+                    ).values(**values).execution_options(synchronize_session=False)
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def purge(self, now: datetime) -> int:
+        """
+        Delete sent, skipped and failed messages last updated before the retention window.
+
+        Deletes in chunks of PURGE_CHUNK_SIZE so a large backlog never holds
+        a long write lock on the table the worker is claiming from.
+
+        Returns:
+            int: Messages deleted
+        """
+        if self.retention is None:
+            return 0
+        cutoff = now - self.retention
+        deleted = 0
+        db = self.session_factory()
+        try:
+            while True:
+                ids = db.scalars(
+                    select(EmailOutbox.id).where(
+                        EmailOutbox.status.in_(("sent", "skipped", "failed")),
+                        EmailOutbox.updated_at < cutoff,
+                    ).limit(PURGE_CHUNK_SIZE)
+                ).all()
+                if not ids:
+                    break
+                db.execute(delete(EmailOutbox).where(EmailOutbox.id.in_(ids))
+                           .execution_options(synchronize_session=False))
+                db.commit()
+                deleted += len(ids)
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # ---- sending ----
+
+    async def send(self, message: OutboxMessage) -> Tuple[OutboxMessage, str, Optional[str]]:
+        """Send one message over a pooled connection; never raises."""
+        if not EmailService.is_configured():
+            logger.info(f"Email not configured; would send to {message.to_email}: {message.subject}")
+            return message, "skipped", None
+        mime = EmailService.build_message(message.to_email, message.subject, message.html_content,
+                                          message.text_content)
+        try:
+            async with self.pool.connection() as smtp:
+                await asyncio.wait_for(smtp.send_message(mime), timeout=SMTP_TIMEOUT_SECONDS)
+            return message, "sent", None
+        except Exception as e:
+            logger.warning(f"Email to {message.to_email} failed (attempt {message.attempts + 1}): {str(e)}")
+            return message, "error", str(e)[:1000]
+
+    async def tick(self) -> int:
+        """
+        Claim, send and record one batch.
+
+        Returns:
+            int: Messages processed (a full batch means more may be waiting)
+        """
+        messages = await run_in_threadpool(self.claim, self.clock())
+        if not messages:
+            return 0
+        # The pool bounds how many sends are in flight at once
+        results = await asyncio.gather(*(self.send(message) for message in messages))
+        await run_in_threadpool(self.record, list(results), self.clock())
+        sent = sum(1 for _, outcome, _ in results if outcome == "sent")
+        logger.info(f"Email outbox: {sent} of {len(results)} messages sent")
+        return len(results)
+
+    async def _purge_if_due(self) -> None:
+        now = self.clock()
+        if self._purged_at is not None and now - self._purged_at < PURGE_INTERVAL:
+            return
+        self._purged_at = now
+        deleted = await run_in_threadpool(self.purge, now)
+        if deleted:
+            logger.info(f"Email outbox: purged {deleted} finished messages")
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self._purge_if_due()
+                processed = await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox error: {str(e)}")
+                processed = 0
+            if processed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Email outbox worker started ({self.worker_id})")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._wake = None
+        await self.pool.close()
@@ -1,12 +1,14 @@
 # app/services/email_service.py
 
 import aiosmtplib
+from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List
+from typing import List, Optional
 import logging
 
 from app.config import settings
+from app.services.email_templates import email_templates
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,34 @@ logger = logging.getLogger(__name__)
 class EmailService:
     """Service for sending emails using SMTP."""
     
+    @staticmethod
+    def build_message(
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: str = None
+    ) -> MIMEMultipart:
+        """
+        Build the MIME message (plain text part optional, HTML part last).
+        """
+        message = MIMEMultipart("alternative")
+        message["From"] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_FROM_EMAIL or settings.SMTP_USER}>"
+        message["To"] = to_email
+        message["Subject"] = subject
+        
+        # Add plain text part
+        if text_content:
+            message.attach(MIMEText(text_content, "plain"))
+        
+        # Add HTML part
+        message.attach(MIMEText(html_content, "html"))
+        return message
+    
+    @staticmethod
+    def is_configured() -> bool:
+        """Whether SMTP credentials are set (otherwise emails are only logged)."""
+        return bool(settings.SMTP_USER and settings.SMTP_PASSWORD)
+    
     @staticmethod
     async def send_email(
         to_email: str,
@@ -34,26 +64,13 @@ class EmailService:
             bool: True if email sent successfully, False otherwise
         """
         # Check if email is configured
-        if not settings.SMTP_USER or not settings.SMTP_PASSWORD:
+        if not EmailService.is_configured():
             logger.warning("Email not configured. Skipping email send.")
             logger.info(f"Would send email to {to_email}: {subject}")
             return False
         
         try:
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["From"] = f"{settings.SMTP_FROM_NAME} <{settings.SMTP_FROM_EMAIL or settings.SMTP_USER}>"
-            message["To"] = to_email
-            message["Subject"] = subject
-            
-            # Add plain text part
-            if text_content:
-                part1 = MIMEText(text_content, "plain")
-                message.attach(part1)
-            
-            # Add HTML part
-            part2 = MIMEText(html_content, "html")
-            message.attach(part2)
+            message = EmailService.build_message(to_email, subject, html_content, text_content)
             
             # Send email
             await aiosmtplib.send(
@@ -62,7 +79,7 @@ class EmailService:
                 port=settings.SMTP_PORT,
                 username=settings.SMTP_USER,
                 password=settings.SMTP_PASSWORD,
-                start_tls=True,
+                start_tls=settings.SMTP_START_TLS,
             )
             
             logger.info(f"Email sent successfully to {to_email}")
@@ -77,7 +94,7 @@ class EmailService:
         user_email: str,
         user_name: str,
         verification_token: str
-    ) -> tuple[str, str]:
+    ) -> tuple[str, str, str]:
         """
         Create verification email content.
         
@@ -87,109 +104,14 @@ class EmailService:
             verification_token: Verification token
         
         Returns:
-            tuple: (subject, html_content)
-        """
-        verification_link = f"{settings.BASE_URL}/verify-email?token={verification_token}"
-        
-        subject = "Verify Your PetWell Account"
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .container {{
-                    background-color: #f9f9f9;
-                    border-radius: 10px;
-                    padding: 30px;
-                    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-                }}
-                .header {{
-                    text-align: center;
-                    margin-bottom: 30px;
-                }}
-                .logo {{
-                    font-size: 32px;
-                    color: #8b5cf6;
-                    font-weight: bold;
-                }}
-                .paw {{
-                    font-size: 40px;
-                }}
-                h1 {{
-                    color: #8b5cf6;
-                    font-size: 24px;
-                    margin-bottom: 20px;
-                }}
-                .button {{
-                    display: inline-block;
-                    padding: 15px 30px;
-                    background-color: #8b5cf6;
-                    color: white;
-                    text-decoration: none;
-                    border-radius: 5px;
-                    font-weight: bold;
-                    margin: 20px 0;
-                }}
-                .button:hover {{
-                    background-color: #7c3aed;
-                }}
-                .footer {{
-                    margin-top: 30px;
-                    padding-top: 20px;
-                    border-top: 1px solid #ddd;
-                    font-size: 12px;
-                    color: #666;
-                    text-align: center;
-                }}
-                .link {{
-                    color: #8b5cf6;
-                    word-break: break-all;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <div class="paw">🐾</div>
-                    <div class="logo">PetWell</div>
-                </div>
-                
-                <h1>Welcome to PetWell, {user_name}!</h1>
-                
-                <p>Thank you for registering with PetWell, your AI-powered pet care management platform.</p>
-                
-                <p>To complete your registration and start managing your pets' health, please verify your email address by clicking the button below:</p>
-                
-                <div style="text-align: center;">
-                    <a href="{verification_link}" class="button">Verify Email Address</a>
-                </div>
-                
-                <p>Or copy and paste this link into your browser:</p>
-                <p class="link">{verification_link}</p>
-                
-                <p><strong>This link will expire in 24 hours.</strong></p>
-                
-                <p>If you didn't create an account with PetWell, you can safely ignore this email.</p>
-                
-                <div class="footer">
-                    <p>© 2025 PetWell. All rights reserved.</p>
-                    <p>This is an automated email, please do not reply.</p>
-                </div>
-            </div>
-        </body>
-        </html>
+            tuple: (subject, html_content, text_content)
         """
-        
-        return subject, html_content
+        email = email_templates.render(
+            "verification",
+            user_name=user_name,
+            verification_link=f"{settings.BASE_URL}/verify-email?token={verification_token}",
+        )
+        return email.subject, email.html, email.text
     
     @staticmethod
     async def send_verification_email(
@@ -208,12 +130,44 @@ class EmailService:
         Returns:
             bool: True if email sent successfully, False otherwise
         """
-        subject, html_content = EmailService.create_verification_email(
+        subject, html_content, text_content = EmailService.create_verification_email(
             user_email, user_name, verification_token
         )
         
         return await EmailService.send_email(
             to_email=user_email,
             subject=subject,
-            html_content=html_content
+            html_content=html_content,
+            text_content=text_content
+        )
+    
+    @staticmethod
+    def create_reminder_email(
+        user_name: str,
+        title: str,
+        description: Optional[str],
+        reminder_date: datetime,
+        pet_name: Optional[str] = None
+    ) -> tuple[str, str, str]:
+        """
+        Create reminder notification email content.
+        
+        Args:
+            user_name: User's first name
+            title: Reminder title
+            description: Reminder description (optional)
+            reminder_date: When the reminder is due (UTC)
+            pet_name: Pet the reminder is for (optional)
+        
+        Returns:
+            tuple: (subject, html_content, text_content)
+        """
+        email = email_templates.render(
+            "reminder",
+            user_name=user_name,
+            title=title,
+            description=description,
+            due=reminder_date.strftime("%B %d, %Y at %H:%M"),
+            pet_name=pet_name,
         )
+        return email.subject, email.html, email.text
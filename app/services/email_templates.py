@@ -0,0 +1,183 @@
+# app/services/email_templates.py
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Union
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+
+from app.config import settings
+
+# Anchored to the repository root, not the working directory: the templates are
+# compiled when this module is imported, which the workers and tests do from anywhere
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+EMAIL_TEMPLATE_DIR = os.path.join(REPO_ROOT, "html", "email")
+
+# Email type -> subject template. Each type also has <type>.html and <type>.txt
+EMAIL_TYPES: Dict[str, str] = {
+    "verification": "Verify Your PetWell Account",
+    "reminder": "Reminder: {{ title }}{% if pet_name %} for {{ pet_name }}{% endif %}",
+    "digest": "Your PetWell digest for {{ day }}",
+}
+
+# Selectors simple enough to inline: "tag", ".class" or "tag.class"
+_SIMPLE_SELECTOR = re.compile(r"^([a-z][a-z0-9]*)?(?:\.([\w-]+))?$", re.IGNORECASE)
+_RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_OPEN_TAG = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)(\s[^<>]*?)?\s*(/?)>")
+_CLASS_ATTR = re.compile(r'\sclass="([^"]*)"')
+_STYLE_ATTR = re.compile(r'\sstyle="([^"]*)"')
+
+
+def _declarations(block: str) -> List[Tuple[str, str]]:
+    pairs = []
+    for declaration in block.split(";"):
+        name, _, value = declaration.partition(":")
+        if name.strip() and value.strip():
+            pairs.append((name.strip().lower(), value.strip()))
+    return pairs
+
+
+class CSSInliner:
+    """
+    Copy stylesheet rules into style="" attributes.
+
+    Only tag, class and tag.class selectors are inlined, applied in
+    specificity then source order with any existing style attribute winning.
+    Anything else (pseudo-classes, descendant selectors) cannot be expressed
+    inline and is returned by ``head_css`` for a <style> block instead.
+    """
+
+    def __init__(self, stylesheet: str):
+        # (specificity, order, tag, class, declarations)
+        self.rules: List[Tuple[int, int, str, str, List[Tuple[str, str]]]] = []
+        leftover = []
+        for order, (selectors, block) in enumerate(_RULE.findall(_COMMENT.sub("", stylesheet))):
+            declarations = _declarations(block)
+            for selector in (s.strip() for s in selectors.split(",")):
+                if not selector:
+                    continue
+                match = _SIMPLE_SELECTOR.match(selector)
+                if not match:
+                    leftover.append(f"{selector} {{ {'; '.join(f'{n}: {v}' for n, v in declarations)} }}")
+                    continue
+                tag, class_name = (match.group(1) or "").lower(), match.group(2) or ""
+                specificity = (10 if class_name else 0) + (1 if tag else 0)
+                self.rules.append((specificity, order, tag, class_name, declarations))
+        self.rules.sort(key=lambda rule: (rule[0], rule[1]))
+        self.head_css = "\n".join(leftover)
+
+    def style_for(self, tag: str, classes: List[str]) -> Dict[str, str]:
+        style: Dict[str, str] = {}
+        for _, _, rule_tag, rule_class, declarations in self.rules:
+            if (not rule_tag or rule_tag == tag) and (not rule_class or rule_class in classes):
+                style.update(declarations)
+        return style
+
+    def inline(self, html: str) -> str:
+        """Inline the stylesheet into an HTML document (or template source)."""
+        def replace(match: re.Match) -> str:
+            tag, attrs, self_closing = match.group(1).lower(), match.group(2) or "", match.group(3)
+            class_match = _CLASS_ATTR.search(attrs)
+            style = self.style_for(tag, class_match.group(1).split() if class_match else [])
+            if not style:
+                return match.group(0)
+            existing = _STYLE_ATTR.search(attrs)
+            if existing:
+                style.update(_declarations(existing.group(1)))
+                attrs = _STYLE_ATTR.sub("", attrs)
+            inline_style = "; ".join(f"{name}: {value}" for name, value in style.items())
+            return f'<{match.group(1)}{attrs} style="{inline_style}"{" /" if self_closing else ""}>'
+
+        html = _OPEN_TAG.sub(replace, html)
+        if self.head_css and "</head>" in html:
+            html = html.replace("</head>", f"<style>\n{self.head_css}\n</style>\n</head>", 1)
+        return html
+
+
+class EmailTemplateLoader(FileSystemLoader):
+    """FileSystemLoader that inlines the stylesheet into .html sources before compiling."""
+
+    def __init__(self, searchpath: str, inliner: CSSInliner):
+        super().__init__(searchpath)
+        self.inliner = inliner
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        if template.endswith(".html"):
+            source = self.inliner.inline(source)
+        return source, filename, uptodate
+
+
+@dataclass
+class RenderedEmail:
+    subject: str
+    html: str
+    text: str
+
+
+class EmailTemplates:
+    """
+    Compiled subject, HTML and plain text templates for every email type.
+
+    Everything that does not depend on the recipient happens once, in the
+    constructor: the stylesheet is parsed and inlined into the HTML sources,
+    and Jinja compiles each template (base layout included) to Python code in
+    which the static markup is a constant string. Rendering an email then only
+    evaluates the per-recipient expressions and joins the pieces.
+    """
+
+    def __init__(self, directory: str = EMAIL_TEMPLATE_DIR, types: Dict[str, str] = EMAIL_TYPES):
+        with open(os.path.join(directory, "styles.css"), encoding="utf-8") as f:
+            self.inliner = CSSInliner(f.read())
+        self.env = Environment(
+            loader=EmailTemplateLoader(directory, self.inliner),
+            # HTML is escaped; subjects (headers) and text parts are not
+            autoescape=select_autoescape(enabled_extensions=("html",), default_for_string=False),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,
+        )
+        # Templates only see what render() is given; without the default
+        # globals (range, lipsum, ...) each render builds a much smaller context
+        self.env.globals.clear()
+        self._templates: Dict[str, Tuple[Union[str, Template], Template, Template]] = {
+            kind: (
+                # Constant subjects skip Jinja entirely
+                self.env.from_string(subject) if "{" in subject else subject,
+                self.env.get_template(f"{kind}.html"),
+                self.env.get_template(f"{kind}.txt"),
+            )
+            for kind, subject in types.items()
+        }
+
+    @property
+    def types(self) -> List[str]:
+        return list(self._templates)
+
+    def render(self, kind: str, **context) -> RenderedEmail:
+        """
+        Render one email.
+
+        Args:
+            kind: One of EMAIL_TYPES
+            **context: The template variables for this recipient
+
+        Raises:
+            KeyError: Unknown email type
+            jinja2.UndefinedError: A template variable was not supplied
+        """
+        subject, html, text = self._templates[kind]
+        context.setdefault("base_url", settings.BASE_URL)
+        return RenderedEmail(
+            # Header values must stay on one line
+            subject=subject if isinstance(subject, str) else " ".join(subject.render(context).split()),
+            html=html.render(context),
+            text=text.render(context),
+        )
+
+
+# Compiled once, on first import (application startup)
+email_templates = EmailTemplates()
@@ -0,0 +1,117 @@
+# app/services/etag_service.py
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+class ETagService:
+    """Service for cheap weak ETags and HTTP conditional request handling."""
+
+    @staticmethod
+    def collection_fingerprint(
+        db: Session,
+        model,
+        *criteria
+    ) -> Tuple[int, Optional[datetime]]:
+        """
+        Fingerprint a collection with a single aggregate query.
+
+        Only count(*) and max(updated_at) are fetched, so no rows are
+        hydrated and nothing is serialized.
+
+        Args:
+            db: Database session
+            model: ORM model with an ``updated_at`` column
+            *criteria: Filter expressions scoping the collection
+
+        Returns:
+            tuple: (row_count, max_updated_at)
+        """
+        stmt = select(func.count(model.id), func.max(model.updated_at)).where(*criteria)
+        count, last_modified = db.execute(stmt).one()
+        return count, last_modified
+
+    @staticmethod
+    def make_etag(*parts) -> str:
+        """
+        Build a weak ETag from arbitrary parts (scope, query params, fingerprint).
+
+        Returns:
+            str: Weak ETag, e.g. ``W/"3f2a..."``
+        """
+        raw = "|".join("" if part is None else str(part) for part in parts)
+        digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+        return f'W/"{digest}"'
+
+    @staticmethod
+    def is_not_modified(
+        request: Request,
+        etag: str,
+        last_modified: Optional[datetime] = None
+    ) -> bool:
+        """
+        Evaluate If-None-Match / If-Modified-Since against the current validators.
+
+        If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        and is compared weakly.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            current = etag[2:] if etag.startswith("W/") else etag
+            for candidate in if_none_match.split(","):
+                candidate = candidate.strip()
+                if candidate.startswith("W/"):
+                    candidate = candidate[2:]
+                if candidate == current:
+                    return True
+            return False
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return ETagService._as_utc(last_modified).replace(microsecond=0) <= since
+        return False
+
+    @staticmethod
+    def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+        """
+        Build the caching headers sent with both 200 and 304 responses.
+
+        ``no-cache`` makes browsers revalidate on every fetch, which is what
+        turns repeat page loads into cheap 304s.
+        """
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(ETagService._as_utc(last_modified), usegmt=True)
+        return headers
+
+    @staticmethod
+    def apply_headers(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+        """Attach validator headers to an outgoing response."""
+        for key, value in ETagService.validator_headers(etag, last_modified).items():
+            response.headers[key] = value
+
+    @staticmethod
+    def not_modified_response(etag: str, last_modified: Optional[datetime] = None) -> Response:
+        """Return an empty 304 Not Modified response."""
+        return Response(status_code=304, headers=ETagService.validator_headers(etag, last_modified))
+
+    @staticmethod
+    def _as_utc(value: datetime) -> datetime:
+        """Model timestamps are naive UTC (datetime.utcnow)."""
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
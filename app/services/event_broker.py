@@ -0,0 +1,108 @@
+# app/services/event_broker.py
+
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Events a slow subscriber may fall behind by before it is told to resync
+SUBSCRIBER_QUEUE_SIZE = 100
+
+RESYNC_EVENT = {"resource": "resync", "action": "resync"}
+
+
+class Subscription:
+    """One connected client: a bounded queue of pending events."""
+
+    def __init__(self, user_id: str, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def offer(self, event: dict) -> None:
+        """Queue an event without blocking the publisher."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop what is queued; the client refetches everything instead
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event, or None after ``timeout`` seconds."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is RESYNC_EVENT:
+            self.overflowed = False
+        return event
+
+
+class EventBroker(ABC):
+    """
+    Per-user change event fan-out.
+
+    Handlers call ``publish`` after committing; the /events endpoint holds a
+    ``subscribe`` context per connected page. A multi-node deployment plugs in
+    a broker backed by a shared channel (Redis pub/sub, Postgres LISTEN/NOTIFY)
+    by implementing these two methods and delivering into ``Subscription.offer``.
+    """
+
+    @abstractmethod
+    async def publish(self, user_id, event: dict) -> None:
+        """Deliver an event to every subscription of the user."""
+
+    @abstractmethod
+    def subscribe(self, user_id):
+        """Async context manager yielding a Subscription."""
+
+
+class InMemoryEventBroker(EventBroker):
+    """Broker for a single process: subscribers live in a dict on the event loop."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscriber_count(self, user_id=None) -> int:
+        if user_id is not None:
+            return len(self._subscribers.get(str(user_id), ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    async def publish(self, user_id, event: dict) -> None:
+        for subscription in list(self._subscribers.get(str(user_id), ())):
+            subscription.offer(event)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id) -> AsyncIterator[Subscription]:
+        key = str(user_id)
+        subscription = Subscription(key, self.queue_size)
+        self._subscribers[key].add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscribers[key].discard(subscription)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+
+def format_sse(event: dict) -> bytes:
+    """Encode an event as an SSE message named after its resource."""
+    return f"event: {event['resource']}\ndata: {json.dumps(event, default=str)}\n\n".encode("utf-8")
+
+
+def create_broker(name: str) -> EventBroker:
+    """Broker selected by the EVENT_BROKER setting."""
+    if name == "memory":
+        return InMemoryEventBroker()
+    raise ValueError(f"Unknown event broker: {name}")
@@ -0,0 +1,227 @@
+# app/services/export_service.py
+
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, Select, select
+from sqlalchemy.orm import Session
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+    HAS_PYARROW = False
+
+from app.models.activity import Activity
+from app.models.medication import Medication
+from app.models.pet import Pet
+from app.models.reminder import Reminder
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Binary formats for analytics, built with pyarrow
+COLUMNAR_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.file",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# dataset -> (model, date column used for range filters, exported columns)
+EXPORT_DATASETS: Dict[str, Tuple[Any, Any, List[Any]]] = {
+    "activities": (Activity, Activity.activity_date, [
+        Activity.id, Activity.pet_id, Pet.name.label("pet_name"), Activity.activity_date,
+        Activity.activity_type, Activity.title, Activity.description, Activity.duration,
+        Activity.distance, Activity.notes,
+    ]),
+    "medications": (Medication, Medication.start_date, [
+        Medication.id, Medication.pet_id, Pet.name.label("pet_name"), Medication.name,
+        Medication.dosage, Medication.frequency, Medication.route, Medication.reason,
+        Medication.prescribing_vet, Medication.start_date, Medication.end_date,
+        Medication.is_active, Medication.notes,
+    ]),
+    "reminders": (Reminder, Reminder.reminder_date, [
+        Reminder.id, Reminder.pet_id, Pet.name.label("pet_name"), Reminder.title,
+        Reminder.description, Reminder.reminder_type, Reminder.reminder_date,
+        Reminder.is_completed,
+    ]),
+}
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _arrow_type(column_type: Any) -> "pa.DataType":
+    # Boolean is checked first: some dialects implement it on top of Integer
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, (Float, Numeric)):
+        return pa.float64()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+class ExportService:
+    """Service for streaming a user's pet history out of the database."""
+
+    @staticmethod
+    def build_query(
+        dataset: str,
+        user_id: Optional[UUID],
+        pet_id: Optional[int] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> Select:
+        """
+        Build the column query for one dataset, ordered per pet then by date.
+
+        Args:
+            dataset: One of EXPORT_DATASETS
+            user_id: Owner whose rows are exported, or None for no owner
+                filter (admin exports of a single pet)
+            pet_id: Restrict to one pet
+            start: First day included
+            end: Last day included
+
+        Returns:
+            Select: Statement returning plain rows (no ORM hydration)
+        """
+        model, date_column, columns = EXPORT_DATASETS[dataset]
+        if model is Reminder:
+            # Reminders belong to the user and may have no pet
+            stmt = select(*columns).outerjoin(Pet, Reminder.pet_id == Pet.id)
+            if user_id is not None:
+                stmt = stmt.where(Reminder.user_id == user_id)
+        else:
+            stmt = select(*columns).join(Pet, model.pet_id == Pet.id)
+            if user_id is not None:
+                stmt = stmt.where(Pet.user_id == user_id)
+
+        if pet_id is not None:
+            stmt = stmt.where(model.pet_id == pet_id)
+        if start is not None:
+            stmt = stmt.where(date_column >= datetime.combine(start, datetime.min.time()))
+        if end is not None:
+            stmt = stmt.where(date_column < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+        return stmt.order_by(model.pet_id, date_column, model.id)
+
+    @staticmethod
+    def stream(db: Session, stmt: Select, fmt: str, batch_size: int = 1000) -> Iterator[bytes]:
+        """
+        Encode query results chunk by chunk.
+
+        ``yield_per`` makes Postgres use a server-side cursor, so memory stays
+        constant no matter how long the history is; one chunk is emitted per
+        fetched batch.
+
+        Args:
+            db: Database session (must stay open while the response streams)
+            stmt: Query from build_query
+            fmt: "csv" or "ndjson"
+            batch_size: Rows fetched and encoded per chunk
+
+        Yields:
+            bytes: Encoded output
+        """
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+
+        try:
+            for partition in result.partitions():
+                if writer:
+                    writer.writerows(
+                        [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+                        for row in partition
+                    )
+                else:
+                    for row in partition:
+                        buffer.write(json.dumps(
+                            {key: _json_value(value) for key, value in zip(columns, row)}
+                        ))
+                        buffer.write("\n")
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+            if writer and buffer.tell():
+                yield buffer.getvalue().encode("utf-8")
+        finally:
+            result.close()
+
+    @staticmethod
+    def arrow_schema(stmt: Select) -> "pa.Schema":
+        """Arrow schema matching the columns selected by a build_query statement."""
+        return pa.schema([
+            pa.field(column.name, _arrow_type(column.type)) for column in stmt.selected_columns
+        ])
+
+    @staticmethod
+    def write_columnar(db: Session, stmt: Select, fmt: str, batch_size: int = 10000) -> bytes:
+        """
+        Encode query results as an Arrow IPC file or a Parquet file.
+
+        Rows are fetched in batches and transposed into one column array per
+        field, so each fetched batch becomes one Arrow record batch (and one
+        Parquet row group). Both formats put their index in a footer, so the
+        file is assembled before it is sent rather than streamed.
+
+        Args:
+            db: Database session
+            stmt: Query from build_query
+            fmt: "arrow" or "parquet"
+            batch_size: Rows per record batch / row group
+
+        Returns:
+            bytes: Encoded file
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+        """
+        if not HAS_PYARROW:
+            raise RuntimeError("pyarrow is not installed")
+
+        schema = ExportService.arrow_schema(stmt)
+        sink = pa.BufferOutputStream()
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_file(sink, schema)
+
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        try:
+            for partition in result.partitions():
+                columns = list(zip(*partition))
+                batch = pa.record_batch(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                )
+                writer.write_batch(batch)
+        finally:
+            result.close()
+            writer.close()
+        return sink.getvalue().to_pybytes()
+
+    @staticmethod
+    def filename(dataset: str, fmt: str, pet_id: Optional[int] = None) -> str:
+        """Download filename, e.g. petwell-activities-pet12-2025-06-01.csv"""
+        scope = f"-pet{pet_id}" if pet_id is not None else ""
+        return f"petwell-{dataset}{scope}-{date.today().isoformat()}.{fmt}"
@@ -0,0 +1,183 @@
+# app/services/health_score_service.py
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.medication import Medication
+from app.models.pet_activity_daily import PetActivityDaily
+from app.models.user import User
+from app.services.adherence_service import AdherenceService, week_start
+from app.services.medication_schedule import Recurrence
+
+# How many days of the activity rollup are loaded; the longest window used below
+HISTORY_DAYS = 90
+TREND_WEEKS = 8
+
+# Daily activity minutes that earn a full activity component
+TARGET_MINUTES = {"dog": 60.0, "cat": 20.0, "rabbit": 30.0}
+DEFAULT_TARGET_MINUTES = 30.0
+
+# Composite weights; adherence is dropped (and the rest re-normalized) for
+# pets without scheduled medications
+WEIGHTS = {"activity": 0.4, "consistency": 0.25, "trend": 0.1, "adherence": 0.25}
+
+# Adherence covers the weeks (from the weekly rollup) overlapping this many days
+ADHERENCE_DAYS = 30
+
+
+@dataclass
+class ActivityColumns:
+    """A pet's daily activity totals as parallel arrays, newest day = 0."""
+    days_ago: np.ndarray      # int64, calendar days before as_of
+    count: np.ndarray         # int64, activities
+    minutes: np.ndarray       # float64, 0 where unknown
+    distance: np.ndarray      # float64, 0 where unknown
+
+
+class HealthScoreService:
+    """Service for vectorized activity statistics and the composite health score."""
+
+    @staticmethod
+    def to_columns(rows: Iterable[Sequence], as_of: datetime) -> ActivityColumns:
+        """
+        Transpose pet_activity_daily (day, count, total_duration, total_distance) rows into arrays.
+        """
+        rows = list(rows)
+        if not rows:
+            empty_int, empty_float = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+            return ActivityColumns(empty_int, empty_int, empty_float, empty_float)
+
+        days, counts, durations, distances = zip(*rows)
+        stamps = np.array(days, dtype="datetime64[D]")
+        days_ago = (np.datetime64(as_of.date(), "D") - stamps).astype(np.int64)
+        return ActivityColumns(
+            days_ago=days_ago,
+            count=np.array(counts, dtype=np.int64),
+            minutes=np.array([d or 0 for d in durations], dtype=np.float64),
+            distance=np.array([d or 0.0 for d in distances], dtype=np.float64),
+        )
+
+    @staticmethod
+    def compute(
+        columns: ActivityColumns,
+        species: Optional[str] = None,
+        adherence: Optional[float] = None
+    ) -> dict:
+        """
+        Compute the activity statistics and health score.
+
+        Rollup rows (one per day and activity type) are summed into per-day
+        totals with one ``bincount``; rolling sums come from the cumulative sum
+        of that daily series, so there is no Python-level loop.
+
+        Args:
+            columns: Daily totals from to_columns
+            species: Pet species, selects the daily minutes target
+            adherence: Share of scheduled doses given (0-1), None without scheduled medications
+
+        Returns:
+            dict: Statistics and score (0-100), see HealthScoreRead
+        """
+        # Future-dated rows are ignored, as is anything past the history window
+        in_window = (columns.days_ago >= 0) & (columns.days_ago < HISTORY_DAYS)
+        days = columns.days_ago[in_window]
+        # Index 0 is the oldest day so the series reads left to right
+        slot = HISTORY_DAYS - 1 - days
+        daily_minutes = np.bincount(slot, weights=columns.minutes[in_window], minlength=HISTORY_DAYS)
+        daily_distance = np.bincount(slot, weights=columns.distance[in_window], minlength=HISTORY_DAYS)
+        daily_count = np.bincount(slot, weights=columns.count[in_window], minlength=HISTORY_DAYS)
+
+        cumulative = np.concatenate(([0.0], np.cumsum(daily_minutes)))
+        rolling_7 = cumulative[7:] - cumulative[:-7]
+        rolling_30 = cumulative[30:] - cumulative[:-30]
+
+        weekly_distance = daily_distance[-TREND_WEEKS * 7:].reshape(TREND_WEEKS, 7).sum(axis=1)
+        if weekly_distance.any():
+            slope = float(np.polyfit(np.arange(TREND_WEEKS, dtype=np.float64), weekly_distance, 1)[0])
+        else:
+            slope = 0.0
+
+        minutes_30 = float(rolling_30[-1])
+        target = TARGET_MINUTES.get((species or "").lower(), DEFAULT_TARGET_MINUTES)
+        components = {
+            "activity": min(1.0, minutes_30 / 30.0 / target),
+            "consistency": float(np.count_nonzero(daily_count[-30:])) / 30.0,
+            "trend": 0.5,
+        }
+        mean_week = float(weekly_distance.mean())
+        if mean_week > 0:
+            # +/- half of an average week per week maps to the 0..1 range
+            components["trend"] = float(np.clip(0.5 + slope / mean_week, 0.0, 1.0))
+
+        if adherence is not None:
+            components["adherence"] = adherence
+
+        total_weight = sum(WEIGHTS[name] for name in components)
+        score = sum(WEIGHTS[name] * value for name, value in components.items()) / total_weight
+
+        return {
+            "score": int(round(score * 100)),
+            "components": {name: round(value, 3) for name, value in components.items()},
+            "minutes_7d": float(rolling_7[-1]),
+            "minutes_30d": minutes_30,
+            "avg_daily_minutes_30d": round(minutes_30 / 30.0, 1),
+            "rolling_minutes_7d": rolling_7[-30:].tolist(),
+            "distance_30d": round(float(daily_distance[-30:].sum()), 2),
+            "weekly_distance": np.round(weekly_distance, 2).tolist(),
+            "distance_trend": round(slope, 3),
+            "medication_adherence": None if adherence is None else round(adherence, 3),
+            "active_days_30d": int(np.count_nonzero(daily_count[-30:])),
+        }
+
+    @staticmethod
+    def adherence(db: Session, pet, as_of: datetime) -> Optional[float]:
+        """
+        Given / expected doses over the last ADHERENCE_DAYS, from medication_adherence_weekly.
+
+        None when the pet has no active medication with a dosing schedule
+        (Recurrence.doses_per_day is 0 for as-needed and unparsed frequencies)
+        or nothing has been due yet.
+        """
+        schedules = db.scalars(
+            select(Medication.schedule).where(Medication.pet_id == pet.id, Medication.is_active.is_(True),
+                                              Medication.schedule.is_not(None))
+        ).all()
+        if not any(Recurrence.from_dict(schedule).doses_per_day > 0 for schedule in schedules):
+            return None
+
+        tz_name = db.scalar(select(User.timezone).where(User.id == pet.user_id)) or "UTC"
+        since = week_start(as_of - timedelta(days=ADHERENCE_DAYS), tz_name)
+        weeks = AdherenceService.weekly(db, pet.user_id, since, pet_id=pet.id, now=as_of, tz_name=tz_name)
+        expected = sum(week.expected for week in weeks)
+        if expected <= 0:
+            return None
+        return min(1.0, sum(week.given for week in weeks) / expected)
+
+    @staticmethod
+    def for_pet(db: Session, pet, as_of: Optional[datetime] = None) -> dict:
+        """
+        Load a pet's last HISTORY_DAYS of daily activity totals and score them.
+
+        Reads pet_activity_daily (at most a few rows per day, however many
+        activities were logged) rather than the activities themselves, so days
+        are UTC calendar days; medication adherence comes from the weekly rollup.
+        """
+        as_of = as_of or datetime.utcnow()
+        rows = db.execute(
+            select(PetActivityDaily.day, PetActivityDaily.count, PetActivityDaily.total_duration,
+                   PetActivityDaily.total_distance)
+            .where(PetActivityDaily.pet_id == pet.id,
+                   PetActivityDaily.day >= (as_of - timedelta(days=HISTORY_DAYS)).date())
+        ).all()
+
+        columns = HealthScoreService.to_columns(rows, as_of)
+        result = HealthScoreService.compute(
+            columns, species=pet.species, adherence=HealthScoreService.adherence(db, pet, as_of),
+        )
+        result.update(pet_id=pet.id, as_of=as_of, activity_count=int(columns.count.sum()))
+        return result
@@ -0,0 +1,387 @@
+# app/services/medication_schedule.py
+
+import asyncio
+import calendar
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Callable, Iterator, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, insert, or_, select, update
+
+from app.models.medication import Medication
+from app.models.medication_dose import MedicationDose
+from app.models.pet import Pet
+from app.models.user import User
+from app.services.adherence_service import AdherenceService
+from app.services.digest_service import _zone
+
+logger = logging.getLogger(__name__)
+
+# Default dose times (local) for "N times daily" without explicit times
+DEFAULT_TIMES = {
+    1: ["08:00"],
+    2: ["08:00", "20:00"],
+    3: ["08:00", "14:00", "20:00"],
+    4: ["08:00", "12:00", "16:00", "20:00"],
+}
+# Weekdays (Monday = 0) for "N times a week"
+DEFAULT_WEEKDAYS = {1: None, 2: [0, 3], 3: [0, 2, 4], 4: [0, 1, 3, 5], 5: [0, 1, 2, 3, 4], 6: [0, 1, 2, 3, 4, 5]}
+TIME_WORDS = {"morning": "08:00", "noon": "12:00", "midday": "12:00", "afternoon": "14:00",
+              "evening": "18:00", "night": "21:00", "nightly": "21:00", "bedtime": "21:00"}
+COUNT_WORDS = {"once": 1, "twice": 2, "three times": 3, "four times": 4, "thrice": 3}
+# Veterinary shorthand
+ABBREVIATIONS = {"sid": 1, "qd": 1, "bid": 2, "tid": 3, "qid": 4}
+# Shorter intervals are not a real dosing schedule (and would flood medication_doses)
+MIN_INTERVAL_HOURS = 1.0
+WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+_INTERVAL = re.compile(r"(?:every|q)\s*(\d+(?:\.\d+)?)?\s*(?:h|hr|hrs|hour|hours)\b")
+_EVERY_DAYS = re.compile(r"every\s+(\d+|other)\s+days?\b")
+_CLOCK_TIME = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b|\b(\d{1,2}):(\d{2})\b")
+_COUNT = re.compile(r"(\d+)\s*(?:x|times)\b")
+
+
+@dataclass
+class Recurrence:
+    """
+    A parsed medication frequency.
+
+    Either ``interval_hours`` (doses every N hours from the start date) or
+    ``times`` (local HH:MM) on the days selected by ``every_days``,
+    ``weekdays`` or ``month_day``. ``as_needed`` schedules nothing.
+    """
+    interval_hours: Optional[float] = None
+    times: List[str] = field(default_factory=list)
+    every_days: int = 1
+    weekdays: Optional[List[int]] = None
+    month_day: Optional[int] = None
+    as_needed: bool = False
+
+    def to_dict(self) -> dict:
+        defaults = asdict(Recurrence())
+        return {key: value for key, value in asdict(self).items() if value != defaults[key]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Recurrence":
+        return cls(**data)
+
+    @property
+    def doses_per_day(self) -> float:
+        if self.as_needed:
+            return 0.0
+        if self.interval_hours:
+            return 24.0 / self.interval_hours
+        per_dose_day = float(len(self.times))
+        if self.weekdays is not None:
+            return per_dose_day * len(self.weekdays) / 7.0
+        if self.month_day is not None:
+            return per_dose_day / 30.0
+        return per_dose_day / self.every_days
+
+    def occurrences(self, start: datetime, end: datetime, anchor: datetime, tz_name: str = "UTC") -> Iterator[datetime]:
+        """
+        Dose times in [start, end), never before ``anchor`` (the medication's start date).
+
+        All datetimes are naive UTC; ``times`` are wall-clock times in ``tz_name``.
+        """
+        start = max(start, anchor)
+        if self.as_needed or start >= end:
+            return
+        if self.interval_hours:
+            step = timedelta(hours=self.interval_hours)
+            steps = max(0, -(-(start - anchor) // step))  # ceil
+            current = anchor + steps * step
+            while current < end:
+                yield current
+                current += step
+            return
+
+        zone = _zone(tz_name)
+        to_local = lambda value: value.replace(tzinfo=timezone.utc).astimezone(zone)
+        anchor_day = to_local(anchor).date()
+        clock_times = [time.fromisoformat(value) for value in sorted(self.times)]
+        day = to_local(start).date()
+        last_day = to_local(end).date()
+        while day <= last_day:
+            if self._on(day, anchor_day):
+                for clock in clock_times:
+                    when = datetime.combine(day, clock, tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+                    if start <= when < end:
+                        yield when
+            day += timedelta(days=1)
+
+    def _on(self, day: date, anchor_day: date) -> bool:
+        if self.weekdays is not None:
+            return day.weekday() in self.weekdays
+        if self.month_day is not None:
+            return day.day == min(self.month_day, calendar.monthrange(day.year, day.month)[1])
+        return (day - anchor_day).days % self.every_days == 0
+
+
+def parse_frequency(frequency: Optional[str], start_date: Optional[datetime] = None) -> Optional[Recurrence]:
+    """
+    Parse free-text frequency into a Recurrence.
+
+    Understands "twice daily", "every 8 hours", "q12h", "BID", "3x a day",
+    "every other day", "weekly", "twice a week", "Mon and Thu", "monthly",
+    "daily at 7am and 7pm", "every morning", "as needed". Weekly and monthly
+    schedules fall on the start date's weekday / day of month.
+
+    Returns:
+        Recurrence, or None when the text is not understood (no doses are scheduled)
+    """
+    text = (frequency or "").lower().strip()
+    if not text:
+        return None
+    if "as needed" in text or "when needed" in text or re.search(r"\bprn\b", text):
+        return Recurrence(as_needed=True)
+
+    interval = _INTERVAL.search(text)
+    if interval:
+        hours = float(interval.group(1) or 1)
+        return Recurrence(interval_hours=hours) if hours >= MIN_INTERVAL_HOURS else None
+
+    times = []
+    for match in _CLOCK_TIME.finditer(text):
+        if match.group(3):
+            hour = int(match.group(1)) % 12 + (12 if match.group(3) == "pm" else 0)
+            minute = int(match.group(2) or 0)
+        else:
+            hour, minute = int(match.group(4)), int(match.group(5))
+        if hour < 24 and minute < 60:
+            times.append(f"{hour:02d}:{minute:02d}")
+    times.extend(value for word, value in TIME_WORDS.items() if re.search(rf"\b{word}s?\b", text))
+
+    count = next((n for word, n in ABBREVIATIONS.items() if re.search(rf"\b{word}\b", text)), None)
+    if count is None:
+        count = next((n for word, n in COUNT_WORDS.items() if word in text), None)
+    if count is None:
+        number = _COUNT.search(text)
+        count = int(number.group(1)) if number else None
+
+    # "Mon", "Mondays", "tues" - but not "monthly"
+    weekdays = sorted({
+        i for i, name in enumerate(WEEKDAY_NAMES)
+        if re.search(rf"\b{name[:3]}(?:{name[3:]}|{name[3]})?s?\b", text)
+    })
+    anchor = start_date or datetime.utcnow()
+    recurrence = Recurrence()
+    if weekdays:
+        recurrence.weekdays = weekdays
+    elif "week" in text:
+        recurrence.weekdays = DEFAULT_WEEKDAYS.get(count or 1) or [anchor.weekday()]
+        count = None  # "twice a week" is two days with one dose each
+    elif "month" in text:
+        recurrence.month_day = anchor.day
+        count = None
+    else:
+        every = _EVERY_DAYS.search(text)
+        if every:
+            recurrence.every_days = 2 if every.group(1) == "other" else max(1, int(every.group(1)))
+        elif not (times or count or re.search(r"\b(daily|day|days|nightly)\b", text)):
+            return None
+
+    if times:
+        recurrence.times = sorted(set(times))
+    elif count and count > 4:
+        if 24.0 / count < MIN_INTERVAL_HOURS:
+            return None
+        return Recurrence(interval_hours=24.0 / count)
+    else:
+        recurrence.times = DEFAULT_TIMES[count or 1]
+    return recurrence
+
+
+class MedicationScheduleService:
+    """Service for parsing medication schedules and materializing their doses."""
+
+    @staticmethod
+    def apply_schedule(medication: Medication) -> Optional[Recurrence]:
+        """Parse the medication's frequency into its schedule column (at write time)."""
+        recurrence = parse_frequency(medication.frequency, medication.start_date)
+        medication.schedule = recurrence.to_dict() if recurrence else None
+        return recurrence
+
+    @staticmethod
+    def dose_rows(medication, user_id, tz_name: str, start: datetime, end: datetime) -> List[dict]:
+        """Rows for medication_doses in [start, end), respecting start/end dates."""
+        if not medication.schedule or not medication.is_active:
+            return []
+        if medication.end_date is not None:
+            end = min(end, medication.end_date)
+        recurrence = Recurrence.from_dict(medication.schedule)
+        if recurrence.interval_hours is not None and recurrence.interval_hours < MIN_INTERVAL_HOURS:
+            return []  # stored before the minimum was enforced
+        return [
+            {"medication_id": medication.id, "pet_id": medication.pet_id, "user_id": user_id, "scheduled_at": when}
+            for when in recurrence.occurrences(start, end, medication.start_date, tz_name)
+        ]
+
+    @staticmethod
+    def materialize(db, medication: Medication, user, now: datetime, horizon: timedelta) -> int:
+        """
+        Replace a medication's future doses (call after create/update, before commit).
+
+        Past doses are kept; everything from ``now`` on is regenerated up to
+        ``now + horizon``.
+
+        Returns:
+            int: Doses written
+        """
+        db.flush()  # the medication needs its id
+        tz_name = user.timezone or "UTC"
+        removed = db.scalars(
+            delete(MedicationDose).where(
+                MedicationDose.medication_id == medication.id, MedicationDose.scheduled_at >= now
+            ).returning(MedicationDose.scheduled_at).execution_options(synchronize_session=False)
+        ).all()
+        rows = MedicationScheduleService.dose_rows(medication, user.id, tz_name, now, now + horizon)
+        if rows:
+            db.execute(insert(MedicationDose), rows)
+        # Keep the weekly adherence rollup's expected counts in step
+        AdherenceService.doses_changed(
+            db,
+            added=[(medication.id, row["scheduled_at"], tz_name) for row in rows],
+            removed=[(medication.id, scheduled_at, tz_name) for scheduled_at in removed],
+        )
+        medication.doses_until = now + horizon
+        return len(rows)
+
+    @staticmethod
+    def timezone_changed(db, user, now: datetime, horizon: timedelta) -> int:
+        """
+        Re-materialize a user's doses after their timezone changed (before commit).
+
+        Future doses move to the new zone's wall-clock times, and the weekly
+        adherence rollup is rebuilt for all their medications, since past
+        doses now fall into the new zone's weeks.
+
+        Returns:
+            int: Doses written
+        """
+        medications = db.scalars(
+            select(Medication).join(Pet, Medication.pet_id == Pet.id).where(Pet.user_id == user.id)
+        ).all()
+        written = sum(
+            MedicationScheduleService.materialize(db, medication, user, now, horizon)
+            for medication in medications if medication.is_active
+        )
+        AdherenceService.rebuild(db, [medication.id for medication in medications])
+        return written
+
+    @staticmethod
+    def extend_horizon(db, now: datetime, horizon: timedelta, chunk_size: int = 500) -> int:
+        """
+        Roll every active schedule forward to ``now + horizon``.
+
+        Only the gap after each medication's ``doses_until`` is generated, so
+        this is cheap to run often. Commits once per chunk of medications.
+
+        Returns:
+            int: Doses written
+        """
+        target = now + horizon
+        written = 0
+        last_id = 0
+        while True:
+            rows = db.execute(
+                select(Medication, User.id, User.timezone)
+                .join(Pet, Medication.pet_id == Pet.id)
+                .join(User, Pet.user_id == User.id)
+                .where(
+                    Medication.id > last_id,
+                    Medication.is_active.is_(True),
+                    Medication.schedule.is_not(None),
+                    # as-needed medications never have scheduled doses
+                    func.coalesce(Medication.schedule["as_needed"].as_boolean(), False).is_(False),
+                    or_(Medication.doses_until.is_(None), Medication.doses_until < target),
+                    or_(Medication.end_date.is_(None), Medication.end_date > now),
+                )
+                .order_by(Medication.id).limit(chunk_size)
+            ).all()
+            if not rows:
+                return written
+            doses, added = [], []
+            for medication, user_id, tz_name in rows:
+                start = max(now, medication.doses_until) if medication.doses_until else now
+                new_doses = MedicationScheduleService.dose_rows(medication, user_id, tz_name or "UTC", start, target)
+                doses.extend(new_doses)
+                added.extend((medication.id, dose["scheduled_at"], tz_name or "UTC") for dose in new_doses)
+            if doses:
+                db.execute(insert(MedicationDose), doses)
+            # Bookkeeping, not an edit: keep updated_at (and the /medications ETag) as they were
+            db.execute(
+                update(Medication)
+                .where(Medication.id.in_([row[0].id for row in rows]))
+                .values(doses_until=target, updated_at=Medication.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            AdherenceService.doses_changed(db, added=added)
+            db.commit()
+            written += len(doses)
+            last_id = rows[-1][0].id
+
+
+class DoseHorizonRunner:
+    """Extends the materialized dose horizon once an hour (and at startup)."""
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        horizon: timedelta = timedelta(days=14),
+        interval: timedelta = timedelta(hours=1),
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self.session_factory = session_factory
+        self.horizon = horizon
+        self.interval = interval
+        self.clock = clock
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def run_once(self) -> int:
+        db = self.session_factory()
+        try:
+            return MedicationScheduleService.extend_horizon(db, self.clock(), self.horizon)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def tick(self) -> int:
+        written = await run_in_threadpool(self.run_once)
+        if written:
+            logger.info(f"Materialized {written} medication doses")
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Dose horizon error: {str(e)}")
+            await asyncio.sleep(self.interval.total_seconds())
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,102 @@
+# app/services/page_cache.py
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request, Response
+from fastapi.templating import Jinja2Templates
+
+from app.middleware.compression import HAS_BROTLI, compress_bytes, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedPage:
+    """A rendered template held as bytes, with precompressed variants."""
+    bodies: Dict[str, bytes]  # encoding ("identity", "gzip", "br") -> body
+    etags: Dict[str, str] = field(default_factory=dict)
+    mtime: Optional[float] = None
+
+
+class PageCache:
+    """
+    Render static Jinja templates once and serve them from memory.
+
+    The page routes carry no per-request data, so re-rendering them on every
+    hit is pure waste. Each page is rendered a single time (at startup or on
+    first use), compressed once with gzip/brotli, and served with a strong
+    ETag. With ``auto_reload`` the template file's mtime is checked on each
+    request and the page is re-rendered when it changes.
+    """
+
+    def __init__(self, templates: Jinja2Templates, auto_reload: bool = False):
+        self.templates = templates
+        self.auto_reload = auto_reload
+        self._pages: Dict[str, CachedPage] = {}
+
+    def _template_mtime(self, name: str) -> Optional[float]:
+        template = self.templates.env.get_template(name)
+        if not template.filename:
+            return None
+        try:
+            return os.stat(template.filename).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def render(self, name: str) -> CachedPage:
+        """Render a template and build its encoded variants."""
+        body = self.templates.env.get_template(name).render().encode("utf-8")
+
+        bodies = {"identity": body, "gzip": compress_bytes(body, "gzip", gzip_level=9)}
+        if HAS_BROTLI:
+            bodies["br"] = compress_bytes(body, "br", brotli_quality=11)
+
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        etags = {encoding: f'"{digest}-{encoding}"' for encoding in bodies}
+        page = CachedPage(bodies=bodies, etags=etags, mtime=self._template_mtime(name))
+        self._pages[name] = page
+        return page
+
+    def warm(self, names: Iterable[str]) -> None:
+        """Render all pages up front (called from the app lifespan)."""
+        for name in names:
+            self.render(name)
+        logger.info(f"Pre-rendered {len(self._pages)} pages")
+
+    def get(self, name: str) -> CachedPage:
+        """Return the cached page, rendering it if missing or stale."""
+        page = self._pages.get(name)
+        if page is None:
+            return self.render(name)
+        if self.auto_reload and self._template_mtime(name) != page.mtime:
+            return self.render(name)
+        return page
+
+    def response(self, request: Request, name: str) -> Response:
+        """
+        Serve a cached page, negotiating encoding and honouring If-None-Match.
+        """
+        page = self.get(name)
+        encoding = negotiate_encoding(
+            request.headers.get("accept-encoding", ""),
+            brotli_available="br" in page.bodies,
+        ) or "identity"
+        etag = page.etags[encoding]
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=page.bodies[encoding], media_type="text/html", headers=headers)
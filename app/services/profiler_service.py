@@ -0,0 +1,157 @@
+# app/services/profiler_service.py
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, Optional
+
+MAX_SAMPLE_SECONDS = 60.0
+MIN_INTERVAL_SECONDS = 0.001
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+
+
+class StackSampler:
+    """
+    Low-overhead statistical profiler.
+
+    A background loop snapshots every thread's stack via
+    ``sys._current_frames()`` at a fixed interval and counts identical
+    stacks. Nothing is instrumented, so the cost is paid only by the
+    sampling thread. Output is the "collapsed stack" format understood by
+    flamegraph.pl, speedscope and inferno: ``root;child;leaf <count>``.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = max(interval, MIN_INTERVAL_SECONDS)
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+
+    def _take_sample(self) -> None:
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_id or (self.thread_id is not None and ident != self.thread_id):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.samples[";".join(reversed(stack))] += 1
+        self.sample_count += 1
+
+    def run(self, duration: float) -> str:
+        """
+        Sample for ``duration`` seconds and return collapsed stacks.
+
+        Blocks the calling thread - call it from a worker thread so the
+        event loop keeps serving (and being sampled).
+
+        Raises:
+            ProfilerBusyError: If another sampling run is in progress.
+        """
+        duration = min(max(duration, 0.0), MAX_SAMPLE_SECONDS)
+        if not StackSampler._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A sampling profile is already running")
+        try:
+            deadline = time.perf_counter() + duration
+            while time.perf_counter() < deadline:
+                self._take_sample()
+                time.sleep(self.interval)
+        finally:
+            StackSampler._lock.release()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        """Render the samples, heaviest stacks first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class RequestProfiler:
+    """
+    Deterministic (cProfile) profile of a single request.
+
+    Only one profiler may be active per interpreter, so concurrent
+    profiled requests are refused rather than queued.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.profile: Optional[cProfile.Profile] = None
+        self._acquired = False
+
+    def start(self) -> bool:
+        """Start profiling; returns False if another profile is running."""
+        if not RequestProfiler._lock.acquire(blocking=False):
+            return False
+        self._acquired = True
+        try:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        except ValueError:
+            # Another tool (debugger, coverage) already owns the profiling hook
+            self.profile = None
+            self._release()
+            return False
+        return True
+
+    def stop(self) -> None:
+        if self.profile is not None:
+            self.profile.disable()
+        self._release()
+
+    def _release(self) -> None:
+        if self._acquired:
+            self._acquired = False
+            RequestProfiler._lock.release()
+
+    def report(self, limit: int = 60, sort: str = "cumulative") -> str:
+        """Render the top functions as pstats text."""
+        if self.profile is None:
+            return ""
+        buffer = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=buffer)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return buffer.getvalue()
+
+
+class ProfileStore:
+    """Bounded in-memory store of recent per-request profile reports."""
+
+    def __init__(self, max_entries: int = 20):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, method: str, path: str, report: str) -> str:
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[profile_id] = {"method": method, "path": path, "report": report}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            return self._entries.get(profile_id)
+
+
+profile_store = ProfileStore()
@@ -0,0 +1,251 @@
+# app/services/rate_limiter.py
+
+import logging
+import math
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models.rate_limit_bucket import RateLimitBucket
+from app.services.metrics_service import registry
+from app.services.rollup_service import _dialect_name
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Attempts at the compare-and-swap update before a shared bucket gives up
+CAS_ATTEMPTS = 5
+
+rate_limited_total = registry.counter(
+    "rate_limited_requests_total", "Requests rejected with 429, by route group and limit scope.",
+    ("group", "scope"),
+)
+
+
+@dataclass(frozen=True)
+class Rate:
+    """A token bucket: holds up to ``capacity`` tokens, refilled at ``per_second``."""
+    capacity: float
+    per_second: float
+
+
+def parse_rate(spec: Optional[str]) -> Optional[Rate]:
+    """
+    "20/minute" -> a bucket of 20 refilled over a minute; "" or "off" -> no limit.
+
+    Raises:
+        ValueError: Not "<count>/<second|minute|hour|day>"
+    """
+    if spec is None or spec.strip().lower() in ("", "off", "none", "0"):
+        return None
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*/\s*(second|minute|hour|day)\s*", spec.lower())
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"Invalid rate limit {spec!r}; expected e.g. '20/minute'")
+    count = float(match.group(1))
+    return Rate(count, count / PERIODS[match.group(2)])
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: float
+    retry_after: float = 0.0  # seconds until ``cost`` tokens are available again
+
+
+def _take(tokens: float, elapsed: float, rate: Rate, cost: float) -> Tuple[float, RateLimitResult]:
+    """Refill for ``elapsed`` seconds, then spend ``cost`` if there is enough."""
+    tokens = min(rate.capacity, tokens + max(0.0, elapsed) * rate.per_second)
+    if tokens >= cost:
+        return tokens - cost, RateLimitResult(True, tokens - cost)
+    return tokens, RateLimitResult(False, tokens, (cost - tokens) / rate.per_second)
+
+
+class RateLimitStore(ABC):
+    """
+    Where token buckets live.
+
+    The in-memory store limits each process on its own; with several workers
+    or nodes plug in a shared store (DatabaseRateLimitStore, or Redis with a
+    Lua script) by implementing ``acquire``.
+    """
+
+    @abstractmethod
+    def acquire(self, key: str, rate: Rate, cost: float = 1.0) -> RateLimitResult:
+        """Spend ``cost`` tokens from the bucket ``key`` if it has them."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget every bucket."""
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Buckets in a dict, least recently used dropped past ``max_keys`` (a dropped bucket starts full)."""
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str, rate: Rate, cost: float = 1.0) -> RateLimitResult:
+        now = self.clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (rate.capacity, now))
+            tokens, result = _take(tokens, now - updated_at, rate, cost)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseRateLimitStore(RateLimitStore):
+    """
+    Buckets in the rate_limit_buckets table, shared by every process using the database.
+
+    Like the outbox lease, each update is a compare-and-swap on the balance
+    and ``updated_at`` just read, so concurrent requests never spend the same
+    token; a request that keeps losing the race is let through rather than
+    failed.
+    """
+
+    def __init__(self, session_factory, clock: Callable[[], float] = time.time):
+        self.session_factory = session_factory
+        self.clock = clock
+
+    def acquire(self, key: str, rate: Rate, cost: float = 1.0) -> RateLimitResult:
+        db = self.session_factory()
+        try:
+            insert_fn = postgresql_insert if _dialect_name(db) == "postgresql" else sqlite_insert
+            db.execute(
+                insert_fn(RateLimitBucket)
+                .values(key=key, tokens=rate.capacity, updated_at=self.clock())
+                .on_conflict_do_nothing(index_elements=[RateLimitBucket.key])
+            )
+            db.commit()
+            for _ in range(CAS_ATTEMPTS):
+                seen_tokens, seen_at = db.execute(
+                    select(RateLimitBucket.tokens, RateLimitBucket.updated_at).where(RateLimitBucket.key == key)
+                ).one()
+                now = max(self.clock(), seen_at)
+                tokens, result = _take(seen_tokens, now - seen_at, rate, cost)
+                swapped = db.execute(
+                    update(RateLimitBucket)
+                    .where(RateLimitBucket.key == key, RateLimitBucket.updated_at == seen_at,
+                           RateLimitBucket.tokens == seen_tokens)
+                    .values(tokens=tokens, updated_at=now)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                db.commit()
+                if swapped:
+                    return result
+            logger.warning(f"Rate limit bucket {key} stayed contended; allowing the request")
+            return RateLimitResult(True, 0.0)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def reset(self) -> None:
+        db = self.session_factory()
+        try:
+            db.query(RateLimitBucket).delete()
+            db.commit()
+        finally:
+            db.close()
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    scope: str  # "user", "client" or "global"
+    rate: Rate
+
+
+class RateLimitExceeded(Exception):
+    """A request is over one of its group's limits."""
+
+    def __init__(self, group: str, scope: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {group} ({scope})")
+        self.group = group
+        self.scope = scope
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Whole seconds for the Retry-After header (never 0, or clients retry immediately)."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimiter:
+    """
+    Token-bucket limits per route group.
+
+    Each group has rules for its scopes: "user" and "client" (IP address)
+    buckets are per subject, the "global" bucket is shared by everyone and
+    caps the group as a whole. Rules are checked narrowest first, so a
+    client that is over its own limit does not drain the global bucket.
+    """
+
+    def __init__(self, store: RateLimitStore, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self.groups: Dict[str, List[RateLimitRule]] = {}
+
+    def configure(self, group: str, rates: Dict[str, Optional[str]]) -> None:
+        """``configure("ai", {"user": "20/minute", "global": "600/minute"})``; empty rates are not limited."""
+        rules = [RateLimitRule(scope, parse_rate(spec)) for scope, spec in rates.items()]
+        self.groups[group] = sorted(
+            (rule for rule in rules if rule.rate is not None), key=lambda rule: rule.scope == "global"
+        )
+
+    def hit(self, group: str, cost: float = 1.0, **subjects: str) -> None:
+        """
+        Spend ``cost`` from each of the group's buckets.
+
+        Args:
+            group: Configured route group
+            cost: Tokens the request is worth
+            subjects: Subject per scope, e.g. ``user="42"`` or ``client="203.0.113.9"``
+
+        Raises:
+            RateLimitExceeded: With the seconds until the exhausted bucket allows the request
+        """
+        if not self.enabled:
+            return
+        for rule in self.groups.get(group, ()):
+            subject = "*" if rule.scope == "global" else subjects.get(rule.scope)
+            if subject is None:
+                continue
+            result = self.store.acquire(f"{group}:{rule.scope}:{subject}", rule.rate, cost)
+            if not result.allowed:
+                rate_limited_total.inc(group=group, scope=rule.scope)
+                raise RateLimitExceeded(group, rule.scope, result.retry_after)
+
+
+def create_rate_limit_store(name: str, session_factory=None) -> RateLimitStore:
+    """Store selected by the RATE_LIMIT_BACKEND setting."""
+    if name == "memory":
+        return InMemoryRateLimitStore()
+    if name == "database":
+        if session_factory is None:
+            from app.database import SessionLocal
+            session_factory = SessionLocal
+        return DatabaseRateLimitStore(session_factory)
+    raise ValueError(f"Unknown rate limit backend: {name}")
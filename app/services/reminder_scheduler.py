@@ -0,0 +1,309 @@
+# app/services/reminder_scheduler.py
+
+import asyncio
+import heapq
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, select, update
+
+from app.models.notification import Notification
+from app.models.pet import Pet
+from app.models.reminder import Reminder
+from app.models.user import User
+from app.services.email_outbox import EmailOutboxService
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Reminder dates are stored as naive UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@dataclass
+class DueReminder:
+    """A claimed reminder, with what the email needs."""
+    reminder_id: int
+    notification_id: int
+    user_id: uuid.UUID
+    email: str
+    first_name: str
+    title: str
+    description: Optional[str]
+    reminder_type: str
+    reminder_date: datetime
+    pet_name: Optional[str]
+
+
+class ReminderScheduler:
+    """
+    In-process scheduler that fires reminders when their reminder_date passes.
+
+    Pending reminders due within ``horizon`` are kept in a min-heap keyed by
+    reminder_date; the loop sleeps until the earliest one (or until a handler
+    schedules an earlier one). The heap is refilled from the database every
+    ``refill_interval`` so reminders created on other replicas are picked up.
+
+    Before dispatching, a worker claims reminders with a conditional UPDATE
+    that sets lease_owner/lease_expires_at. Only unclaimed (or expired) leases
+    can be taken, so with several replicas each reminder is fired by one
+    worker; a worker that dies mid-batch loses its lease after
+    ``lease_seconds`` and the reminders are retried.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        batch_size: int = 100,
+        lease_seconds: int = 120,
+        refill_interval: timedelta = timedelta(minutes=5),
+        grace: timedelta = timedelta(hours=24),
+        clock: Callable[[], datetime] = datetime.utcnow,
+        event_broker=None,
+        email_outbox=None
+    ):
+        self.session_factory = session_factory
+        # Optional EventBroker; open pages are told about new notifications
+        self.event_broker = event_broker
+        # Optional EmailOutboxWorker, woken once a batch's emails are queued
+        self.email_outbox = email_outbox
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=lease_seconds)
+        self.refill_interval = refill_interval
+        # Reminders further in the future are left to a later refill
+        self.horizon = refill_interval * 2
+        # Reminders overdue by more than this (e.g. while the app was down) are skipped
+        self.grace = grace
+        self.clock = clock
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[:64]
+
+        self._heap: List[Tuple[datetime, int]] = []
+        # reminder_id -> scheduled time; heap entries that disagree are stale
+        self._entries: Dict[int, datetime] = {}
+        self._horizon_end: Optional[datetime] = None
+        self._next_refill: Optional[datetime] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---- heap maintenance (event loop only) ----
+
+    def schedule(self, reminder_id: int, when: datetime) -> None:
+        """Add or move a reminder; called by the reminder handlers after commit."""
+        if self._horizon_end is None:
+            return  # not started
+        when = _naive_utc(when)
+        if when > self._horizon_end:
+            self._entries.pop(reminder_id, None)
+            return
+        if self._entries.get(reminder_id) == when:
+            return
+        self._entries[reminder_id] = when
+        heapq.heappush(self._heap, (when, reminder_id))
+        if self._wake is not None and self._heap[0] == (when, reminder_id):
+            self._wake.set()
+
+    def unschedule(self, reminder_id: int) -> None:
+        """Forget a deleted/completed reminder (its heap entry is skipped lazily)."""
+        self._entries.pop(reminder_id, None)
+
+    def pop_due(self, now: datetime, limit: int) -> List[int]:
+        """Remove and return up to ``limit`` reminder ids due at ``now``."""
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < limit:
+            when, reminder_id = heapq.heappop(self._heap)
+            if self._entries.get(reminder_id) == when:
+                del self._entries[reminder_id]
+                due.append(reminder_id)
+        return due
+
+    def next_due(self) -> Optional[datetime]:
+        while self._heap and self._entries.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    # ---- database work (threadpool) ----
+
+    def _load_upcoming(self, now: datetime) -> List[Tuple[int, datetime]]:
+        db = self.session_factory()
+        try:
+            return [
+                (row.id, row.reminder_date)
+                for row in db.execute(
+                    select(Reminder.id, Reminder.reminder_date).where(
+                        Reminder.notified_at.is_(None),
+                        Reminder.is_completed.is_(False),
+                        Reminder.reminder_date >= now - self.grace,
+                        Reminder.reminder_date <= now + self.horizon,
+                        or_(Reminder.lease_expires_at.is_(None), Reminder.lease_expires_at < now),
+                    ).order_by(Reminder.reminder_date)
+                )
+            ]
+        finally:
+            db.close()
+
+    def claim(self, reminder_ids: List[int], now: datetime) -> List[DueReminder]:
+        """
+        Lease the given reminders, record their in-app notifications, queue
+        their emails in the outbox and mark them notified (one transaction).
+
+        Returns:
+            list: The reminders this worker won
+        """
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(Reminder).where(
+                    Reminder.id.in_(reminder_ids),
+                    Reminder.notified_at.is_(None),
+                    Reminder.is_completed.is_(False),
+                    Reminder.reminder_date <= now,
+                    or_(Reminder.lease_expires_at.is_(None), Reminder.lease_expires_at < now),
+                ).values(lease_owner=self.worker_id, lease_expires_at=now + self.lease)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+            rows = db.execute(
+                select(Reminder, User.email, User.first_name, Pet.name)
+                .join(User, Reminder.user_id == User.id)
+                .outerjoin(Pet, Reminder.pet_id == Pet.id)
+                .where(Reminder.id.in_(reminder_ids), Reminder.lease_owner == self.worker_id,
+                       Reminder.notified_at.is_(None))
+            ).all()
+
+            claimed = []
+            for reminder, email, first_name, pet_name in rows:
+                body = reminder.description or (f"{reminder.reminder_type.capitalize()} for {pet_name}"
+                                                if pet_name else reminder.reminder_type.capitalize())
+                notification = Notification(
+                    user_id=reminder.user_id, reminder_id=reminder.id, kind="reminder",
+                    title=reminder.title, body=body, created_at=now,
+                )
+                db.add(notification)
+                subject, html_content, text_content = EmailService.create_reminder_email(
+                    first_name, reminder.title, reminder.description, reminder.reminder_date, pet_name
+                )
+                EmailOutboxService.enqueue(db, email, subject, html_content, text_content)
+                reminder.notified_at = now
+                reminder.lease_owner = None
+                reminder.lease_expires_at = None
+                claimed.append((notification, reminder, email, first_name, pet_name))
+            db.flush()
+            due = [
+                DueReminder(
+                    reminder_id=reminder.id, notification_id=notification.id, user_id=reminder.user_id, email=email,
+                    first_name=first_name, title=reminder.title, description=reminder.description,
+                    reminder_type=reminder.reminder_type, reminder_date=reminder.reminder_date,
+                    pet_name=pet_name,
+                )
+                for notification, reminder, email, first_name, pet_name in claimed
+            ]
+            db.commit()
+            return due
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # ---- loop ----
+
+    async def refill(self) -> None:
+        now = self.clock()
+        self._horizon_end = now + self.horizon
+        self._next_refill = now + self.refill_interval
+        for reminder_id, when in await run_in_threadpool(self._load_upcoming, now):
+            self.schedule(reminder_id, when)
+
+    async def dispatch(self, reminder_ids: List[int]) -> List[DueReminder]:
+        """Claim a batch, announce its notifications and wake the email outbox."""
+        due = await run_in_threadpool(self.claim, reminder_ids, self.clock())
+        if self.event_broker is not None:
+            for reminder in due:
+                await self.event_broker.publish(reminder.user_id, {
+                    "resource": "notification", "action": "created", "id": reminder.notification_id,
+                    "reminder_id": reminder.reminder_id,
+                })
+        if due and self.email_outbox is not None:
+            self.email_outbox.notify()
+        if due:
+            logger.info(f"Fired {len(due)} of {len(reminder_ids)} due reminders")
+        return due
+
+    async def tick(self) -> Optional[float]:
+        """
+        One scheduler step: refill if needed, fire one due batch.
+
+        Returns:
+            Seconds until the next step is needed, or None to run again at once
+        """
+        now = self.clock()
+        if self._next_refill is None or now >= self._next_refill:
+            await self.refill()
+            now = self.clock()
+        due = self.pop_due(now, self.batch_size)
+        if due:
+            await self.dispatch(due)
+            return None
+        wake_at = self._next_refill
+        next_due = self.next_due()
+        if next_due is not None and next_due < wake_at:
+            wake_at = next_due
+        return max(0.0, (wake_at - now).total_seconds())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                delay = await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Reminder scheduler error: {str(e)}")
+                delay = 5.0
+            if delay is None:
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        # Accept schedule() calls right away; the first tick refills from the DB
+        self._horizon_end = self.clock() + self.horizon
+        self._next_refill = None
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Reminder scheduler started ({self.worker_id})")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._horizon_end = None
+        self._heap.clear()
+        self._entries.clear()
@@ -0,0 +1,266 @@
+# app/services/rollup_service.py
+
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, cast, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.activity import Activity
+from app.models.pet_activity_daily import PetActivityDaily
+
+# (pet_id, day, activity_type) -> [count, total_duration, total_distance]
+RollupKey = Tuple[int, date, str]
+RollupDeltas = Dict[RollupKey, List[float]]
+
+# Float sums drift slightly under repeated add/subtract
+DISTANCE_TOLERANCE = 1e-6
+
+
+def _dialect_name(db) -> str:
+    bind = db.get_bind() if isinstance(db, Session) else db
+    return bind.dialect.name
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Activity, medication and dose times are stored as naive UTC; handlers
+    normalize input with this before writing, so the incremental rollup and a
+    rebuild (which buckets the stored value) put an activity on the same day,
+    and client timestamps with an offset compare with ``utcnow()``.
+    """
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _day(value: datetime) -> date:
+    if not isinstance(value, datetime):
+        return value
+    return naive_utc(value).date()
+
+
+def _day_expression(dialect_name: str):
+    # CAST(... AS DATE) has numeric affinity on SQLite, date() returns 'YYYY-MM-DD'
+    if dialect_name == "sqlite":
+        return func.date(Activity.activity_date)
+    return cast(Activity.activity_date, Date)
+
+
+class ActivityRollupService:
+    """Service for keeping pet_activity_daily in step with the activities table."""
+
+    @staticmethod
+    def contribution(activity) -> Tuple[RollupKey, List[float]]:
+        """The rollup key and [count, duration, distance] one activity adds."""
+        key = (activity.pet_id, _day(activity.activity_date), activity.activity_type)
+        return key, [1, activity.duration or 0, activity.distance or 0.0]
+
+    @staticmethod
+    def apply(db, deltas: RollupDeltas) -> None:
+        """
+        Add (or, with negative values, subtract) totals in one upsert.
+
+        Rows that drop to zero activities are deleted. Runs in the caller's
+        transaction, so the rollup commits or rolls back with the activity write.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+
+        dialect_name = _dialect_name(db)
+        insert_fn = postgresql_insert if dialect_name == "postgresql" else sqlite_insert
+        stmt = insert_fn(PetActivityDaily).values([
+            {
+                "pet_id": pet_id, "day": day, "activity_type": activity_type,
+                "count": int(count), "total_duration": int(duration), "total_distance": float(distance),
+            }
+            for (pet_id, day, activity_type), (count, duration, distance) in deltas.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PetActivityDaily.pet_id, PetActivityDaily.day, PetActivityDaily.activity_type],
+            set_={
+                "count": PetActivityDaily.count + stmt.excluded.count,
+                "total_duration": PetActivityDaily.total_duration + stmt.excluded.total_duration,
+                "total_distance": PetActivityDaily.total_distance + stmt.excluded.total_distance,
+            }
+        )
+        db.execute(stmt)
+
+        if any(delta[0] < 0 for delta in deltas.values()):
+            db.execute(
+                delete(PetActivityDaily).where(
+                    PetActivityDaily.pet_id.in_({key[0] for key in deltas}),
+                    PetActivityDaily.count <= 0
+                )
+            )
+
+    @staticmethod
+    def add(db, activities: Iterable) -> None:
+        """Count new activities (ORM objects or anything with the same attributes)."""
+        deltas: RollupDeltas = defaultdict(lambda: [0, 0, 0.0])
+        for activity in activities:
+            key, values = ActivityRollupService.contribution(activity)
+            for i, value in enumerate(values):
+                deltas[key][i] += value
+        ActivityRollupService.apply(db, deltas)
+
+    @staticmethod
+    def remove(db, activity) -> None:
+        """Take a deleted activity back out."""
+        key, values = ActivityRollupService.contribution(activity)
+        ActivityRollupService.apply(db, {key: [-value for value in values]})
+
+    @staticmethod
+    def replace(db, before: Tuple[RollupKey, List[float]], activity) -> None:
+        """
+        Move an edited activity's totals.
+
+        Args:
+            db: Database session
+            before: contribution() captured before the edit
+            activity: The edited activity
+        """
+        deltas: RollupDeltas = defaultdict(lambda: [0, 0, 0.0])
+        old_key, old_values = before
+        new_key, new_values = ActivityRollupService.contribution(activity)
+        for i, value in enumerate(old_values):
+            deltas[old_key][i] -= value
+        for i, value in enumerate(new_values):
+            deltas[new_key][i] += value
+        ActivityRollupService.apply(db, deltas)
+
+    @staticmethod
+    def aggregate_query(db, pet_ids: Optional[Iterable[int]] = None):
+        """GROUP BY over the raw activities, shaped like pet_activity_daily."""
+        day = _day_expression(_dialect_name(db))
+        stmt = select(
+            Activity.pet_id,
+            day.label("day"),
+            Activity.activity_type,
+            func.count().label("count"),
+            func.coalesce(func.sum(Activity.duration), 0).label("total_duration"),
+            func.coalesce(func.sum(Activity.distance), 0.0).label("total_distance"),
+        ).group_by(Activity.pet_id, day, Activity.activity_type)
+        if pet_ids is not None:
+            stmt = stmt.where(Activity.pet_id.in_(list(pet_ids)))
+        return stmt
+
+    @staticmethod
+    def rebuild(db, pet_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recompute the rollup from the activities table (backfill / repair).
+
+        Args:
+            db: Session or Connection; the caller commits
+            pet_ids: Only these pets (default: everything)
+
+        Returns:
+            int: Rollup rows written
+        """
+        pet_ids = list(pet_ids) if pet_ids is not None else None
+        clear = delete(PetActivityDaily)
+        if pet_ids is not None:
+            clear = clear.where(PetActivityDaily.pet_id.in_(pet_ids))
+        db.execute(clear)
+
+        source = ActivityRollupService.aggregate_query(db, pet_ids)
+        db.execute(
+            insert(PetActivityDaily).from_select(
+                ["pet_id", "day", "activity_type", "count", "total_duration", "total_distance"], source
+            )
+        )
+        count = select(func.count()).select_from(PetActivityDaily)
+        if pet_ids is not None:
+            count = count.where(PetActivityDaily.pet_id.in_(pet_ids))
+        return db.execute(count).scalar_one()
+
+    @staticmethod
+    def check(db, pet_ids: Optional[Iterable[int]] = None) -> List[dict]:
+        """
+        Compare the rollup with a fresh aggregate of the activities table.
+
+        Returns:
+            list: One entry per mismatching (pet_id, day, activity_type), with
+            the expected and stored (count, total_duration, total_distance);
+            missing rows are reported as None
+        """
+        pet_ids = list(pet_ids) if pet_ids is not None else None
+        expected = {}
+        for row in db.execute(ActivityRollupService.aggregate_query(db, pet_ids)):
+            day = row.day if isinstance(row.day, date) else date.fromisoformat(row.day)
+            expected[(row.pet_id, day, row.activity_type)] = (
+                row.count, int(row.total_duration), float(row.total_distance)
+            )
+
+        stored_query = select(
+            PetActivityDaily.pet_id, PetActivityDaily.day, PetActivityDaily.activity_type,
+            PetActivityDaily.count, PetActivityDaily.total_duration, PetActivityDaily.total_distance,
+        )
+        if pet_ids is not None:
+            stored_query = stored_query.where(PetActivityDaily.pet_id.in_(pet_ids))
+        stored = {
+            (row.pet_id, row.day, row.activity_type): (row.count, row.total_duration, row.total_distance)
+            for row in db.execute(stored_query)
+        }
+
+        mismatches = []
+        for key in sorted(expected.keys() | stored.keys()):
+            want, have = expected.get(key), stored.get(key)
+            if want and have and want[:2] == have[:2] and abs(want[2] - have[2]) <= DISTANCE_TOLERANCE:
+                continue
+            pet_id, day, activity_type = key
+            mismatches.append({
+                "pet_id": pet_id, "day": day, "activity_type": activity_type,
+                "expected": want, "stored": have,
+            })
+        return mismatches
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """
+    python -m app.services.rollup_service rebuild [--pet-id N ...]
+    python -m app.services.rollup_service check [--pet-id N ...] [--repair]
+    """
+    parser = argparse.ArgumentParser(description="Maintain the pet_activity_daily rollup")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--pet-id", type=int, action="append", help="Limit to a pet (repeatable)")
+    parser.add_argument("--repair", action="store_true", help="check: rebuild the pets that mismatch")
+    args = parser.parse_args(argv)
+
+    from app.database import Base, SessionLocal, engine
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rows = ActivityRollupService.rebuild(db, args.pet_id)
+            db.commit()
+            print(f"Rebuilt pet_activity_daily: {rows} rows")
+            return 0
+
+        mismatches = ActivityRollupService.check(db, args.pet_id)
+        for mismatch in mismatches[:50]:
+            print(f"pet {mismatch['pet_id']} {mismatch['day']} {mismatch['activity_type']}: "
+                  f"expected {mismatch['expected']}, stored {mismatch['stored']}")
+        if not mismatches:
+            print("pet_activity_daily is consistent")
+            return 0
+        print(f"{len(mismatches)} mismatching rows", file=sys.stderr)
+        if args.repair:
+            ActivityRollupService.rebuild(db, {mismatch["pet_id"] for mismatch in mismatches})
+            db.commit()
+            print("Repaired")
+            return 0
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # pragma: no cover
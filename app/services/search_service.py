@@ -0,0 +1,384 @@
+# app/services/search_service.py
+
+import argparse
+import heapq
+import html
+import math
+import re
+import sys
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import bindparam, func, literal_column, select, text, union_all
+
+from app.models.activity import Activity
+from app.models.medication import Medication
+from app.models.pet import Pet
+from app.models.search_vector import SEARCH_CONFIG, SEARCH_VECTORS, search_vector_ddl
+from app.services.rollup_service import _dialect_name
+
+SEARCH_TYPES = ("activity", "medication", "pet")
+
+# Highlight markers; the text is HTML-escaped around them before they become <mark> tags
+_START, _STOP = "\x01", "\x02"
+HEADLINE_OPTIONS = f"StartSel={_START}, StopSel={_STOP}, MaxWords=30, MinWords=12, MaxFragments=2"
+
+# Field weights of the in-memory index, after PostgreSQL's default {D, C, B, A} = {0.1, 0.2, 0.4, 1.0}
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2}
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_QUERY_TERM = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+@dataclass
+class SearchHit:
+    type: str  # activity, medication, pet
+    id: int
+    pet_id: int
+    pet_name: str
+    title: str
+    highlight: str  # HTML-escaped excerpt with matches in <mark>
+    rank: float
+    date: Optional[datetime] = None
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """A light English suffix stripper, so "vomiting" finds "vomited" (PostgreSQL's english config stems too)."""
+    for suffix in ("ingly", "edly", "ing", "ies", "ied", "ed", "es", "ly", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            if suffix in ("ies", "ied"):
+                word += "y"
+            break
+    return word
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return [stem(word) for word in _WORD.findall((value or "").lower()) if word not in _STOPWORDS]
+
+
+def parse_query(query: str) -> Tuple[List[List[str]], List[str]]:
+    """
+    Web-search style query: words are ANDed, "quoted phrases" must be adjacent, -word excludes.
+
+    Returns:
+        tuple: (required phrases as token lists, excluded tokens)
+    """
+    required, excluded = [], []
+    for match in _QUERY_TERM.finditer(query):
+        negate = match.group(1) or match.group(3)
+        tokens = tokenize(match.group(2) if match.group(2) is not None else match.group(4))
+        if not tokens:
+            continue
+        if negate:
+            excluded.extend(tokens)
+        else:
+            required.append(tokens)
+    return required, excluded
+
+
+def highlight(value: str, terms: Set[str], max_words: int = 30) -> str:
+    """Escaped excerpt around the first match with matching words in <mark>."""
+    words = list(_WORD.finditer(value))
+    hits = [i for i, word in enumerate(words) if stem(word.group(0).lower()) in terms]
+    if not words:
+        return html.escape(value)
+    first = max(0, (hits[0] if hits else 0) - max_words // 3)
+    last = min(len(words), first + max_words)
+    start = words[first].start() if first else 0
+    end = words[last - 1].end() if last < len(words) else len(value)
+    parts, position = [], start
+    for i in hits:
+        if first <= i < last:
+            parts.append(html.escape(value[position:words[i].start()]))
+            parts.append(f"<mark>{html.escape(words[i].group(0))}</mark>")
+            position = words[i].end()
+    parts.append(html.escape(value[position:end]))
+    return ("…" if first else "") + "".join(parts) + ("…" if last < len(words) else "")
+
+
+def _marks_to_html(value: Optional[str]) -> str:
+    return html.escape(value or "").replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+# ---- in-memory fallback ----
+
+# (type, id)
+Document = Tuple[str, int]
+
+
+class InvertedIndex:
+    """
+    Token -> postings index over one user's activities, medications and pets.
+
+    Used where the database has no full-text search (SQLite in development).
+    Postings hold the weighted term frequency and the positions (for phrases);
+    scoring is tf-idf with the same A/B/C field weights as the tsvector columns.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[Document, List]] = defaultdict(dict)  # token -> doc -> [score, positions]
+        self.documents: Dict[Document, dict] = {}
+
+    def add(self, doc: Document, fields: Sequence[Tuple[Optional[str], str]], meta: dict) -> None:
+        self.documents[doc] = {"fields": fields, **meta}
+        position = 0
+        for value, weight in fields:
+            for token in tokenize(value):
+                posting = self.postings[token].setdefault(doc, [0.0, []])
+                posting[0] += WEIGHTS[weight]
+                posting[1].append(position)
+                position += 1
+            position += 1  # phrases do not span fields
+
+    def _phrase_docs(self, tokens: List[str]) -> Dict[Document, float]:
+        first = self.postings.get(tokens[0], {})
+        matches = {}
+        for doc, (score, positions) in first.items():
+            total = score
+            starts = set(positions)
+            for offset, token in enumerate(tokens[1:], start=1):
+                posting = self.postings.get(token, {}).get(doc)
+                if posting is None:
+                    starts = set()
+                    break
+                starts &= {p - offset for p in posting[1]}
+                total += posting[0]
+            if starts:
+                matches[doc] = total
+        return matches
+
+    def search(self, query: str, types: Iterable[str], pet_id: Optional[int], limit: int) -> List[SearchHit]:
+        required, excluded = parse_query(query)
+        if not required:
+            return []
+        types = set(types)
+        scores: Optional[Dict[Document, float]] = None
+        size = max(1, len(self.documents))
+        for tokens in sorted(required, key=lambda phrase: len(self.postings.get(phrase[0], ()))):
+            matches = self._phrase_docs(tokens)
+            idf = math.log(1 + size / (1 + len(matches)))
+            if scores is None:
+                scores = {doc: score * idf for doc, score in matches.items()}
+            else:
+                scores = {doc: scores[doc] + score * idf for doc, score in matches.items() if doc in scores}
+            if not scores:
+                return []
+        for token in excluded:
+            for doc in self.postings.get(token, {}):
+                scores.pop(doc, None)
+
+        terms = {token for phrase in required for token in phrase}
+        ranked = heapq.nsmallest(
+            limit,
+            (doc for doc in scores
+             if doc[0] in types and (pet_id is None or self.documents[doc]["pet_id"] == pet_id)),
+            key=lambda doc: (-scores[doc], doc),
+        )
+        hits = []
+        for doc in ranked:
+            meta = self.documents[doc]
+            # Excerpt from the best-weighted field that matched
+            best = next(
+                (value for value, _ in sorted(meta["fields"], key=lambda field: -WEIGHTS[field[1]])
+                 if value and terms & set(tokenize(value))),
+                meta["title"],
+            )
+            hits.append(SearchHit(
+                type=doc[0], id=doc[1], pet_id=meta["pet_id"], pet_name=meta["pet_name"], title=meta["title"],
+                highlight=highlight(best, terms), rank=round(scores[doc], 6), date=meta["date"],
+            ))
+        return hits
+
+
+class InMemorySearch:
+    """
+    Per-user InvertedIndex cache.
+
+    An index is rebuilt when the user's data fingerprint (row counts and
+    latest updated_at of the three tables) changes, so writes need no hooks;
+    unchanged data is searched without touching the text columns again.
+    """
+
+    def __init__(self, max_users: int = 256):
+        self.max_users = max_users
+        self._indexes: Dict = {}  # user_id -> (fingerprint, InvertedIndex)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(db, user_id) -> Tuple:
+        parts = []
+        for model, scope in ((Activity, Activity.pet_id), (Medication, Medication.pet_id), (Pet, Pet.id)):
+            pet_ids = select(Pet.id).where(Pet.user_id == user_id).scalar_subquery()
+            parts.extend(db.execute(
+                select(func.count(), func.max(model.updated_at)).where(scope.in_(pet_ids))
+            ).one())
+        return tuple(parts)
+
+    @staticmethod
+    def build(db, user_id) -> InvertedIndex:
+        index = InvertedIndex()
+        pets = {
+            pet.id: pet
+            for pet in db.execute(select(Pet.id, Pet.name, Pet.medical_notes, Pet.created_at)
+                                  .where(Pet.user_id == user_id))
+        }
+        for pet in pets.values():
+            if pet.medical_notes:
+                index.add(("pet", pet.id), [(pet.medical_notes, "B")],
+                          {"pet_id": pet.id, "pet_name": pet.name, "title": pet.name, "date": pet.created_at})
+        for row in db.execute(select(Activity.id, Activity.pet_id, Activity.title, Activity.description,
+                                     Activity.notes, Activity.activity_date)
+                              .where(Activity.pet_id.in_(list(pets)))):
+            index.add(("activity", row.id), [(row.title, "A"), (row.description, "B"), (row.notes, "C")],
+                      {"pet_id": row.pet_id, "pet_name": pets[row.pet_id].name, "title": row.title,
+                       "date": row.activity_date})
+        for row in db.execute(select(Medication.id, Medication.pet_id, Medication.name, Medication.reason,
+                                     Medication.notes, Medication.start_date)
+                              .where(Medication.pet_id.in_(list(pets)))):
+            index.add(("medication", row.id), [(row.name, "A"), (row.reason, "B"), (row.notes, "C")],
+                      {"pet_id": row.pet_id, "pet_name": pets[row.pet_id].name, "title": row.name,
+                       "date": row.start_date})
+        return index
+
+    def index_for(self, db, user_id) -> InvertedIndex:
+        fingerprint = self.fingerprint(db, user_id)
+        with self._lock:
+            cached = self._indexes.get(user_id)
+            if cached and cached[0] == fingerprint:
+                return cached[1]
+        index = self.build(db, user_id)
+        with self._lock:
+            if len(self._indexes) >= self.max_users and user_id not in self._indexes:
+                self._indexes.pop(next(iter(self._indexes)))
+            self._indexes[user_id] = (fingerprint, index)
+        return index
+
+    def search(self, db, user_id, query: str, types: Iterable[str], pet_id: Optional[int], limit: int) -> List[SearchHit]:
+        return self.index_for(db, user_id).search(query, types, pet_id, limit)
+
+
+memory_search = InMemorySearch()
+
+
+# ---- PostgreSQL ----
+
+def _postgres_search(db, user_id, query: str, types: Iterable[str], pet_id: Optional[int], limit: int) -> List[SearchHit]:
+    """
+    GIN-indexed tsvector match per table, ranked with ts_rank_cd.
+
+    Only the top ``limit`` rows are given a ts_headline (the expensive part).
+    """
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), bindparam("q", query))
+    sources = {
+        "activity": (Activity, Activity.id, Activity.pet_id, Activity.title, Activity.activity_date,
+                     func.concat_ws(" ", Activity.title, Activity.description, Activity.notes)),
+        "medication": (Medication, Medication.id, Medication.pet_id, Medication.name, Medication.start_date,
+                       func.concat_ws(" ", Medication.name, Medication.reason, Medication.notes)),
+        "pet": (Pet, Pet.id, Pet.id, Pet.name, Pet.created_at, Pet.medical_notes),
+    }
+    selects = []
+    for kind in types:
+        model, id_column, pet_column, title, date, body = sources[kind]
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        stmt = (
+            select(literal_column(f"'{kind}'").label("type"), id_column.label("id"), pet_column.label("pet_id"),
+                   Pet.name.label("pet_name"), title.label("title"), date.label("date"), body.label("body"),
+                   func.ts_rank_cd(vector, tsquery).label("rank"))
+            .where(vector.op("@@")(tsquery), Pet.user_id == user_id)
+        )
+        if model is not Pet:
+            stmt = stmt.join(Pet, pet_column == Pet.id)
+        if pet_id is not None:
+            stmt = stmt.where(pet_column == pet_id)
+        selects.append(stmt)
+    if not selects:
+        return []
+    matches = union_all(*selects).subquery("matches")
+    best = select(matches).order_by(matches.c.rank.desc(), matches.c.type, matches.c.id).limit(limit).subquery("best")
+    rows = db.execute(
+        select(best.c.type, best.c.id, best.c.pet_id, best.c.pet_name, best.c.title, best.c.date, best.c.rank,
+               func.ts_headline(literal_column(f"'{SEARCH_CONFIG}'"), best.c.body, tsquery,
+                                bindparam("options", HEADLINE_OPTIONS)).label("headline"))
+        .order_by(best.c.rank.desc(), best.c.type, best.c.id)
+    ).all()
+    return [
+        SearchHit(type=row.type, id=row.id, pet_id=row.pet_id, pet_name=row.pet_name, title=row.title,
+                  highlight=_marks_to_html(row.headline), rank=round(float(row.rank), 6), date=row.date)
+        for row in rows
+    ]
+
+
+class SearchService:
+    """
+    Service for full-text search over a user's activities, medications and pet medical notes.
+
+    PostgreSQL uses the generated, GIN-indexed search_vector columns; other
+    databases fall back to an in-memory inverted index per user.
+    """
+
+    @staticmethod
+    def search(
+        db,
+        user_id,
+        query: str,
+        types: Optional[Iterable[str]] = None,
+        pet_id: Optional[int] = None,
+        limit: int = 20
+    ) -> List[SearchHit]:
+        """
+        Best matches first.
+
+        Args:
+            db: Database session
+            user_id: Owner whose data is searched
+            query: Words (ANDed), "quoted phrases" and -excluded words
+            types: Subset of SEARCH_TYPES (default: all)
+            pet_id: Only this pet's records
+            limit: Maximum hits
+        """
+        types = [kind for kind in SEARCH_TYPES if types is None or kind in set(types)]
+        if _dialect_name(db) == "postgresql":
+            return _postgres_search(db, user_id, query, types, pet_id, limit)
+        return memory_search.search(db, user_id, query, types, pet_id, limit)
+
+
+def install_search_vectors(bind) -> List[str]:
+    """Add the search_vector columns and GIN indexes to an existing PostgreSQL database."""
+    statements = [statement for table in SEARCH_VECTORS for statement in search_vector_ddl(table)]
+    with bind.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+    return statements
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """
+    python -m app.services.search_service install
+
+    Adds the full-text search columns to a database created before they existed
+    (new databases get them from create_all). Large tables are rewritten once.
+    """
+    parser = argparse.ArgumentParser(description="Full-text search maintenance")
+    parser.add_argument("command", choices=["install"])
+    parser.parse_args(argv)
+
+    from app.database import engine
+    if engine.dialect.name != "postgresql":
+        print("Full-text search columns are PostgreSQL only; other databases use the in-memory index")
+        return 0
+    for statement in install_search_vectors(engine):
+        print(statement.split(" GENERATED")[0])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())  # pragma: no cover
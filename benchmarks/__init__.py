@@ -0,0 +1,11 @@
+# benchmarks/__init__.py
+"""
+Performance tooling for PetWell.
+
+- ``python -m benchmarks.load_test``: seeded end-to-end load test of the main
+  user journeys with throughput and p50/p95/p99 per endpoint.
+- ``benchmarks/micro``: pytest-benchmark suite for per-request CPU hot paths
+  (schema validation, ORM -> schema conversion, JWT, email rendering).
+
+Kept outside ``tests/`` so the regular pytest run never picks it up.
+"""
@@ -0,0 +1,421 @@
+# benchmarks/dataset.py
+"""
+Synthetic dataset generator for performance testing.
+
+Streams users, pets, activities, medications and reminders with realistic
+shapes straight into the database:
+
+- pets per user follow a power law (most owners have one pet, a few have a
+  dozen) and activities per pet a log-normal, so per-user row counts have a
+  long tail like production;
+- activity timestamps span ``years`` years, start when each pet joined and
+  cluster around morning and evening walks/meals.
+
+Rows are generated in chunks of users and loaded with ``COPY`` on Postgres
+and driver-level ``executemany`` on SQLite, with secondary indexes dropped
+during the load and rebuilt afterwards. Output is fully determined by the
+seed and anchor date. Users are named ``bench_user_0000000`` ... and all log
+in with ``BENCH_PASSWORD`` (one bcrypt hash is computed and shared).
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.dataset --users 1000000
+    python -m benchmarks.dataset --database-url sqlite:///bench.db --users 20000 --reset
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.activity import Activity
+from app.models.medication import Medication
+from app.models.pet import Pet
+from app.models.reminder import Reminder
+from app.models.user import User
+from app.config import settings
+from app.services.medication_schedule import MedicationScheduleService, parse_frequency
+from app.services.rollup_service import ActivityRollupService
+
+BENCH_PASSWORD = "BenchPass123"
+USERNAME_PREFIX = "bench_user_"
+
+SPECIES = ["dog", "cat", "bird", "rabbit", "hamster", "reptile", "fish"]
+SPECIES_WEIGHTS = [48, 35, 6, 4, 3, 2, 2]
+BREEDS = {
+    "dog": ["Labrador Retriever", "Golden Retriever", "German Shepherd", "Beagle", "Poodle", "Bulldog"],
+    "cat": ["Domestic Shorthair", "Maine Coon", "Siamese", "Ragdoll", "Bengal"],
+}
+PET_NAMES = ["Max", "Bella", "Charlie", "Luna", "Cooper", "Daisy", "Milo", "Lucy", "Rocky", "Coco",
+             "Buddy", "Nala", "Oliver", "Zoe", "Leo", "Sadie", "Bear", "Molly", "Tucker", "Rosie"]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+ACTIVITY_TYPES = ["walk", "feeding", "play", "grooming", "training", "medication", "vet_visit", "other"]
+ACTIVITY_WEIGHTS = [34, 30, 14, 6, 6, 5, 2, 3]
+# Owners log mostly around breakfast and after work
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 3, 8, 12, 10, 6, 4, 4, 5, 4, 4, 4, 5, 9, 11, 9, 6, 4, 2, 1]
+MEDICATIONS = [("Carprofen", "75mg", "twice daily"), ("Apoquel", "16mg", "once daily"),
+               ("Heartgard", "1 chewable", "monthly"), ("Gabapentin", "100mg", "every 8 hours"),
+               ("Amoxicillin", "250mg", "twice daily")]
+REMINDER_TYPES = ["medication", "appointment", "vaccination", "grooming", "other"]
+# Spread users over a few digest timezone buckets (by index, so the random stream is unchanged)
+TIMEZONES = ["America/New_York", "America/Chicago", "America/Denver", "America/Los_Angeles",
+             "Europe/London", "UTC"]
+MAX_PETS_PER_USER = 25
+
+# random.choices re-accumulates plain weights on every call
+SPECIES_CUM = list(accumulate(SPECIES_WEIGHTS))
+ACTIVITY_CUM = list(accumulate(ACTIVITY_WEIGHTS))
+HOUR_CUM = list(accumulate(HOUR_WEIGHTS))
+
+
+@dataclass
+class SeedSummary:
+    users: int = 0
+    pets: int = 0
+    activities: int = 0
+    medications: int = 0
+    reminders: int = 0
+    medication_doses: int = 0
+    usernames: List[str] = field(default_factory=list, repr=False)
+
+    def add(self, table: str, count: int) -> None:
+        setattr(self, table, getattr(self, table) + count)
+
+
+# Tables in foreign-key order with the columns the generator fills
+LOAD_ORDER: Sequence[Tuple[str, object, Tuple[str, ...]]] = (
+    ("users", User.__table__, ("id", "first_name", "last_name", "email", "username", "password_hash",
+                               "is_active", "is_verified", "is_admin", "timezone", "digest_enabled",
+                               "created_at", "updated_at")),
+    ("pets", Pet.__table__, ("id", "name", "species", "breed", "sex", "age", "weight", "user_id",
+                             "created_at", "updated_at")),
+    ("activities", Activity.__table__, ("pet_id", "activity_type", "title", "description", "duration",
+                                        "distance", "activity_date", "created_at", "updated_at")),
+    ("medications", Medication.__table__, ("pet_id", "name", "dosage", "frequency", "schedule", "route",
+                                           "start_date", "end_date", "is_active", "created_at", "updated_at")),
+    ("reminders", Reminder.__table__, ("user_id", "pet_id", "title", "reminder_type", "reminder_date",
+                                       "is_completed", "created_at", "updated_at")),
+)
+
+
+class BulkLoader:
+    """Append row tuples to tables with the fastest path the dialect offers."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.dialect = conn.dialect
+        self.is_postgres = self.dialect.name == "postgresql"
+
+    def load(self, table, columns: Tuple[str, ...], rows: List[tuple]) -> None:
+        if not rows:
+            return
+        if self.is_postgres:
+            self._copy(table, columns, rows)
+        else:
+            self._executemany(table, columns, rows)
+
+    def _copy(self, table, columns, rows) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                "t" if v is True else "f" if v is False else json.dumps(v) if isinstance(v, (dict, list)) else v
+                for v in row
+            ])
+        buffer.seek(0)
+        cursor = self.conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+    def _executemany(self, table, columns, rows) -> None:
+        # Driver-level executemany skips Core's per-row compilation; apply the
+        # column bind processors (UUID -> hex, datetime -> str) ourselves
+        processors = [table.c[name].type.bind_processor(self.dialect) for name in columns]
+        if any(processors):
+            rows = [
+                tuple(p(v) if p and v is not None else v for p, v in zip(processors, row))
+                for row in rows
+            ]
+        placeholders = ", ".join("?" for _ in columns)
+        self.conn.exec_driver_sql(
+            f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})", rows
+        )
+
+
+@lru_cache(maxsize=1)
+def bench_password_hash() -> str:
+    """The bcrypt hash shared by every generated user (salted once per process)."""
+    return User.hash_password(BENCH_PASSWORD)
+
+
+class DatasetGenerator:
+    """Deterministic row generator; one instance produces one dataset."""
+
+    def __init__(self, seed: int = 42, anchor: Optional[datetime] = None, years: float = 3.0,
+                 pets_alpha: float = 1.5, activities_per_pet: float = 50.0,
+                 medication_rate: float = 0.35, reminders_per_user: float = 2.0):
+        self.rng = random.Random(seed)
+        self.anchor = anchor or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.span_days = max(1, int(years * 365))
+        self.pets_alpha = pets_alpha
+        self.medication_rate = medication_rate
+        self.reminders_per_user = reminders_per_user
+        # Log-normal with the requested mean: mu = ln(mean) - sigma^2 / 2
+        self._activity_sigma = 1.0
+        self._activity_mu = math.log(max(activities_per_pet, 1e-9)) - self._activity_sigma ** 2 / 2
+        self.password_hash = bench_password_hash()
+
+    def pets_for_user(self) -> int:
+        """Discrete power law: P(n) ~ n^-alpha, at least one pet."""
+        return min(MAX_PETS_PER_USER, int(self.rng.paretovariate(self.pets_alpha)))
+
+    def activities_for_pet(self) -> int:
+        return int(self.rng.lognormvariate(self._activity_mu, self._activity_sigma))
+
+    @staticmethod
+    def schedule(frequency: str, start: datetime) -> Optional[dict]:
+        recurrence = parse_frequency(frequency, start)
+        return recurrence.to_dict() if recurrence else None
+
+    def _timestamp_between(self, start: datetime, end: datetime) -> datetime:
+        rng = self.rng
+        day = start + timedelta(days=rng.randint(0, max(0, (end - start).days)))
+        hour = rng.choices(range(24), cum_weights=HOUR_CUM)[0]
+        return day.replace(hour=hour, minute=rng.randint(0, 59), second=rng.randint(0, 59))
+
+    def chunk(self, user_index: int, count: int, first_pet_id: int) -> Dict[str, List[tuple]]:
+        """Rows for users ``user_index .. user_index + count - 1``, keyed by table."""
+        rng = self.rng
+        rows: Dict[str, List[tuple]] = {name: [] for name, _, _ in LOAD_ORDER}
+        pet_id = first_pet_id
+
+        for i in range(user_index, user_index + count):
+            user_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            username = f"{USERNAME_PREFIX}{i:07d}"
+            joined = self.anchor - timedelta(days=rng.randint(0, self.span_days), seconds=rng.randint(0, 86399))
+            rows["users"].append((
+                user_id, rng.choice(FIRST_NAMES), f"User{i}", f"{username}@example.com", username,
+                self.password_hash, True, True, False, TIMEZONES[i % len(TIMEZONES)], True, joined, joined,
+            ))
+
+            user_pets = []
+            for _ in range(self.pets_for_user()):
+                species = rng.choices(SPECIES, cum_weights=SPECIES_CUM)[0]
+                added = joined + timedelta(days=rng.randint(0, max(0, (self.anchor - joined).days)))
+                breed = rng.choice(BREEDS[species]) if species in BREEDS else None
+                weight = round(rng.uniform(8, 95) if species == "dog" else rng.uniform(0.2, 18), 1)
+                rows["pets"].append((
+                    pet_id, rng.choice(PET_NAMES), species, breed, rng.choice(["male", "female"]),
+                    rng.randint(0, 16), weight, user_id, added, added,
+                ))
+                user_pets.append(pet_id)
+
+                for _ in range(self.activities_for_pet()):
+                    activity_type = rng.choices(ACTIVITY_TYPES, cum_weights=ACTIVITY_CUM)[0]
+                    when = self._timestamp_between(added, self.anchor)
+                    duration = rng.randint(10, 90) if activity_type in ("walk", "play", "training") else rng.randint(1, 20)
+                    distance = round(rng.uniform(0.3, 5.0), 2) if activity_type == "walk" else None
+                    rows["activities"].append((
+                        pet_id, activity_type, activity_type.replace("_", " ").title(),
+                        f"{activity_type.replace('_', ' ')} logged by owner", duration, distance,
+                        when, when, when,
+                    ))
+
+                if rng.random() < self.medication_rate:
+                    for _ in range(rng.randint(1, 3)):
+                        name, dosage, frequency = rng.choice(MEDICATIONS)
+                        start = self._timestamp_between(added, self.anchor)
+                        ended = rng.random() < 0.4
+                        end = start + timedelta(days=rng.randint(5, 60)) if ended else None
+                        # Parsed at write time, as MedicationScheduleService.apply_schedule does
+                        schedule = self.schedule(frequency, start)
+                        rows["medications"].append((
+                            pet_id, name, dosage, frequency, schedule, "oral", start, end, not ended, start, start,
+                        ))
+                pet_id += 1
+
+            for _ in range(rng.randint(0, int(2 * self.reminders_per_user))):
+                upcoming = rng.random() < 0.8
+                offset = timedelta(hours=rng.randint(1, 24 * 90))
+                when = self.anchor + offset if upcoming else self.anchor - offset
+                rows["reminders"].append((
+                    user_id, rng.choice(user_pets) if user_pets else None, "Checkup",
+                    rng.choice(REMINDER_TYPES), when, not upcoming, joined, joined,
+                ))
+
+        return rows
+
+
+def secondary_indexes() -> List:
+    """Non-unique indexes declared on the benchmark tables."""
+    return [index for _, table, _ in LOAD_ORDER for index in table.indexes if not index.unique]
+
+
+def _next_id(conn, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def bench_usernames(engine, limit: int = 10_000) -> List[str]:
+    """Usernames of already-seeded benchmark users (first ``limit``)."""
+    with engine.connect() as conn:
+        return list(conn.execute(
+            select(User.username).where(User.username.like(f"{USERNAME_PREFIX}%"))
+            .order_by(User.username).limit(limit)
+        ).scalars())
+
+
+def generate(engine, users: int, generator: DatasetGenerator, chunk_users: int = 2000,
+             defer_indexes: bool = True, progress=None) -> SeedSummary:
+    """
+    Load ``users`` users (and their pets, activities, ...) into ``engine``.
+
+    Args:
+        engine: Target engine (Postgres or SQLite).
+        users: Number of users to generate.
+        generator: Configured DatasetGenerator.
+        chunk_users: Users generated and committed per transaction.
+        defer_indexes: Drop secondary indexes for the load and rebuild them after.
+        progress: Optional callable(summary, elapsed_seconds) called per chunk.
+
+    Returns:
+        SeedSummary with the number of rows loaded per table.
+    """
+    Base.metadata.create_all(bind=engine)
+    summary = SeedSummary()
+    started = time.perf_counter()
+    is_postgres = engine.dialect.name == "postgresql"
+
+    if defer_indexes:
+        for index in secondary_indexes():
+            index.drop(bind=engine, checkfirst=True)
+
+    with engine.connect() as conn:
+        next_pet_id = _next_id(conn, Pet)
+
+    for offset in range(0, users, chunk_users):
+        count = min(chunk_users, users - offset)
+        rows = generator.chunk(offset, count, next_pet_id)
+        with engine.begin() as conn:
+            if not is_postgres:
+                conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            loader = BulkLoader(conn)
+            for name, table, columns in LOAD_ORDER:
+                loader.load(table, columns, rows[name])
+                summary.add(name, len(rows[name]))
+        next_pet_id += len(rows["pets"])
+        if progress:
+            progress(summary, time.perf_counter() - started)
+
+    with engine.begin() as conn:
+        if is_postgres:
+            # Pet ids were assigned explicitly; move the serial past them
+            conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('pets', 'id'), (SELECT COALESCE(MAX(id), 1) FROM pets))"
+            ))
+        # Activities were bulk loaded around the ORM; backfill their daily rollup
+        ActivityRollupService.rebuild(conn)
+    # Materialize upcoming doses (and their adherence rollup) as the hourly horizon job would
+    with Session(engine) as session:
+        summary.add("medication_doses", MedicationScheduleService.extend_horizon(
+            session, generator.anchor, timedelta(days=settings.DOSE_HORIZON_DAYS)
+        ))
+    if defer_indexes:
+        for index in secondary_indexes():
+            index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    return summary
+
+
+def seed(engine, users: int = 2000, seed: int = 42, **generator_options) -> SeedSummary:
+    """
+    Load a benchmark dataset unless benchmark users already exist.
+
+    Extra keyword arguments are passed to DatasetGenerator.
+
+    Returns:
+        SeedSummary with row counts and (a sample of) the seeded usernames.
+    """
+    Base.metadata.create_all(bind=engine)
+    existing = bench_usernames(engine)
+    if existing:
+        return SeedSummary(usernames=existing)
+    summary = generate(engine, users, DatasetGenerator(seed=seed, **generator_options))
+    summary.usernames = bench_usernames(engine)
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate a synthetic PetWell dataset")
+    parser.add_argument("--database-url", help="Target database (defaults to DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--pets-alpha", type=float, default=1.5,
+                        help="Power-law exponent for pets per user (lower = heavier tail)")
+    parser.add_argument("--activities-per-pet", type=float, default=50.0, help="Mean activities per pet")
+    parser.add_argument("--years", type=float, default=3.0, help="History length")
+    parser.add_argument("--medication-rate", type=float, default=0.35, help="Share of pets on medication")
+    parser.add_argument("--reminders-per-user", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=lambda s: datetime.strptime(s, "%Y-%m-%d"),
+                        help="'Today' for generated timestamps (YYYY-MM-DD); default: today")
+    parser.add_argument("--chunk-users", type=int, default=2000, help="Users per transaction")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="Maintain indexes during the load instead of rebuilding after")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.database_url:
+        from app.database import get_engine
+        engine = get_engine(args.database_url)
+    else:
+        from app.database import engine
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    if bench_usernames(engine, limit=1):
+        print("Benchmark users already exist; pass --reset to regenerate", file=sys.stderr)
+        return 1
+
+    generator = DatasetGenerator(
+        seed=args.seed, anchor=args.anchor, years=args.years, pets_alpha=args.pets_alpha,
+        activities_per_pet=args.activities_per_pet, medication_rate=args.medication_rate,
+        reminders_per_user=args.reminders_per_user,
+    )
+
+    def report(summary: SeedSummary, elapsed: float) -> None:
+        rows = summary.users + summary.pets + summary.activities + summary.medications + summary.reminders
+        print(f"{summary.users:>10,} users {summary.pets:>10,} pets {summary.activities:>12,} activities"
+              f"  {elapsed:7.1f}s  {rows / elapsed:>10,.0f} rows/s", flush=True)
+
+    started = time.perf_counter()
+    summary = generate(engine, args.users, generator, chunk_users=args.chunk_users,
+                       defer_indexes=not args.keep_indexes, progress=report)
+    print(f"Done in {time.perf_counter() - started:.1f}s (indexes built, statistics analyzed): {summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
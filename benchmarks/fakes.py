@@ -0,0 +1,273 @@
+# benchmarks/fakes.py
+"""
+Local stand-ins for the OpenAI and SMTP calls made by the app.
+
+Benchmarks must measure PetWell, not a third-party API, so these return
+canned answers (optionally after a fixed simulated latency) and never leave
+the process. ``LocalSMTPServer`` is a real (loopback) SMTP listener for
+exercising the outbox's connection pool end to end.
+"""
+
+import asyncio
+import base64
+import email
+import email.policy
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+VERIFY_TOKEN = re.compile(r"verify-email\?token=([A-Za-z0-9_\-]+)")
+
+
+def _completion(content: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeOpenAI"):
+        self._owner = owner
+
+    def create(self, model=None, messages=None, **kwargs):
+        owner = self._owner
+        owner.calls += 1
+        if owner.latency:
+            # The real client is synchronous and blocks the handler, so the
+            # fake does too
+            time.sleep(owner.latency)
+
+        system = next((m["content"] for m in messages or [] if m.get("role") == "system"), "")
+        if '{"results"' in system:
+            # Batched enrichment: one result per submitted item
+            items = json.loads(messages[-1]["content"])
+            return _completion(json.dumps({"results": [
+                {"i": item["i"], "activity_type": "walk", "title": "Morning walk",
+                 "duration": 30, "distance": 1.5, "notes": None}
+                for item in items
+            ]}))
+        if "activity analyzer" in system:
+            return _completion(json.dumps({
+                "activity_type": "walk",
+                "title": "Morning walk",
+                "duration": 30,
+                "distance": 1.5,
+                "notes": None,
+            }))
+        if "activity analyst" in system:
+            return _completion(json.dumps({
+                "categories": {},
+                "patterns": ["walks usually in the morning"],
+                "insights": "Consistent daily routine.",
+            }))
+        if system:
+            return _completion("That sounds normal, but check with your vet if it continues.")
+        return _completion("1. Daily exercise\n2. Fresh water\n3. Regular vet checkups")
+
+
+class FakeOpenAI:
+    """Duck-typed replacement for ``openai.OpenAI`` (chat completions only)."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+
+
+@dataclass
+class FakeMailbox:
+    """Captures messages that would have gone out through aiosmtplib."""
+    messages: List = field(default_factory=list)
+    latency: float = 0.0
+
+    async def send(self, message, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.messages.append(message)
+        return {}, "OK"
+
+    def verification_token(self, email: str) -> Optional[str]:
+        """Return the most recent verification token mailed to ``email``."""
+        for message in reversed(self.messages):
+            if message["To"] != email:
+                continue
+            for part in message.walk():
+                if part.get_content_maintype() != "text":
+                    continue
+                match = VERIFY_TOKEN.search(part.get_payload(decode=True).decode("utf-8", "replace"))
+                if match:
+                    return match.group(1)
+        return None
+
+
+class FakeSMTP:
+    """Duck-typed ``aiosmtplib.SMTP`` that delivers into a FakeMailbox."""
+
+    def __init__(self, mailbox: FakeMailbox):
+        self.mailbox = mailbox
+        self.is_connected = False
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def send_message(self, message, **kwargs):
+        return await self.mailbox.send(message)
+
+    async def noop(self):
+        return None
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+class LocalSMTPServer:
+    """
+    Minimal SMTP server on 127.0.0.1 (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT,
+    DATA, RSET, NOOP, QUIT) that stores what it receives in a FakeMailbox.
+
+    No TLS, so clients must connect with ``start_tls=False``. ``connections``
+    counts accepted connections, which is what connection reuse is judged by;
+    ``fail_next`` makes the next N DATA commands answer 451.
+
+    Usage::
+
+        async with LocalSMTPServer() as server:
+            ... connect to server.port ...
+    """
+
+    def __init__(self, username: str = "user", password: str = "secret"):
+        self.username = username
+        self.password = password
+        self.mailbox = FakeMailbox()
+        self.connections = 0
+        self.fail_next = 0
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> "LocalSMTPServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "LocalSMTPServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def _check_plain(self, encoded: str) -> bool:
+        try:
+            _, username, password = base64.b64decode(encoded).decode("utf-8").split("\0")
+        except ValueError:
+            return False
+        return username == self.username and password == self.password
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+
+        async def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode("ascii"))
+            await writer.drain()
+
+        async def read_line() -> Optional[str]:
+            line = await reader.readline()
+            return line.decode("utf-8", "replace").rstrip("\r\n") if line else None
+
+        authenticated = False
+        await reply("220 localhost PetWell test SMTP")
+        try:
+            while True:
+                line = await read_line()
+                if line is None:
+                    break
+                command, _, argument = line.partition(" ")
+                command = command.upper()
+                if command in ("EHLO", "HELO"):
+                    writer.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n")
+                    await reply("250 8BITMIME")
+                elif command == "AUTH":
+                    mechanism, _, initial = argument.partition(" ")
+                    if mechanism.upper() == "PLAIN":
+                        if not initial:
+                            await reply("334 ")
+                            initial = await read_line() or ""
+                        authenticated = self._check_plain(initial)
+                    elif mechanism.upper() == "LOGIN":
+                        await reply("334 VXNlcm5hbWU6")
+                        username = base64.b64decode(await read_line() or "").decode("utf-8")
+                        await reply("334 UGFzc3dvcmQ6")
+                        password = base64.b64decode(await read_line() or "").decode("utf-8")
+                        authenticated = username == self.username and password == self.password
+                    await reply("235 Authentication succeeded" if authenticated else "535 Authentication failed")
+                elif command == "MAIL":
+                    await reply("250 OK" if authenticated else "530 Authentication required")
+                elif command == "RCPT":
+                    await reply("250 OK")
+                elif command == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        data = await reader.readline()
+                        if not data or data in (b".\r\n", b".\n"):
+                            break
+                        lines.append(data[1:] if data.startswith(b"..") else data)
+                    if self.fail_next > 0:
+                        self.fail_next -= 1
+                        await reply("451 Try again later")
+                        continue
+                    message = email.message_from_bytes(b"".join(lines), policy=email.policy.compat32)
+                    await self.mailbox.send(message)
+                    await reply("250 Queued")
+                elif command in ("RSET", "NOOP"):
+                    await reply("250 OK")
+                elif command == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def install_fakes(app_module, openai_latency: float = 0.0, smtp_latency: float = 0.0) -> Dict[str, object]:
+    """
+    Swap the app's OpenAI client and SMTP transport for local fakes (and turn off rate limits).
+
+    Args:
+        app_module: The imported ``main`` module.
+        openai_latency: Simulated seconds per completion call.
+        smtp_latency: Simulated seconds per email send.
+
+    Returns:
+        dict with the installed ``openai`` and ``mailbox`` fakes.
+    """
+    from app.config import settings
+    from app.services import email_service
+
+    fake_openai = FakeOpenAI(latency=openai_latency)
+    mailbox = FakeMailbox(latency=smtp_latency)
+
+    app_module.openai_client = fake_openai
+    settings.AI_MODEL = settings.AI_MODEL or "fake-model"
+    # EmailService only reaches the transport when credentials are configured
+    settings.SMTP_USER = settings.SMTP_USER or "bench@example.com"
+    settings.SMTP_PASSWORD = settings.SMTP_PASSWORD or "bench"
+    email_service.aiosmtplib = SimpleNamespace(send=mailbox.send)
+    # Queued mail goes out through the outbox worker's connection pool
+    app_module.email_outbox.pool.factory = lambda: FakeSMTP(mailbox)
+    # Every virtual user shares one client address, so per-client login limits would throttle the run
+    app_module.rate_limiter.enabled = False
+
+    return {"openai": fake_openai, "mailbox": mailbox}
@@ -0,0 +1,319 @@
+# benchmarks/load_test.py
+"""
+Load test the main user journeys and report latency percentiles.
+
+Journeys: register (+ email verification), login, dashboard, log-activity
+and reports - the same request sequences the pages in static/js issue.
+
+In-process (default) the app runs behind ``httpx.ASGITransport`` against the
+database in DATABASE_URL, with OpenAI and SMTP replaced by local fakes. With
+``--base-url`` a running server is driven instead; it must already be seeded
+(``--seed-only`` against its database) and configured without real API keys.
+
+Examples:
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.load_test --concurrency 20 --duration 30
+    python -m benchmarks.load_test --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load_test --compare benchmarks/baseline.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+JOURNEYS = ("register", "login", "dashboard", "log-activity", "reports")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (``pct`` in 0..100) of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class Recorder:
+    """Per-endpoint latency samples and error counts."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict[str, float]]:
+        """Throughput and latency percentiles (ms) per endpoint, plus a total."""
+        result = {}
+        everything = []
+        for name in sorted(self.latencies):
+            values = self.latencies[name]
+            everything.extend(values)
+            result[name] = _stats(values, self.errors[name], elapsed)
+        result["TOTAL"] = _stats(everything, sum(self.errors.values()), elapsed)
+        return result
+
+
+def _stats(values: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.15) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline`` endpoint summaries.
+
+    An endpoint regresses when its p95 grows, or its throughput drops, by
+    more than ``threshold`` (a fraction), or when it starts returning errors.
+    """
+    regressions = []
+    for name, base in baseline.items():
+        now = current.get(name)
+        if now is None:
+            continue
+        if base["p95_ms"] and now["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {now['p95_ms']}ms")
+        if base["rps"] and now["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {base['rps']}/s -> {now['rps']}/s")
+        if now["errors"] and not base["errors"]:
+            regressions.append(f"{name}: {now['errors']} errors (baseline had none)")
+    return regressions
+
+
+class VirtualUser:
+    """Runs journeys in sequence for one simulated client."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, usernames: List[str],
+                 password: str, rng: random.Random, mailbox=None):
+        self.client = client
+        self.recorder = recorder
+        self.usernames = usernames
+        self.password = password
+        self.rng = rng
+        self.mailbox = mailbox
+        self.headers: Dict[str, str] = {}
+        self.pet_ids: List[int] = []
+
+    async def call(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.recorder.record(name, time.perf_counter() - start, ok)
+        return response
+
+    async def register(self) -> None:
+        username = f"lt_{uuid.UUID(int=self.rng.getrandbits(128)).hex[:16]}"
+        email = f"{username}@example.com"
+        await self.call("POST /users/register", "POST", "/users/register", json={
+            "first_name": "Load", "last_name": "Test", "email": email,
+            "username": username, "password": self.password,
+        })
+        token = await self.verification_token(email)
+        if token:
+            await self.call("POST /api/verify-email", "POST", "/api/verify-email", params={"token": token})
+
+    async def verification_token(self, email: str, timeout: float = 2.0) -> Optional[str]:
+        """The outbox worker sends in the background: wait briefly for the email."""
+        if not self.mailbox:
+            return None
+        deadline = time.perf_counter() + timeout
+        while True:
+            token = self.mailbox.verification_token(email)
+            if token or time.perf_counter() >= deadline:
+                return token
+            await asyncio.sleep(0.01)
+
+    async def login(self) -> None:
+        username = self.rng.choice(self.usernames)
+        response = await self.call("POST /users/login", "POST", "/users/login",
+                                   json={"username": username, "password": self.password})
+        if response is not None and response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def dashboard(self) -> None:
+        await self.call("GET /dashboard", "GET", "/dashboard")
+        await self.call("GET /users/me", "GET", "/users/me", headers=self.headers)
+        response = await self.call("GET /pets", "GET", "/pets", headers=self.headers)
+        if response is not None and response.status_code == 200:
+            self.pet_ids = [pet["id"] for pet in response.json()]
+        await self.call("GET /reminders", "GET", "/reminders",
+                        params={"completed": "false"}, headers=self.headers)
+        await self.call("GET /medications", "GET", "/medications",
+                        params={"active_only": "true"}, headers=self.headers)
+
+    async def log_activity(self) -> None:
+        if not self.pet_ids:
+            await self.dashboard()
+        if not self.pet_ids:
+            return
+        await self.call("POST /activities", "POST", "/activities", headers=self.headers, json={
+            "pet_id": self.rng.choice(self.pet_ids),
+            "activity_date": datetime.utcnow().isoformat(),
+            "description": "Walked 1.5 miles around the park for 30 minutes",
+        })
+
+    async def reports(self) -> None:
+        await self.call("GET /reports", "GET", "/reports")
+        await self.call("GET /users/me", "GET", "/users/me", headers=self.headers)
+        await self.call("GET /pets", "GET", "/pets", headers=self.headers)
+        await self.call("GET /activities?limit=1000", "GET", "/activities",
+                        params={"limit": 1000}, headers=self.headers)
+        await self.call("GET /medications?limit=1000", "GET", "/medications",
+                        params={"active_only": "true", "limit": 1000}, headers=self.headers)
+
+    async def run(self, journeys: List[str], deadline: float, iterations: Optional[int]) -> None:
+        steps = {
+            "register": self.register,
+            "login": self.login,
+            "dashboard": self.dashboard,
+            "log-activity": self.log_activity,
+            "reports": self.reports,
+        }
+        done = 0
+        while time.perf_counter() < deadline and (iterations is None or done < iterations):
+            for journey in journeys:
+                if journey not in ("register", "login") and not self.headers:
+                    await self.login()
+                await steps[journey]()
+            done += 1
+
+
+async def run_load(client: httpx.AsyncClient, usernames: List[str], password: str, concurrency: int,
+                   duration: float, journeys: List[str], iterations: Optional[int] = None,
+                   seed: int = 42, mailbox=None) -> Dict[str, Dict[str, float]]:
+    """Drive ``concurrency`` virtual users and return the per-endpoint summary."""
+    recorder = Recorder()
+    start = time.perf_counter()
+    deadline = start + duration
+    users = [
+        VirtualUser(client, recorder, usernames, password, random.Random(seed + i), mailbox)
+        for i in range(concurrency)
+    ]
+    await asyncio.gather(*(user.run(journeys, deadline, iterations) for user in users))
+    return recorder.summary(time.perf_counter() - start)
+
+
+def print_summary(summary: Dict[str, Dict[str, float]], out=sys.stdout) -> None:
+    header = f"{'endpoint':<34}{'count':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for name, row in summary.items():
+        print(f"{name:<34}{row['count']:>8}{row['errors']:>6}{row['rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}", file=out)
+
+
+async def _main(args) -> int:
+    from benchmarks.dataset import BENCH_PASSWORD, bench_usernames, seed
+
+    journeys = [j.strip() for j in args.journeys.split(",") if j.strip()]
+    unknown = set(journeys) - set(JOURNEYS)
+    if unknown:
+        print(f"Unknown journeys: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    from app.database import engine
+    if args.base_url is None or args.seed_only:
+        started = time.perf_counter()
+        seeded = seed(engine, users=args.users, activities_per_pet=args.activities_per_pet, seed=args.seed)
+        print(f"Dataset ready in {time.perf_counter() - started:.1f}s: {seeded}")
+        if args.seed_only:
+            return 0
+    usernames = bench_usernames(engine)
+    if not usernames:
+        print("No benchmark users found; run with --seed-only against the server's database first",
+              file=sys.stderr)
+        return 2
+
+    mailbox = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+        lifespan = None
+    else:
+        import main
+        from benchmarks.fakes import install_fakes
+        mailbox = install_fakes(main, openai_latency=args.openai_latency)["mailbox"]
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app),
+                                   base_url="http://bench.local", timeout=30)
+        lifespan = main.app.router.lifespan_context(main.app)
+
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            summary = await run_load(client, usernames, BENCH_PASSWORD, args.concurrency, args.duration,
+                                     journeys, args.iterations, args.seed, mailbox)
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    print_summary(summary)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "created_at": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "config": {k: v for k, v in vars(args).items() if k not in ("save_baseline", "compare")},
+                "endpoints": summary,
+            }, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(summary, baseline["endpoints"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions vs {args.compare} (threshold {args.threshold:.0%})")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="PetWell load test")
+    parser.add_argument("--base-url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=10, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--iterations", type=int, help="Stop each virtual user after N journey loops")
+    parser.add_argument("--journeys", default=",".join(JOURNEYS), help="Comma-separated journeys")
+    parser.add_argument("--users", type=int, default=2000, help="Seeded users")
+    parser.add_argument("--activities-per-pet", type=float, default=50.0, help="Mean seeded activities per pet")
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed for data and journeys")
+    parser.add_argument("--seed-only", action="store_true", help="Seed the database and exit")
+    parser.add_argument("--openai-latency", type=float, default=0.0,
+                        help="Simulated seconds per OpenAI call (in-process only)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write results as a baseline JSON")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Allowed p95/throughput regression as a fraction")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(build_parser().parse_args())))
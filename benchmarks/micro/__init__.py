@@ -0,0 +1 @@
+# benchmarks/micro/__init__.py
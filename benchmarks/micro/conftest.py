@@ -0,0 +1,64 @@
+# benchmarks/micro/conftest.py
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.activity import Activity
+from app.models.medication import Medication
+from app.models.pet import Pet
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def pet_payload():
+    """A full, valid POST /pets body."""
+    return {
+        "name": "Max",
+        "species": "Dog",
+        "breed": "Golden Retriever",
+        "breed_type": "Mix",
+        "breed_secondary": "Poodle",
+        "sex": "Male",
+        "birthday": "2021-04-12",
+        "age": 4,
+        "weight": 65.5,
+        "medical_notes": "Allergic to chicken.",
+    }
+
+
+@pytest.fixture
+def pet_row():
+    return Pet(
+        id=1, name="Max", species="dog", breed="Golden Retriever", sex="male",
+        birthday=date(2021, 4, 12), age=4, weight=65.5,
+        medical_notes="Allergic to chicken.", ai_care_tips="1. Walk daily\n2. Brush weekly",
+        created_at=NOW, updated_at=NOW,
+    )
+
+
+@pytest.fixture
+def activity_rows():
+    """100 transient rows - the size of a typical GET /activities page."""
+    return [
+        Activity(
+            id=i, pet_id=1, activity_type="walk", title="Morning walk",
+            description="Walked around the park", duration=30, distance=1.5, notes=None,
+            activity_date=NOW - timedelta(hours=i), created_at=NOW, updated_at=NOW,
+        )
+        for i in range(100)
+    ]
+
+
+@pytest.fixture
+def medication_rows():
+    return [
+        Medication(
+            id=i, pet_id=1, name="Carprofen", dosage="75mg", frequency="twice daily",
+            route="oral", reason="Joint pain", prescribing_vet="Dr. Smith",
+            start_date=NOW, end_date=None, is_active=True, notes=None,
+            created_at=NOW, updated_at=NOW,
+        )
+        for i in range(20)
+    ]
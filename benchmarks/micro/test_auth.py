@@ -0,0 +1,24 @@
+# benchmarks/micro/test_auth.py
+
+import uuid
+
+from app.models.user import User
+
+USER_ID = uuid.UUID("7f3c1f9e-2b8a-4d5e-9c61-0a4b2e8d7f10")
+
+
+def test_create_access_token(benchmark):
+    token = benchmark(User.create_access_token, {"sub": str(USER_ID)})
+    assert token.count(".") == 2
+
+
+def test_verify_token(benchmark):
+    token = User.create_access_token({"sub": str(USER_ID)})
+    assert benchmark(User.verify_token, token) == USER_ID
+
+
+def test_verify_password(benchmark):
+    # bcrypt is slow by design; a handful of rounds is enough to catch a
+    # cost-factor change
+    user = User(password_hash=User.hash_password("BenchPass123"))
+    assert benchmark.pedantic(user.verify_password, args=("BenchPass123",), rounds=5, iterations=1)
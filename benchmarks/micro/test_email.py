@@ -0,0 +1,30 @@
+# benchmarks/micro/test_email.py
+
+from app.services.email_service import EmailService
+from app.services.email_templates import email_templates
+
+
+def test_create_verification_email(benchmark):
+    subject, html, text = benchmark(
+        EmailService.create_verification_email,
+        user_email="max@example.com",
+        user_name="Max",
+        verification_token="0b6c2f8e-1d4a-4c3e-9f7a-5e2d8b1c6a90",
+    )
+    assert "0b6c2f8e-1d4a-4c3e-9f7a-5e2d8b1c6a90" in html
+    assert "0b6c2f8e-1d4a-4c3e-9f7a-5e2d8b1c6a90" in text
+
+
+def test_render_10k_emails(benchmark):
+    """Subject, HTML and text parts for 10k recipients from the compiled templates."""
+    recipients = [(f"Owner {i}", f"{i:032x}") for i in range(10_000)]
+
+    def render_all():
+        return [
+            email_templates.render("verification", user_name=name,
+                                   verification_link=f"https://petwell.example/verify-email?token={token}")
+            for name, token in recipients
+        ]
+
+    emails = benchmark.pedantic(render_all, rounds=3, iterations=1)
+    assert len(emails) == 10_000 and recipients[-1][1] in emails[-1].html
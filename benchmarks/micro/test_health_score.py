@@ -0,0 +1,22 @@
+# benchmarks/micro/test_health_score.py
+
+import random
+from datetime import timedelta
+
+from app.services.health_score_service import HealthScoreService
+
+from .conftest import NOW
+
+
+def test_health_score_90_days(benchmark):
+    """Everything after the rollup fetch; should stay well under a millisecond."""
+    rng = random.Random(7)
+    # pet_activity_daily rows: 90 days of three activity types
+    rows = [
+        ((NOW - timedelta(days=day)).date(), count, count * rng.randrange(5, 90), count * rng.random() * 3)
+        for day in range(90) for count in (rng.randrange(1, 4) for _ in range(3))
+    ]
+    columns = HealthScoreService.to_columns(rows, NOW)
+
+    result = benchmark(HealthScoreService.compute, columns, species="dog", adherence=0.8)
+    assert 0 <= result["score"] <= 100
@@ -0,0 +1,45 @@
+# benchmarks/micro/test_schemas.py
+
+from app.schemas.activity import ActivityRead
+from app.schemas.medication import MedicationRead
+from app.schemas.pet import PetCreate, PetRead, PetUpdate
+
+
+def test_pet_create_validation(benchmark, pet_payload):
+    pet = benchmark(PetCreate.model_validate, pet_payload)
+    assert pet.species == "dog"
+
+
+def test_pet_update_partial_validation(benchmark):
+    payload = {"weight": 66.0, "sex": "Female", "species": "Cat"}
+    pet = benchmark(PetUpdate.model_validate, payload)
+    assert pet.model_dump(exclude_unset=True) == {"weight": 66.0, "sex": "female", "species": "cat"}
+
+
+def test_pet_read_from_orm(benchmark, pet_row):
+    pet = benchmark(PetRead.model_validate, pet_row)
+    assert pet.id == 1
+
+
+def test_activity_read_page_from_orm(benchmark, activity_rows):
+    def validate_page():
+        return [ActivityRead.model_validate(row) for row in activity_rows]
+
+    page = benchmark(validate_page)
+    assert len(page) == 100
+
+
+def test_activity_read_page_to_json(benchmark, activity_rows):
+    page = [ActivityRead.model_validate(row) for row in activity_rows]
+
+    def dump_page():
+        return [item.model_dump(mode="json") for item in page]
+
+    assert len(benchmark(dump_page)) == 100
+
+
+def test_medication_read_from_orm(benchmark, medication_rows):
+    def validate_all():
+        return [MedicationRead.model_validate(row) for row in medication_rows]
+
+    assert len(benchmark(validate_all)) == 20
@@ -1,29 +1,62 @@
 # main.py
 
-from fastapi import FastAPI, HTTPException, Request, Depends, status
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi import FastAPI, HTTPException, Request, Response, Depends, Query, status
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, field_validator  # Use @validator for Pydantic 1.x
 from fastapi.exceptions import RequestValidationError
+from sqlalchemy import insert, inspect
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.user import User
+from app.database import get_db, engine, SessionLocal
+from app.models.user import User, EVENTS_TICKET_SECONDS
 from app.models.pet import Pet
 from app.models.activity import Activity
 from app.models.medication import Medication
+from app.models.medication_dose import MedicationDose
+from app.models.dose_log import DoseLog
 from app.models.reminder import Reminder
+from app.models.pet_activity_daily import PetActivityDaily
+from app.models.notification import Notification
 from app.schemas.base import UserCreate, UserRead
-from app.schemas.user import UserResponse, Token, UserLogin
+from app.schemas.user import UserResponse, Token, UserLogin, UserPreferencesUpdate, EventsTicket
 from app.schemas.pet import PetCreate, PetRead, PetUpdate
-from app.schemas.activity import ActivityCreate, ActivityRead, ActivityUpdate
-from app.schemas.medication import MedicationCreate, MedicationRead, MedicationUpdate
+from app.schemas.activity import ActivityCreate, ActivityRead, ActivityUpdate, ActivityBulkCreate, ActivityBulkError, ActivityBulkResult, ActivityDailyRead
+from app.schemas.medication import MedicationCreate, MedicationRead, MedicationUpdate, MedicationDoseRead, DoseLogCreate, DoseLogRead, MedicationAdherenceRead
 from app.schemas.reminder import ReminderCreate, ReminderRead, ReminderUpdate
-from app.auth.dependencies import get_current_user, get_current_active_user
-from app.services.email_service import EmailService
-from typing import List
+from app.schemas.health import HealthScoreRead
+from app.schemas.notification import NotificationRead
+from app.schemas.search import SearchResult
+from app.auth.dependencies import get_current_user, get_current_active_user, get_current_admin_user
+from app.services.email_outbox import EmailOutboxService, EmailOutboxWorker, SMTPConnectionPool
+from app.services.activity_enrichment import ActivityEnrichmentService
+from app.services.health_score_service import HealthScoreService
+from app.services.rollup_service import ActivityRollupService, naive_utc
+from app.services.reminder_scheduler import ReminderScheduler
+from app.services.digest_service import DigestRunner
+from app.services.medication_schedule import DoseHorizonRunner, MedicationScheduleService
+from app.services.adherence_service import AdherenceService, week_start
+from app.services.event_broker import create_broker, format_sse
+from app.services.search_service import SearchService
+from app.services.rate_limiter import RateLimiter, RateLimitExceeded, create_rate_limit_store
+from app.services.chat_cache import (
+    SemanticCache, bypass_reason, cache_requests_total, cache_saved_seconds_total, is_shareable, llm_seconds,
+    pet_context,
+)
+from app.services.export_service import ExportService, EXPORT_FORMATS, COLUMNAR_FORMATS, HAS_PYARROW
+from app.services.etag_service import ETagService
+from app.services.asset_service import PrecompressedStaticFiles
+from app.services.page_cache import PageCache
+from app.middleware import CompressionMiddleware, DBTimingMiddleware, MetricsMiddleware, ProfilingMiddleware
+from app.services.metrics_service import registry as metrics_registry, pool_collector
+from app.services.profiler_service import StackSampler, ProfilerBusyError, profile_store
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from datetime import datetime, date, timedelta
+from typing import List, Literal, Optional
+import secrets
+import time
 import uvicorn
 import logging
 from openai import OpenAI
@@ -33,7 +66,127 @@ from app.config import settings
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="PetWell", description="AI-powered pet care management platform")
+# Static files (precompressed .br/.gz variants are built at startup,
+# js/ and styles/ are also served under content-hashed, immutable URLs)
+static_files = PrecompressedStaticFiles(directory="static", auto_reload=settings.DEV_MODE)
+static_files.build_manifest()
+
+# Per-user change events for GET /events; handlers publish after committing
+event_broker = create_broker(settings.EVENT_BROKER)
+
+async def publish_change(user: User, resource: str, action: str, id: Optional[int], **extra) -> None:
+    """
+    Tell the user's open pages that something changed. Never fails the request.
+    """
+    try:
+        # Identity key: reading user.id after a commit would reload the expired row
+        user_id = inspect(user).identity[0]
+        await event_broker.publish(user_id, {"resource": resource, "action": action, "id": id, **extra})
+    except Exception as e:
+        logger.error(f"Publish event error: {str(e)}")
+
+# Token buckets per route group; routes opt in with a limit_* dependency
+rate_limiter = RateLimiter(
+    create_rate_limit_store(settings.RATE_LIMIT_BACKEND, SessionLocal),
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+rate_limiter.configure("ai", {"user": settings.RATE_LIMIT_AI_USER, "global": settings.RATE_LIMIT_AI_GLOBAL})
+rate_limiter.configure("login", {"client": settings.RATE_LIMIT_LOGIN_CLIENT, "global": settings.RATE_LIMIT_LOGIN_GLOBAL})
+
+def _too_many_requests(exc: RateLimitExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests. Please try again later.",
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+def limit_ai_requests(current_user: User = Depends(get_current_active_user)) -> None:
+    """
+    Dependency for routes that call the AI model: per-user and global limits.
+    """
+    try:
+        rate_limiter.hit("ai", user=str(current_user.id))
+    except RateLimitExceeded as e:
+        raise _too_many_requests(e)
+
+def limit_bulk_ai_requests(
+    payload: ActivityBulkCreate,
+    current_user: User = Depends(get_current_active_user)
+) -> None:
+    """
+    Dependency for POST /activities/bulk: spends one AI token per enrichment batch.
+    """
+    to_enrich = sum(1 for item in payload.activities if not (item.activity_type and item.title))
+    batches = ActivityEnrichmentService.batch_count(to_enrich)
+    if not batches:
+        return
+    try:
+        rate_limiter.hit("ai", cost=batches, user=str(current_user.id))
+    except RateLimitExceeded as e:
+        raise _too_many_requests(e)
+
+def limit_login_attempts(request: Request) -> None:
+    """
+    Dependency for login routes: per-client-address and global limits.
+    """
+    try:
+        rate_limiter.hit("login", client=request.client.host if request.client else "unknown")
+    except RateLimitExceeded as e:
+        raise _too_many_requests(e)
+
+# Sends queued email over pooled SMTP connections; handlers notify() after committing
+email_outbox = EmailOutboxWorker(
+    SessionLocal,
+    pool=SMTPConnectionPool(size=settings.EMAIL_WORKERS),
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    poll_interval=settings.EMAIL_POLL_SECONDS,
+    retention_days=settings.EMAIL_RETENTION_DAYS,
+)
+
+# Fires due reminders; handlers keep its heap in sync on create/update/delete
+reminder_scheduler = ReminderScheduler(
+    SessionLocal,
+    batch_size=settings.SCHEDULER_BATCH_SIZE,
+    lease_seconds=settings.SCHEDULER_LEASE_SECONDS,
+    refill_interval=timedelta(seconds=settings.SCHEDULER_REFILL_SECONDS),
+    event_broker=event_broker,
+    email_outbox=email_outbox,
+)
+
+# Queues each timezone's daily digests once its local time reaches DIGEST_HOUR
+digest_runner = DigestRunner(
+    SessionLocal,
+    hour=settings.DIGEST_HOUR,
+    chunk_size=settings.DIGEST_CHUNK_SIZE,
+    email_outbox=email_outbox,
+)
+
+# Rolls materialized medication doses forward so DOSE_HORIZON_DAYS are always ahead
+dose_horizon = DoseHorizonRunner(SessionLocal, horizon=timedelta(days=settings.DOSE_HORIZON_DAYS))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup/shutdown hooks.
+    """
+    static_files.precompress()
+    page_cache.warm(PAGE_TEMPLATES)
+    if settings.EMAIL_OUTBOX_ENABLED:
+        email_outbox.start()
+    if settings.SCHEDULER_ENABLED:
+        reminder_scheduler.start()
+    if settings.DIGEST_ENABLED:
+        digest_runner.start()
+    if settings.DOSE_HORIZON_ENABLED:
+        dose_horizon.start()
+    yield
+    await dose_horizon.stop()
+    await digest_runner.stop()
+    await reminder_scheduler.stop()
+    await email_outbox.stop()
+
+app = FastAPI(title="PetWell", description="AI-powered pet care management platform", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -49,11 +202,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Admin-only per-request cProfile when "X-Profile: 1" is sent (PROFILING_ENABLED)
+app.add_middleware(ProfilingMiddleware)
+
+# Compress dynamic responses (JSON, rendered pages) above the size threshold
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Per-request SQL statement count and DB time (X-DB-Queries, Server-Timing)
+app.add_middleware(DBTimingMiddleware)
+
+# Per-route latency/status/size metrics (outermost, so sizes are bytes on the wire)
+app.add_middleware(MetricsMiddleware)
+metrics_registry.add_collector(pool_collector(engine))
+
 # Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", static_files, name="static")
 
 # Setup html directory
 templates = Jinja2Templates(directory="html")
+templates.env.globals["asset_url"] = static_files.asset_url
+
+# Page templates carry no per-request data: render once, serve from memory
+PAGE_TEMPLATES = [
+    "index_new.html",
+    "reports.html",
+    "pets.html",
+    "appointments.html",
+    "profile.html",
+    "settings.html",
+    "register.html",
+    "login.html",
+    "verify_email.html",
+]
+page_cache = PageCache(templates, auto_reload=settings.DEV_MODE)
 
 # Initialize OpenAI client
 openai_client = None
@@ -73,6 +254,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": exc.detail},
+        headers=exc.headers,
     )
 
 @app.exception_handler(RequestValidationError)
@@ -97,63 +279,63 @@ async def dashboard(request: Request):
     """
     Serve the dashboard/index page for logged-in users.
     """
-    return templates.TemplateResponse("index_new.html", {"request": request})
+    return page_cache.response(request, "index_new.html")
 
 @app.get("/reports")
 async def reports(request: Request):
     """
     Serve the health reports page.
     """
-    return templates.TemplateResponse("reports.html", {"request": request})
+    return page_cache.response(request, "reports.html")
 
 @app.get("/pets-page")
 async def pets_page(request: Request):
     """
     Serve the pets management page.
     """
-    return templates.TemplateResponse("pets.html", {"request": request})
+    return page_cache.response(request, "pets.html")
 
 @app.get("/appointments")
 async def appointments_page(request: Request):
     """
     Serve the appointments management page.
     """
-    return templates.TemplateResponse("appointments.html", {"request": request})
+    return page_cache.response(request, "appointments.html")
 
 @app.get("/profile")
 async def profile_page(request: Request):
     """
     Serve the user profile page.
     """
-    return templates.TemplateResponse("profile.html", {"request": request})
+    return page_cache.response(request, "profile.html")
 
 @app.get("/settings")
 async def settings_page(request: Request):
     """
     Serve the settings page.
     """
-    return templates.TemplateResponse("settings.html", {"request": request})
+    return page_cache.response(request, "settings.html")
 
 @app.get("/register")
 async def register_page(request: Request):
     """
     Serve the registration page.
     """
-    return templates.TemplateResponse("register.html", {"request": request})
+    return page_cache.response(request, "register.html")
 
 @app.get("/login")
 async def login_page(request: Request):
     """
     Serve the login page.
     """
-    return templates.TemplateResponse("login.html", {"request": request})
+    return page_cache.response(request, "login.html")
 
 @app.get("/verify-email")
 async def verify_email_page(request: Request):
     """
     Serve the email verification page.
     """
-    return templates.TemplateResponse("verify_email.html", {"request": request})
+    return page_cache.response(request, "verify_email.html")
 
 # User Authentication and Registration Routes
 @app.post("/users/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -162,7 +344,7 @@ async def register_user(
     db: Session = Depends(get_db)
 ):
     """
-    Register a new user and send verification email.
+    Register a new user and queue their verification email.
     """
     try:
         # Truncate password to avoid bcrypt 72-byte limit
@@ -172,20 +354,11 @@ async def register_user(
             user_dict['password'] = password_bytes.decode('utf-8', errors='ignore')
         
         user = User.register(db, user_dict)
+        # Queued in the same transaction; the outbox worker sends it
+        EmailOutboxService.enqueue_verification(db, user)
         db.commit()
         db.refresh(user)
-        
-        # Send verification email asynchronously
-        try:
-            await EmailService.send_verification_email(
-                user_email=user.email,
-                user_name=user.first_name,
-                verification_token=user.verification_token
-            )
-            logger.info(f"Verification email sent to {user.email}")
-        except Exception as email_error:
-            logger.error(f"Failed to send verification email: {str(email_error)}")
-            # Don't fail registration if email fails
+        email_outbox.notify()
         
         return UserRead.model_validate(user)
     except ValueError as e:
@@ -196,7 +369,7 @@ async def register_user(
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/users/login", response_model=Token)
+@app.post("/users/login", response_model=Token, dependencies=[Depends(limit_login_attempts)])
 async def login_user(
     user_credentials: UserLogin,
     db: Session = Depends(get_db)
@@ -244,7 +417,7 @@ async def register_user_legacy(
     """
     return await register_user(user_data, db)
 
-@app.post("/login", response_model=Token)
+@app.post("/login", response_model=Token, dependencies=[Depends(limit_login_attempts)])
 async def login_user_legacy(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
@@ -281,7 +454,7 @@ async def login_user_legacy(
         logger.error(f"Login error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/login/json", response_model=Token)
+@app.post("/login/json", response_model=Token, dependencies=[Depends(limit_login_attempts)])
 async def login_user_json(
     user_credentials: UserLogin,
     db: Session = Depends(get_db)
@@ -365,6 +538,34 @@ async def update_user_profile(
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to update profile")
 
+@app.patch("/users/me/preferences", response_model=UserResponse)
+async def update_user_preferences(
+    preferences: UserPreferencesUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Update the current user's timezone and daily digest setting.
+
+    A new timezone moves upcoming doses to its wall-clock times and rebuilds
+    the user's weekly adherence in the same transaction.
+    """
+    try:
+        changes = preferences.model_dump(exclude_unset=True, exclude_none=True)
+        timezone_changed = changes.get("timezone", current_user.timezone) != current_user.timezone
+        for field, value in changes.items():
+            setattr(current_user, field, value)
+        if timezone_changed:
+            MedicationScheduleService.timezone_changed(db, current_user, datetime.utcnow(),
+                                                       timedelta(days=settings.DOSE_HORIZON_DAYS))
+        db.commit()
+        db.refresh(current_user)
+        return UserResponse.model_validate(current_user)
+    except Exception as e:
+        logger.error(f"Update preferences error: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.post("/api/verify-email")
 async def verify_email(
     token: str,
@@ -447,20 +648,11 @@ async def resend_verification(
                 "message": "Email is already verified."
             }
         
-        # Generate new verification token
+        # Generate new verification token and queue the email with it
         user.generate_verification_token()
+        EmailOutboxService.enqueue_verification(db, user)
         db.commit()
-        
-        # Send verification email
-        try:
-            await EmailService.send_verification_email(
-                user_email=user.email,
-                user_name=user.first_name,
-                verification_token=user.verification_token
-            )
-            logger.info(f"Verification email resent to {user.email}")
-        except Exception as email_error:
-            logger.error(f"Failed to resend verification email: {str(email_error)}")
+        email_outbox.notify()
         
         return {
             "success": True,
@@ -517,6 +709,8 @@ async def change_password(
 # Pet BREAD endpoints
 @app.get("/pets", response_model=List[PetRead])
 async def browse_pets(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(get_current_active_user),
@@ -524,8 +718,15 @@ async def browse_pets(
 ):
     """
     Browse all pets belonging to the logged-in user with pagination.
+    Supports If-None-Match; unchanged collections return 304 without loading rows.
     """
     try:
+        count, last_modified = ETagService.collection_fingerprint(db, Pet, Pet.user_id == current_user.id)
+        etag = ETagService.make_etag("pets", current_user.id, skip, limit, count, last_modified)
+        if ETagService.is_not_modified(request, etag):
+            return ETagService.not_modified_response(etag)
+        ETagService.apply_headers(response, etag)
+        
         pets = db.query(Pet).filter(
             Pet.user_id == current_user.id
         ).offset(skip).limit(limit).all()
@@ -537,13 +738,25 @@ async def browse_pets(
 @app.get("/pets/{id}", response_model=PetRead)
 async def read_pet(
     id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Read a specific pet by ID (user-specific).
+    Supports If-None-Match and If-Modified-Since.
     """
     try:
+        count, last_modified = ETagService.collection_fingerprint(
+            db, Pet, Pet.id == id, Pet.user_id == current_user.id
+        )
+        if count:
+            etag = ETagService.make_etag("pet", id, last_modified)
+            if ETagService.is_not_modified(request, etag, last_modified):
+                return ETagService.not_modified_response(etag, last_modified)
+            ETagService.apply_headers(response, etag, last_modified)
+        
         pet = db.query(Pet).filter(
             Pet.id == id,
             Pet.user_id == current_user.id
@@ -602,6 +815,7 @@ async def add_pet(
         db.add(pet)
         db.commit()
         db.refresh(pet)
+        await publish_change(current_user, "pet", "created", pet.id)
         
         return PetRead.model_validate(pet)
     except ValueError as e:
@@ -637,6 +851,7 @@ async def edit_pet(
         
         db.commit()
         db.refresh(pet)
+        await publish_change(current_user, "pet", "updated", pet.id)
         
         return PetRead.model_validate(pet)
     except HTTPException:
@@ -674,6 +889,7 @@ async def patch_pet(
         
         db.commit()
         db.refresh(pet)
+        await publish_change(current_user, "pet", "updated", pet.id)
         
         return PetRead.model_validate(pet)
     except HTTPException:
@@ -705,6 +921,7 @@ async def delete_pet(
         
         db.delete(pet)
         db.commit()
+        await publish_change(current_user, "pet", "deleted", id)
         
         return None  # 204 No Content
     except HTTPException:
@@ -714,7 +931,68 @@ async def delete_pet(
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.post("/pets/{id}/regenerate-tips", response_model=PetRead)
+@app.get("/pets/{id}/health-score", response_model=HealthScoreRead)
+async def read_pet_health_score(
+    id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Health score (0-100) and activity statistics for a pet: rolling 7/30-day
+    activity minutes, weekly distance trend and medication adherence, computed
+    from the last 90 days of activities.
+    """
+    try:
+        pet = db.query(Pet).filter(
+            Pet.id == id,
+            Pet.user_id == current_user.id
+        ).first()
+        if not pet:
+            raise HTTPException(status_code=404, detail="Pet not found")
+        return HealthScoreService.for_pet(db, pet)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Health score error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/pets/{id}/activity-daily", response_model=List[ActivityDailyRead])
+async def read_pet_activity_daily(
+    id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Per-day activity totals (count, minutes, miles per activity type) for a pet,
+    read from the daily rollup rather than the raw activities. `start`/`end`
+    are inclusive days.
+    """
+    try:
+        if start and end and start > end:
+            raise HTTPException(status_code=400, detail="start must be on or before end")
+        pet = db.query(Pet).filter(
+            Pet.id == id,
+            Pet.user_id == current_user.id
+        ).first()
+        if not pet:
+            raise HTTPException(status_code=404, detail="Pet not found")
+
+        query = db.query(PetActivityDaily).filter(PetActivityDaily.pet_id == id)
+        if start:
+            query = query.filter(PetActivityDaily.day >= start)
+        if end:
+            query = query.filter(PetActivityDaily.day <= end)
+        rows = query.order_by(PetActivityDaily.day, PetActivityDaily.activity_type).all()
+        return [ActivityDailyRead.model_validate(row) for row in rows]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Activity daily error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/pets/{id}/regenerate-tips", response_model=PetRead, dependencies=[Depends(limit_ai_requests)])
 async def regenerate_care_tips(
     id: int,
     current_user: User = Depends(get_current_active_user),
@@ -753,6 +1031,7 @@ async def regenerate_care_tips(
         
         db.commit()
         db.refresh(pet)
+        await publish_change(current_user, "pet", "updated", pet.id)
         
         return PetRead.model_validate(pet)
     except HTTPException:
@@ -766,7 +1045,8 @@ async def regenerate_care_tips(
 # Activity Endpoints
 # ===========================
 
-@app.post("/activities", response_model=ActivityRead, status_code=status.HTTP_201_CREATED)
+@app.post("/activities", response_model=ActivityRead, status_code=status.HTTP_201_CREATED,
+          dependencies=[Depends(limit_ai_requests)])
 async def create_activity(
     activity: ActivityCreate,
     current_user: User = Depends(get_current_active_user),
@@ -821,11 +1101,14 @@ Return ONLY valid JSON, no markdown or explanation."""},
             activity.activity_type = "other"
             activity.title = activity.description[:50]
         
-        # Create activity
+        # Create activity (dates are stored as naive UTC)
+        activity.activity_date = naive_utc(activity.activity_date)
         new_activity = Activity(**activity.model_dump())
         db.add(new_activity)
+        ActivityRollupService.add(db, [new_activity])
         db.commit()
         db.refresh(new_activity)
+        await publish_change(current_user, "activity", "created", new_activity.id, pet_id=new_activity.pet_id)
         
         logger.info(f"Activity created: {new_activity.id} for pet {pet.name}")
         return ActivityRead.model_validate(new_activity)
@@ -836,8 +1119,87 @@ Return ONLY valid JSON, no markdown or explanation."""},
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/activities/bulk", response_model=ActivityBulkResult, status_code=status.HTTP_201_CREATED,
+          dependencies=[Depends(limit_bulk_ai_requests)])
+async def create_activities_bulk(
+    payload: ActivityBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import many activities at once (history imports, tracker syncs).
+    Ownership is checked with one query, descriptions are categorized in batched
+    AI prompts and all rows are stored with a single multi-row INSERT.
+    Items for unknown pets are listed in `failed`; items whose AI categorization
+    failed are still stored with a default type/title and listed in `enrichment_failed`.
+    """
+    try:
+        items = payload.activities
+        pet_ids = {item.pet_id for item in items}
+        pets = {
+            pet.id: pet
+            for pet in db.query(Pet).filter(Pet.id.in_(pet_ids), Pet.user_id == current_user.id)
+        }
+        failed = [
+            ActivityBulkError(index=i, detail="Pet not found")
+            for i, item in enumerate(items) if item.pet_id not in pets
+        ]
+        accepted = [(i, item) for i, item in enumerate(items) if item.pet_id in pets]
+
+        # Items that already carry a type and title skip the AI round trip
+        to_enrich = [
+            (i, f"{pets[item.pet_id].name} ({pets[item.pet_id].species})", item.description)
+            for i, item in accepted if not (item.activity_type and item.title)
+        ]
+        enriched, enrichment_errors = {}, {}
+        if openai_client and to_enrich:
+            enriched, enrichment_errors = await ActivityEnrichmentService.enrich(
+                openai_client, settings.AI_MODEL, to_enrich
+            )
+
+        rows = []
+        for i, item in accepted:
+            row = item.model_dump()
+            for key, value in enriched.get(i, {}).items():
+                if row.get(key) is None:
+                    row[key] = value
+            row["activity_type"] = row["activity_type"] or "other"
+            row["title"] = row["title"] or item.description[:50]
+            row["activity_date"] = naive_utc(row["activity_date"])
+            rows.append(row)
+
+        created = []
+        if rows:
+            new_activities = db.scalars(
+                insert(Activity).returning(Activity, sort_by_parameter_order=True), rows
+            ).all()
+            # Serialize before commit so the rows are not expired and reloaded one by one
+            created = [ActivityRead.model_validate(activity) for activity in new_activities]
+            ActivityRollupService.add(db, new_activities)
+            db.commit()
+            for pet_id in sorted({activity.pet_id for activity in created}):
+                await publish_change(current_user, "activity", "created", None, pet_id=pet_id)
+
+        logger.info(f"Bulk import: {len(created)} activities created, {len(failed)} failed, "
+                    f"{len(enrichment_errors)} not enriched")
+        return ActivityBulkResult(
+            created=created,
+            failed=failed,
+            enrichment_failed=[
+                ActivityBulkError(index=i, detail=detail) for i, detail in sorted(enrichment_errors.items())
+            ]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk create activities error: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/activities", response_model=List[ActivityRead])
 async def get_activities(
+    request: Request,
+    response: Response,
     pet_id: int = None,
     skip: int = 0,
     limit: int = 100,
@@ -847,18 +1209,27 @@ async def get_activities(
     """
     Get all activities for the current user's pets.
     Optionally filter by pet_id.
+    Supports If-None-Match; unchanged collections return 304 without loading rows.
     """
     try:
         # Get user's pet IDs
         user_pet_ids = [pet.id for pet in current_user.pets]
         
-        query = db.query(Activity).filter(Activity.pet_id.in_(user_pet_ids))
+        criteria = [Activity.pet_id.in_(user_pet_ids)]
         
         if pet_id:
             # Verify pet belongs to user
             if pet_id not in user_pet_ids:
                 raise HTTPException(status_code=404, detail="Pet not found")
-            query = query.filter(Activity.pet_id == pet_id)
+            criteria.append(Activity.pet_id == pet_id)
+        
+        count, last_modified = ETagService.collection_fingerprint(db, Activity, *criteria)
+        etag = ETagService.make_etag("activities", current_user.id, pet_id, skip, limit, count, last_modified)
+        if ETagService.is_not_modified(request, etag):
+            return ETagService.not_modified_response(etag)
+        ETagService.apply_headers(response, etag)
+        
+        query = db.query(Activity).filter(*criteria)
         
         activities = query.order_by(Activity.activity_date.desc()).offset(skip).limit(limit).all()
         return [ActivityRead.model_validate(activity) for activity in activities]
@@ -868,7 +1239,7 @@ async def get_activities(
         logger.error(f"Get activities error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@app.get("/activities/sorted/ai")
+@app.get("/activities/sorted/ai", dependencies=[Depends(limit_ai_requests)])
 async def get_activities_sorted_by_ai(
     pet_id: int = None,
     current_user: User = Depends(get_current_active_user),
@@ -1005,12 +1376,17 @@ async def update_activity(
             raise HTTPException(status_code=404, detail="Activity not found")
         
         # Update fields
+        before = ActivityRollupService.contribution(activity)
         update_data = activity_update.model_dump(exclude_unset=True)
+        if "activity_date" in update_data:
+            update_data["activity_date"] = naive_utc(update_data["activity_date"])
         for key, value in update_data.items():
             setattr(activity, key, value)
+        ActivityRollupService.replace(db, before, activity)
         
         db.commit()
         db.refresh(activity)
+        await publish_change(current_user, "activity", "updated", activity.id, pet_id=activity.pet_id)
         
         logger.info(f"Activity updated: {activity.id}")
         return ActivityRead.model_validate(activity)
@@ -1042,8 +1418,11 @@ async def delete_activity(
         if not activity:
             raise HTTPException(status_code=404, detail="Activity not found")
         
+        pet_id = activity.pet_id
+        ActivityRollupService.remove(db, activity)
         db.delete(activity)
         db.commit()
+        await publish_change(current_user, "activity", "deleted", id, pet_id=pet_id)
         
         logger.info(f"Activity deleted: {id}")
         return None
@@ -1073,11 +1452,19 @@ async def create_medication(
         if not pet:
             raise HTTPException(status_code=404, detail="Pet not found")
         
-        # Create medication
-        new_medication = Medication(**medication.model_dump())
+        # Create medication (dates are stored as naive UTC, like the dose times)
+        medication_data = medication.model_dump()
+        for key in ("start_date", "end_date"):
+            medication_data[key] = naive_utc(medication_data[key])
+        new_medication = Medication(**medication_data)
         db.add(new_medication)
+        # Parse the frequency once, here, and write the upcoming doses with it
+        MedicationScheduleService.apply_schedule(new_medication)
+        MedicationScheduleService.materialize(db, new_medication, current_user, datetime.utcnow(),
+                                              timedelta(days=settings.DOSE_HORIZON_DAYS))
         db.commit()
         db.refresh(new_medication)
+        await publish_change(current_user, "medication", "created", new_medication.id, pet_id=new_medication.pet_id)
         
         logger.info(f"Medication created: {new_medication.id} for pet {pet.name}")
         return MedicationRead.model_validate(new_medication)
@@ -1090,6 +1477,8 @@ async def create_medication(
 
 @app.get("/medications", response_model=List[MedicationRead])
 async def get_medications(
+    request: Request,
+    response: Response,
     pet_id: int = None,
     active_only: bool = True,
     skip: int = 0,
@@ -1100,21 +1489,32 @@ async def get_medications(
     """
     Get all medications for the current user's pets.
     Optionally filter by pet_id and active status.
+    Supports If-None-Match; unchanged collections return 304 without loading rows.
     """
     try:
         # Get user's pet IDs
         user_pet_ids = [pet.id for pet in current_user.pets]
         
-        query = db.query(Medication).filter(Medication.pet_id.in_(user_pet_ids))
+        criteria = [Medication.pet_id.in_(user_pet_ids)]
         
         if pet_id:
             # Verify pet belongs to user
             if pet_id not in user_pet_ids:
                 raise HTTPException(status_code=404, detail="Pet not found")
-            query = query.filter(Medication.pet_id == pet_id)
+            criteria.append(Medication.pet_id == pet_id)
         
         if active_only:
-            query = query.filter(Medication.is_active == True)
+            criteria.append(Medication.is_active == True)
+        
+        count, last_modified = ETagService.collection_fingerprint(db, Medication, *criteria)
+        etag = ETagService.make_etag(
+            "medications", current_user.id, pet_id, active_only, skip, limit, count, last_modified
+        )
+        if ETagService.is_not_modified(request, etag):
+            return ETagService.not_modified_response(etag)
+        ETagService.apply_headers(response, etag)
+        
+        query = db.query(Medication).filter(*criteria)
         
         medications = query.order_by(Medication.start_date.desc()).offset(skip).limit(limit).all()
         return [MedicationRead.model_validate(med) for med in medications]
@@ -1124,6 +1524,78 @@ async def get_medications(
         logger.error(f"Get medications error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/medications/upcoming", response_model=List[MedicationDoseRead])
+async def get_upcoming_doses(
+    hours: int = Query(24, ge=1, le=24 * 14),
+    pet_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Medication doses due in the next ``hours`` (default 24), soonest first.
+
+    Reads the materialized medication_doses table: one range scan on
+    (user_id, scheduled_at), no frequency parsing at request time.
+    """
+    try:
+        now = datetime.utcnow()
+        query = (
+            db.query(MedicationDose.id, MedicationDose.medication_id, MedicationDose.pet_id,
+                     Pet.name.label("pet_name"), Medication.name, Medication.dosage, Medication.route,
+                     MedicationDose.scheduled_at, DoseLog.status)
+            .join(Medication, MedicationDose.medication_id == Medication.id)
+            .join(Pet, MedicationDose.pet_id == Pet.id)
+            .outerjoin(DoseLog, (DoseLog.medication_id == MedicationDose.medication_id)
+                       & (DoseLog.scheduled_at == MedicationDose.scheduled_at))
+            .filter(
+                MedicationDose.user_id == current_user.id,
+                MedicationDose.scheduled_at >= now,
+                MedicationDose.scheduled_at < now + timedelta(hours=hours),
+            )
+        )
+        if pet_id is not None:
+            query = query.filter(MedicationDose.pet_id == pet_id)
+        rows = query.order_by(MedicationDose.scheduled_at, MedicationDose.id).all()
+        return [MedicationDoseRead.model_validate(row) for row in rows]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get upcoming doses error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/medications/adherence", response_model=List[MedicationAdherenceRead])
+async def get_medication_adherence(
+    weeks: int = Query(4, ge=1, le=52),
+    pet_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Weekly dose adherence per medication for the last ``weeks`` weeks, newest first.
+
+    Read from the precomputed medication_adherence_weekly rollup; weeks start on
+    Monday in the user's timezone. Future weeks are not returned, and the current
+    week only counts doses that are due (or already checked off).
+    """
+    try:
+        now = datetime.utcnow()
+        tz_name = current_user.timezone or "UTC"
+        since = week_start(now, tz_name) - timedelta(weeks=weeks - 1)
+        rows = AdherenceService.weekly(db, current_user.id, since, pet_id, now=now, tz_name=tz_name)
+        return [
+            MedicationAdherenceRead(
+                medication_id=row.medication_id, pet_id=row.pet_id, pet_name=row.pet_name, name=row.name,
+                week_start=row.week_start, expected=row.expected, given=row.given, skipped=row.skipped,
+                adherence=row.adherence,
+            )
+            for row in rows
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get medication adherence error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/medications/{id}", response_model=MedicationRead)
 async def get_medication(
     id: int,
@@ -1176,11 +1648,20 @@ async def update_medication(
         
         # Update fields
         update_data = medication_update.model_dump(exclude_unset=True)
+        for key in ("start_date", "end_date"):
+            if key in update_data:
+                update_data[key] = naive_utc(update_data[key])
         for key, value in update_data.items():
             setattr(medication, key, value)
+        if "frequency" in update_data or "start_date" in update_data:
+            MedicationScheduleService.apply_schedule(medication)
+        # Dates and is_active also change which doses are due
+        MedicationScheduleService.materialize(db, medication, current_user, datetime.utcnow(),
+                                              timedelta(days=settings.DOSE_HORIZON_DAYS))
         
         db.commit()
         db.refresh(medication)
+        await publish_change(current_user, "medication", "updated", medication.id, pet_id=medication.pet_id)
         
         logger.info(f"Medication updated: {medication.id}")
         return MedicationRead.model_validate(medication)
@@ -1212,8 +1693,10 @@ async def delete_medication(
         if not medication:
             raise HTTPException(status_code=404, detail="Medication not found")
         
+        pet_id = medication.pet_id
         db.delete(medication)
         db.commit()
+        await publish_change(current_user, "medication", "deleted", id, pet_id=pet_id)
         
         logger.info(f"Medication deleted: {id}")
         return None
@@ -1224,6 +1707,106 @@ async def delete_medication(
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/medications/{id}/doses", response_model=DoseLogRead, status_code=status.HTTP_201_CREATED)
+async def log_medication_dose(
+    id: int,
+    dose: DoseLogCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Check off a dose as given (or skipped).
+
+    Without ``scheduled_at`` the nearest scheduled dose within 6 hours that is
+    still open is checked off; if there is none the dose is logged as
+    unscheduled and does not count towards adherence.
+    """
+    try:
+        user_pet_ids = [pet.id for pet in current_user.pets]
+        medication = db.query(Medication).filter(
+            Medication.id == id,
+            Medication.pet_id.in_(user_pet_ids)
+        ).first()
+        if not medication:
+            raise HTTPException(status_code=404, detail="Medication not found")
+
+        try:
+            log = AdherenceService.log_dose(db, medication, current_user, dose.given_at, dose.status,
+                                            dose.scheduled_at, dose.notes)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        db.commit()
+        db.refresh(log)
+        await publish_change(current_user, "medication", "updated", id, pet_id=log.pet_id)
+
+        return DoseLogRead.model_validate(log)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Log medication dose error: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/medications/{id}/doses", response_model=List[DoseLogRead])
+async def get_medication_doses(
+    id: int,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Dose log of a medication, most recent first.
+    """
+    try:
+        user_pet_ids = [pet.id for pet in current_user.pets]
+        medication = db.query(Medication.id).filter(
+            Medication.id == id,
+            Medication.pet_id.in_(user_pet_ids)
+        ).first()
+        if not medication:
+            raise HTTPException(status_code=404, detail="Medication not found")
+
+        logs = db.query(DoseLog).filter(DoseLog.medication_id == id) \
+            .order_by(DoseLog.given_at.desc(), DoseLog.id.desc()).offset(skip).limit(limit).all()
+        return [DoseLogRead.model_validate(log) for log in logs]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get medication doses error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.delete("/medications/{id}/doses/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_medication_dose(
+    id: int,
+    log_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Undo a dose check-off.
+    """
+    try:
+        log = db.query(DoseLog).filter(
+            DoseLog.id == log_id,
+            DoseLog.medication_id == id,
+            DoseLog.user_id == current_user.id
+        ).first()
+        if not log:
+            raise HTTPException(status_code=404, detail="Dose not found")
+
+        pet_id = log.pet_id
+        AdherenceService.remove_log(db, log, current_user)
+        db.commit()
+        await publish_change(current_user, "medication", "updated", id, pet_id=pet_id)
+        return None
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Delete medication dose error: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 # Reminder Endpoints
 
 @app.post("/reminders", response_model=ReminderRead)
@@ -1249,6 +1832,9 @@ async def create_reminder(
         db.add(db_reminder)
         db.commit()
         db.refresh(db_reminder)
+        if not db_reminder.is_completed:
+            reminder_scheduler.schedule(db_reminder.id, db_reminder.reminder_date)
+        await publish_change(current_user, "reminder", "created", db_reminder.id, pet_id=db_reminder.pet_id)
         
         logger.info(f"Reminder created: {db_reminder.id} for user {current_user.id}")
         return db_reminder
@@ -1261,6 +1847,8 @@ async def create_reminder(
 
 @app.get("/reminders", response_model=List[ReminderRead])
 async def get_reminders(
+    request: Request,
+    response: Response,
     completed: bool = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -1268,12 +1856,21 @@ async def get_reminders(
     """
     Get all reminders for the authenticated user.
     Optional filter: completed (true/false)
+    Supports If-None-Match; unchanged collections return 304 without loading rows.
     """
     try:
-        query = db.query(Reminder).filter(Reminder.user_id == current_user.id)
+        criteria = [Reminder.user_id == current_user.id]
         
         if completed is not None:
-            query = query.filter(Reminder.is_completed == completed)
+            criteria.append(Reminder.is_completed == completed)
+        
+        count, last_modified = ETagService.collection_fingerprint(db, Reminder, *criteria)
+        etag = ETagService.make_etag("reminders", current_user.id, completed, count, last_modified)
+        if ETagService.is_not_modified(request, etag):
+            return ETagService.not_modified_response(etag)
+        ETagService.apply_headers(response, etag)
+        
+        query = db.query(Reminder).filter(*criteria)
         
         reminders = query.order_by(Reminder.reminder_date).all()
         logger.info(f"Retrieved {len(reminders)} reminders for user {current_user.id}")
@@ -1336,9 +1933,17 @@ async def update_reminder(
         update_data = reminder_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(reminder, field, value)
+        # A rescheduled reminder fires again at its new time
+        if "reminder_date" in update_data:
+            reminder.notified_at = None
         
         db.commit()
         db.refresh(reminder)
+        if reminder.is_completed or reminder.notified_at:
+            reminder_scheduler.unschedule(reminder.id)
+        else:
+            reminder_scheduler.schedule(reminder.id, reminder.reminder_date)
+        await publish_change(current_user, "reminder", "updated", reminder.id, pet_id=reminder.pet_id)
         
         logger.info(f"Reminder updated: {id}")
         return reminder
@@ -1367,8 +1972,11 @@ async def delete_reminder(
         if not reminder:
             raise HTTPException(status_code=404, detail="Reminder not found")
         
+        pet_id = reminder.pet_id
         db.delete(reminder)
         db.commit()
+        reminder_scheduler.unschedule(id)
+        await publish_change(current_user, "reminder", "deleted", id, pet_id=pet_id)
         
         logger.info(f"Reminder deleted: {id}")
         return None
@@ -1379,6 +1987,242 @@ async def delete_reminder(
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# ===========================
+# Notification Endpoints
+# ===========================
+
+@app.get("/notifications", response_model=List[NotificationRead])
+async def get_notifications(
+    request: Request,
+    response: Response,
+    unread: bool = False,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    In-app notifications (fired reminders) for the authenticated user, newest first.
+    Supports If-None-Match, so checking for new notifications is a single aggregate query.
+    """
+    try:
+        criteria = [Notification.user_id == current_user.id]
+        if unread:
+            criteria.append(Notification.read_at.is_(None))
+
+        count, last_modified = ETagService.collection_fingerprint(db, Notification, *criteria)
+        etag = ETagService.make_etag("notifications", current_user.id, unread, limit, count, last_modified)
+        if ETagService.is_not_modified(request, etag):
+            return ETagService.not_modified_response(etag)
+        ETagService.apply_headers(response, etag)
+
+        notifications = db.query(Notification).filter(*criteria).order_by(
+            Notification.created_at.desc(), Notification.id.desc()
+        ).limit(limit).all()
+        return notifications
+    except Exception as e:
+        logger.error(f"Get notifications error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/notifications/read-all")
+async def mark_all_notifications_read(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Mark every unread notification as read.
+    """
+    try:
+        updated = db.query(Notification).filter(
+            Notification.user_id == current_user.id,
+            Notification.read_at.is_(None)
+        ).update({Notification.read_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        if updated:
+            await publish_change(current_user, "notification", "updated", None)
+        return {"updated": updated}
+    except Exception as e:
+        logger.error(f"Mark notifications read error: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/notifications/{id}/read", response_model=NotificationRead)
+async def mark_notification_read(
+    id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Mark a notification as read.
+    """
+    try:
+        notification = db.query(Notification).filter(
+            Notification.id == id,
+            Notification.user_id == current_user.id
+        ).first()
+        if not notification:
+            raise HTTPException(status_code=404, detail="Notification not found")
+
+        if notification.read_at is None:
+            notification.read_at = datetime.utcnow()
+            db.commit()
+            db.refresh(notification)
+            await publish_change(current_user, "notification", "updated", notification.id)
+        return notification
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Mark notification read error: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+# ===========================
+# Event Stream
+# ===========================
+
+@app.post("/events/ticket", response_model=EventsTicket)
+async def create_events_ticket(current_user: User = Depends(get_current_active_user)):
+    """
+    Ticket for opening `/events?ticket=` from a browser.
+
+    EventSource cannot send headers, and a query string ends up in access
+    logs, so the stream takes this short-lived ticket instead of the JWT; it
+    only opens the stream and expires after EVENTS_TICKET_SECONDS.
+    """
+    return EventsTicket(ticket=User.create_events_ticket(current_user.id), expires_in=EVENTS_TICKET_SECONDS)
+
+@app.get("/events")
+async def stream_events(
+    request: Request,
+    ticket: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Server-sent events announcing changes to the user's pets, activities,
+    medications, reminders and notifications, e.g.
+    `event: reminder` / `data: {"resource": "reminder", "action": "updated", "id": 3, "pet_id": 1}`.
+    Pages subscribe once and refetch only the affected resource; a `resync`
+    event means events were dropped and everything should be reloaded.
+
+    Browsers pass a ticket from `POST /events/ticket` as `?ticket=` (EventSource
+    cannot send headers); other clients may send the usual bearer token.
+    """
+    authorization = request.headers.get("authorization", "")
+    if ticket:
+        user_id = User.verify_events_ticket(ticket)
+    elif authorization.lower().startswith("bearer "):
+        user_id = User.verify_token(authorization[7:])
+    else:
+        user_id = None
+    user = db.query(User).filter(User.id == user_id).first() if user_id else None
+    if not user or not user.is_active:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    user_id = user.id
+    # The stream stays open for as long as the page; don't hold a pooled connection
+    db.close()
+
+    async def stream():
+        async with event_broker.subscribe(user_id) as subscription:
+            yield b"retry: 5000\n: connected\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                yield format_sse(event) if event else b": keepalive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ===========================
+# Search Endpoints
+# ===========================
+
+@app.get("/search", response_model=List[SearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[List[Literal["activity", "medication", "pet"]]] = Query(None, alias="type"),
+    pet_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search over the user's activities, medications and pet medical notes.
+
+    Words are matched in any form ("vomiting" finds "vomited") and all must
+    appear; "quoted phrases" match as a phrase and -word excludes. Results are
+    ranked (title/name matches weigh most) with an excerpt in which matches are
+    wrapped in <mark>. Repeat ``type`` to search only some record types.
+    """
+    try:
+        hits = SearchService.search(db, current_user.id, q, types, pet_id, limit)
+        return [SearchResult.model_validate(hit) for hit in hits]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Search error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+# ===========================
+# Export Endpoints
+# ===========================
+
+@app.get("/export/{dataset}")
+async def export_history(
+    dataset: Literal["activities", "medications", "reminders"],
+    fmt: Literal["csv", "ndjson", "arrow", "parquet"] = Query("csv", alias="format"),
+    pet_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Download the user's full activity, medication or reminder history as CSV or
+    NDJSON, grouped per pet. Rows are streamed from a server-side cursor, so
+    memory use does not grow with history size. `start`/`end` are inclusive days.
+
+    `arrow` (Arrow IPC file) and `parquet` return typed columnar files for
+    analytics. Admins may export any pet's history by passing `pet_id`.
+    """
+    try:
+        if start and end and start > end:
+            raise HTTPException(status_code=400, detail="start must be on or before end")
+        if fmt in COLUMNAR_FORMATS and not HAS_PYARROW:
+            raise HTTPException(status_code=501, detail="Columnar export is not available on this server")
+
+        owner_id = current_user.id
+        if pet_id is not None:
+            query = db.query(Pet).filter(Pet.id == pet_id)
+            if not current_user.is_admin:
+                query = query.filter(Pet.user_id == current_user.id)
+            pet = query.first()
+            if not pet:
+                raise HTTPException(status_code=404, detail="Pet not found")
+            if current_user.is_admin:
+                owner_id = None
+
+        stmt = ExportService.build_query(dataset, owner_id, pet_id, start, end)
+        filename = ExportService.filename(dataset, fmt, pet_id)
+        headers = {
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+        }
+        logger.info(f"Export {dataset} ({fmt}) for user {current_user.username}")
+        if fmt in COLUMNAR_FORMATS:
+            content = await run_in_threadpool(ExportService.write_columnar, db, stmt, fmt)
+            return Response(content=content, media_type=COLUMNAR_FORMATS[fmt], headers=headers)
+        return StreamingResponse(
+            ExportService.stream(db, stmt, fmt),
+            media_type=EXPORT_FORMATS[fmt],
+            headers=headers
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Export error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 # ============================================================
 # VET CHATBOT ENDPOINT
 # ============================================================
@@ -1388,7 +2232,14 @@ class ChatMessage(BaseModel):
     conversation_history: List[dict] = []
     pets: List[dict] = []
 
-@app.post("/chat/vet")
+# Answers to near-identical first questions, per pet profile (see SemanticCache)
+vet_chat_cache = SemanticCache(
+    threshold=settings.CHAT_CACHE_THRESHOLD,
+    ttl=settings.CHAT_CACHE_TTL_SECONDS,
+    max_entries=settings.CHAT_CACHE_MAX_ENTRIES,
+)
+
+@app.post("/chat/vet", dependencies=[Depends(limit_ai_requests)])
 async def chat_with_vet(
     chat_data: ChatMessage,
     current_user: User = Depends(get_current_active_user),
@@ -1396,6 +2247,10 @@ async def chat_with_vet(
 ):
     """
     AI-powered veterinary chatbot that provides guidance based on user's pet data.
+
+    First questions that are near-identical to a recent one about pets with the
+    same species, breed, age and weight are answered from the semantic cache
+    ("cached": true), unless a pet's medical notes are part of the context.
     """
     try:
         if not openai_client:
@@ -1404,6 +2259,20 @@ async def chat_with_vet(
                 detail="AI service is currently unavailable. Please try again later."
             )
         
+        context = pet_context(chat_data.pets)
+        bypass = bypass_reason(chat_data.pets, chat_data.conversation_history) \
+            if settings.CHAT_CACHE_ENABLED else "disabled"
+        if bypass is None:
+            lookup = vet_chat_cache.lookup(chat_data.message, context)
+            if lookup.entry is not None:
+                cache_requests_total.inc(result="hit")
+                cache_saved_seconds_total.inc(lookup.entry.latency)
+                logger.info(f"Vet chat cache hit - User: {current_user.username}, similarity {lookup.similarity:.2f}")
+                return {"response": lookup.entry.response, "cached": True}
+            cache_requests_total.inc(result="miss")
+        else:
+            cache_requests_total.inc(result="bypass")
+        
         # Build context from user's pets
         pets_context = ""
         if chat_data.pets:
@@ -1478,18 +2347,23 @@ Remember: Concerned pet owners need reassurance and clear direction, not informa
         })
         
         # Get AI response
+        started = time.perf_counter()
         response = openai_client.chat.completions.create(
             model=settings.AI_MODEL,
             messages=messages,
             temperature=0.8,
             max_tokens=300
         )
+        latency = time.perf_counter() - started
+        llm_seconds.observe(latency)
         
         ai_response = response.choices[0].message.content
+        if bypass is None and ai_response and is_shareable(ai_response, chat_data.pets):
+            vet_chat_cache.store(chat_data.message, context, ai_response, latency)
         
         logger.info(f"Vet chat - User: {current_user.username}, Message length: {len(chat_data.message)}, Response length: {len(ai_response)}")
         
-        return {"response": ai_response}
+        return {"response": ai_response, "cached": False}
         
     except HTTPException:
         raise
@@ -1505,7 +2379,69 @@ async def health_check():
     """
     Health check endpoint for monitoring and Docker health checks.
     """
-    return {"status": "healthy", "timestamp": "2025-11-30"}
+    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    """
+    Prometheus metrics: per-route latency histograms, status codes, response
+    sizes, in-flight requests, DB pool stats and process RSS/CPU.
+    """
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not secrets.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(
+        content=metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+def _require_profiling_enabled():
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.post("/admin/profiler/sample")
+async def sample_profile(
+    seconds: float = 10.0,
+    interval_ms: float = 5.0,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Run the statistical sampler for ``seconds`` and return collapsed stacks
+    (feed to flamegraph.pl or speedscope). Admin only.
+    """
+    _require_profiling_enabled()
+    if seconds <= 0 or interval_ms <= 0:
+        raise HTTPException(status_code=400, detail="seconds and interval_ms must be positive")
+
+    sampler = StackSampler(interval=interval_ms / 1000)
+    try:
+        # Sample from a worker thread so the event loop keeps serving traffic
+        collapsed = await run_in_threadpool(sampler.run, seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    logger.info(f"Sampling profile by {current_user.username}: {sampler.sample_count} samples")
+    return Response(
+        content=collapsed,
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'}
+    )
+
+@app.get("/admin/profiler/requests/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Fetch a per-request profile captured via the X-Profile header. Admin only."""
+    _require_profiling_enabled()
+    entry = profile_store.get(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        content=f"{entry['method']} {entry['path']}\n\n{entry['report']}",
+        media_type="text/plain; charset=utf-8"
+    )
 
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -15,6 +15,10 @@ document.addEventListener('DOMContentLoaded', () => {
     loadAppointments();
     setupEventListeners();
     setupNavbar();
+    
+    // Appointments are reminders; reload when one changes (see events.js)
+    window.addEventListener('petwell:reminder', () => loadAppointments());
+    window.addEventListener('petwell:resync', () => loadAppointments());
 });
 
 // Set user avatar initials
@@ -677,6 +677,12 @@ document.addEventListener('DOMContentLoaded', () => {
     loadUpcomingEvents();
     loadReminders();
     
+    // Refresh only what changed (see events.js)
+    window.addEventListener('petwell:pet', () => { loadPets(); loadUpcomingEvents(); });
+    window.addEventListener('petwell:medication', () => loadUpcomingEvents());
+    window.addEventListener('petwell:reminder', () => { loadReminders(); loadUpcomingEvents(); });
+    window.addEventListener('petwell:resync', () => { loadPets(); loadUpcomingEvents(); loadReminders(); });
+    
     // Navbar functionality
     setupNavbar();
     
@@ -0,0 +1,92 @@
+// Live change events (server-sent events from /events)
+//
+// One connection per page. Each change is re-dispatched on window as
+// "petwell:<resource>" (pet, activity, medication, reminder, notification)
+// with the event payload in `detail`; "petwell:resync" means events were
+// missed and the page should reload everything it shows.
+//
+// The stream is opened with a short-lived ticket from POST /events/ticket
+// rather than the login token, which would end up in access logs. Tickets
+// expire, so after an error we close the source and reconnect with a new one
+// instead of letting the browser retry the old URL.
+
+(function () {
+    const token = localStorage.getItem('token');
+    if (!token || !window.EventSource) {
+        return;
+    }
+
+    const resources = ['pet', 'activity', 'medication', 'reminder', 'notification', 'resync'];
+    const RETRY_MS = 5000;
+    let source = null;
+    let dropped = false;
+    let closed = false;
+
+    async function fetchTicket() {
+        const response = await fetch('/events/ticket', {
+            method: 'POST',
+            headers: {
+                'Authorization': `Bearer ${token}`
+            }
+        });
+        if (!response.ok) {
+            throw new Error(`Ticket request failed: ${response.status}`);
+        }
+        return (await response.json()).ticket;
+    }
+
+    function retry() {
+        dropped = true;
+        if (!closed) {
+            setTimeout(connect, RETRY_MS);
+        }
+    }
+
+    async function connect() {
+        let ticket;
+        try {
+            ticket = await fetchTicket();
+        } catch (error) {
+            console.error('Could not open change events:', error);
+            retry();
+            return;
+        }
+        if (closed) {
+            return;
+        }
+        source = new EventSource(`/events?ticket=${encodeURIComponent(ticket)}`);
+
+        resources.forEach(resource => {
+            source.addEventListener(resource, (event) => {
+                let detail = {};
+                try {
+                    detail = JSON.parse(event.data);
+                } catch (error) {
+                    console.error('Bad change event:', error);
+                }
+                window.dispatchEvent(new CustomEvent(`petwell:${resource}`, { detail }));
+            });
+        });
+
+        // After a gap we may have missed changes
+        source.addEventListener('open', () => {
+            if (dropped) {
+                dropped = false;
+                window.dispatchEvent(new CustomEvent('petwell:resync', { detail: {} }));
+            }
+        });
+        source.addEventListener('error', () => {
+            source.close();
+            retry();
+        });
+    }
+
+    connect();
+
+    window.addEventListener('beforeunload', () => {
+        closed = true;
+        if (source) {
+            source.close();
+        }
+    });
+})();
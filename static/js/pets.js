@@ -451,6 +451,11 @@ document.addEventListener('DOMContentLoaded', () => {
     loadPets();
     setupNavbar();
     
+    // Refresh the cards when pets or their records change (see events.js)
+    ['pet', 'activity', 'medication', 'reminder', 'resync'].forEach(resource => {
+        window.addEventListener(`petwell:${resource}`, () => loadPets());
+    });
+    
     // Add pet button
     document.getElementById('addPetBtn').addEventListener('click', () => {
         document.getElementById('addPetModal').classList.remove('hidden');
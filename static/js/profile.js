@@ -263,3 +263,8 @@ document.getElementById('changePasswordModal')?.addEventListener('click', (e) =>
 // Initialize
 setupNavbar();
 loadProfile();
+
+// Keep the stats current (see events.js)
+['pet', 'activity', 'reminder', 'resync'].forEach(resource => {
+    window.addEventListener(`petwell:${resource}`, () => loadStats());
+});
@@ -96,6 +96,14 @@ def create_fake_user() -> Dict[str, str]:
         "password": fake.password(length=12)
     }
 
+def override_get_db():
+    """get_db replacement that binds the app to the test database."""
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 @contextmanager
 def managed_db_session():
     """
@@ -153,6 +161,24 @@ def get_auth_headers(access_token: str) -> Dict[str, str]:
     """
     return {"Authorization": f"Bearer {access_token}"}
 
+def create_verified_user_headers(session: 'Session', user_data: Dict[str, str] = None):
+    """
+    Create a verified test user and mint a token without the bcrypt login round trip.
+
+    Args:
+        session: Database session
+        user_data: Optional user data dictionary. If None, generates fake data.
+
+    Returns:
+        Tuple of (User instance, auth headers dictionary)
+    """
+    user = create_test_user(session, user_data)
+    user.is_verified = True
+    session.commit()
+    session.refresh(user)
+    token = User.create_access_token({"sub": str(user.id)})
+    return user, get_auth_headers(token)
+
 def authenticate_test_user(client, username: str, password: str) -> Dict[str, str]:
     """
     Authenticate a test user and return auth headers.
@@ -237,6 +263,19 @@ def setup_test_database(request):
         drop_db()
         logger.info("Dropped test database tables.")
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """
+    Start every test with full rate-limit buckets: all TestClient requests
+    come from the same client address, so login limits would otherwise
+    carry over between tests.
+    """
+    import sys
+    app_module = sys.modules.get("main")
+    if app_module is not None:
+        app_module.rate_limiter.store.reset()
+    yield
+
 @pytest.fixture
 def db_session(request) -> Generator[Any, None, None]:
     """
@@ -285,6 +324,32 @@ def test_user(db_session: Any) -> Any:
     logger.info(f"Created test user with ID: {user.id}")
     return user
 
+@pytest.fixture
+def client():
+    """
+    TestClient for the app, with get_db bound to the test database.
+
+    Modules that need more (AI off, profiling on) override it with a
+    ``client(client, monkeypatch)`` fixture of their own.
+    """
+    from fastapi.testclient import TestClient
+    from main import app
+    from app.database import get_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+@pytest.fixture
+def owner(db_session: Any):
+    """A verified user with one dog; returns (user, headers, pet_id)."""
+    from app.models.pet import Pet
+
+    user, headers = create_verified_user_headers(db_session)
+    pet = Pet(name="Max", species="dog", user_id=user.id)
+    db_session.add(pet)
+    db_session.commit()
+    return user, headers, pet.id
+
 @pytest.fixture
 def seed_users(db_session: Any, request) -> List[Any]:
     """
@@ -0,0 +1,95 @@
+# tests/integration/test_activities_bulk.py
+
+import pytest
+
+import main
+from app.models.activity import Activity
+from app.services.activity_enrichment import ActivityEnrichmentService
+from benchmarks.fakes import FakeOpenAI
+
+def _items(pet_id, count, **extra):
+    return [
+        {"pet_id": pet_id, "activity_date": f"2025-03-{(i % 28) + 1:02d}T08:00:00",
+         "description": f"Walked {i} miles in the park", **extra}
+        for i in range(count)
+    ]
+
+
+class TestBulkCreate:
+    """POST /activities/bulk"""
+
+    def test_inserts_all_items_without_ai(self, client, owner, db_session, monkeypatch):
+        monkeypatch.setattr(main, "openai_client", None)
+        _, headers, pet_id = owner
+        response = client.post("/activities/bulk", json={"activities": _items(pet_id, 120)}, headers=headers)
+        assert response.status_code == 201
+        body = response.json()
+        assert len(body["created"]) == 120
+        assert body["failed"] == [] and body["enrichment_failed"] == []
+        assert body["created"][5]["description"] == "Walked 5 miles in the park"
+        assert body["created"][0]["activity_type"] == "other"
+        assert db_session.query(Activity).filter(Activity.pet_id == pet_id).count() == 120
+
+    def test_reports_items_for_unknown_pets(self, client, owner, monkeypatch):
+        monkeypatch.setattr(main, "openai_client", None)
+        _, headers, pet_id = owner
+        items = _items(pet_id, 2)
+        items.insert(1, {**items[0], "pet_id": 999999})
+        body = client.post("/activities/bulk", json={"activities": items}, headers=headers).json()
+        assert len(body["created"]) == 2
+        assert body["failed"] == [{"index": 1, "detail": "Pet not found"}]
+
+    def test_batched_ai_enrichment(self, client, owner, monkeypatch):
+        fake = FakeOpenAI()
+        monkeypatch.setattr(main, "openai_client", fake)
+        _, headers, pet_id = owner
+        body = client.post("/activities/bulk", json={"activities": _items(pet_id, 60)}, headers=headers).json()
+        assert fake.calls == 3  # 25 descriptions per prompt
+        assert {a["activity_type"] for a in body["created"]} == {"walk"}
+        assert body["created"][0]["duration"] == 30
+
+    def test_enrichment_failure_still_stores_items(self, client, owner, monkeypatch):
+        class BrokenCompletions:
+            def create(self, **kwargs):
+                raise RuntimeError("upstream timeout")
+
+        broken = FakeOpenAI()
+        broken.chat.completions = BrokenCompletions()
+        monkeypatch.setattr(main, "openai_client", broken)
+        _, headers, pet_id = owner
+        body = client.post("/activities/bulk", json={"activities": _items(pet_id, 3)}, headers=headers).json()
+        assert len(body["created"]) == 3
+        assert [e["index"] for e in body["enrichment_failed"]] == [0, 1, 2]
+        assert body["created"][0]["title"] == "Walked 0 miles in the park"
+
+    def test_typed_items_skip_ai(self, client, owner, monkeypatch):
+        fake = FakeOpenAI()
+        monkeypatch.setattr(main, "openai_client", fake)
+        _, headers, pet_id = owner
+        items = _items(pet_id, 4, activity_type="feeding", title="Dinner")
+        body = client.post("/activities/bulk", json={"activities": items}, headers=headers).json()
+        assert fake.calls == 0
+        assert {a["title"] for a in body["created"]} == {"Dinner"}
+
+    def test_limits(self, client, owner):
+        _, headers, pet_id = owner
+        assert client.post("/activities/bulk", json={"activities": []}, headers=headers).status_code == 400
+        too_many = _items(pet_id, 501)
+        assert client.post("/activities/bulk", json={"activities": too_many}, headers=headers).status_code == 400
+
+    def test_requires_auth(self, client):
+        assert client.post("/activities/bulk", json={"activities": []}).status_code == 401
+
+
+class TestParseBatchResponse:
+    """Mapping batch results back to items."""
+
+    def test_missing_and_invalid_items(self):
+        content = '{"results": [{"i": 0, "activity_type": "walk", "title": "Walk"}, {"i": 7, "activity_type": "x"}, "junk"]}'
+        parsed = ActivityEnrichmentService.parse_batch_response(content, [0, 1, 7])
+        assert set(parsed) == {0, 7}
+        assert parsed[7]["activity_type"] == "other"
+
+    def test_not_json(self):
+        with pytest.raises(ValueError):
+            ActivityEnrichmentService.parse_batch_response("Sure! Here you go", [0])
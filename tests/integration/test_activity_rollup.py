@@ -0,0 +1,124 @@
+# tests/integration/test_activity_rollup.py
+
+from datetime import date, datetime
+
+import pytest
+
+import main
+from app.models.activity import Activity
+from app.models.pet_activity_daily import PetActivityDaily
+from app.services.rollup_service import ActivityRollupService
+from tests.conftest import create_verified_user_headers
+
+@pytest.fixture
+def client(client, monkeypatch):
+    """The test client, without AI."""
+    monkeypatch.setattr(main, "openai_client", None)
+    return client
+
+def _rollup(db_session, pet_id):
+    db_session.expire_all()
+    return {
+        (row.day, row.activity_type): (row.count, row.total_duration, row.total_distance)
+        for row in db_session.query(PetActivityDaily).filter(PetActivityDaily.pet_id == pet_id)
+    }
+
+def _create(client, headers, pet_id, when, **fields):
+    payload = {"pet_id": pet_id, "activity_date": when, "description": "Walk in the park", **fields}
+    response = client.post("/activities", json=payload, headers=headers)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+class TestIncrementalRollup:
+    """create/update/delete keep pet_activity_daily in step"""
+
+    def test_create_update_delete(self, client, owner, db_session):
+        _, headers, pet_id = owner
+        first = _create(client, headers, pet_id, "2025-03-01T08:00:00", duration=30, distance=1.5)
+        _create(client, headers, pet_id, "2025-03-01T18:00:00", duration=20, distance=1.0)
+        assert _rollup(db_session, pet_id) == {(date(2025, 3, 1), "other"): (2, 50, 2.5)}
+
+        client.put(f"/activities/{first}", json={"activity_type": "walk", "activity_date": "2025-03-02T08:00:00"},
+                   headers=headers)
+        assert _rollup(db_session, pet_id) == {
+            (date(2025, 3, 1), "other"): (1, 20, 1.0),
+            (date(2025, 3, 2), "walk"): (1, 30, 1.5),
+        }
+
+        assert client.delete(f"/activities/{first}", headers=headers).status_code == 204
+        assert _rollup(db_session, pet_id) == {(date(2025, 3, 1), "other"): (1, 20, 1.0)}
+        assert ActivityRollupService.check(db_session) == []
+
+    def test_offset_dates_are_stored_and_bucketed_as_utc(self, client, owner, db_session):
+        _, headers, pet_id = owner
+        activity_id = _create(client, headers, pet_id, "2025-01-01T23:30:00-05:00", duration=10)
+        client.post("/activities/bulk", json={"activities": [
+            {"pet_id": pet_id, "activity_date": "2025-01-03T01:00:00+09:00", "description": "Fetch", "duration": 5},
+        ]}, headers=headers)
+        assert _rollup(db_session, pet_id) == {(date(2025, 1, 2), "other"): (2, 15, 0)}
+
+        client.put(f"/activities/{activity_id}", json={"activity_date": "2025-01-02T20:00:00-08:00"}, headers=headers)
+        assert _rollup(db_session, pet_id) == {
+            (date(2025, 1, 2), "other"): (1, 5, 0), (date(2025, 1, 3), "other"): (1, 10, 0),
+        }
+        assert ActivityRollupService.check(db_session) == []
+
+    def test_bulk_create(self, client, owner, db_session):
+        _, headers, pet_id = owner
+        items = [
+            {"pet_id": pet_id, "activity_date": f"2025-03-0{1 + i % 2}T08:00:00", "description": "Walk",
+             "activity_type": "walk", "title": "Walk", "duration": 10}
+            for i in range(6)
+        ]
+        assert client.post("/activities/bulk", json={"activities": items}, headers=headers).status_code == 201
+        assert _rollup(db_session, pet_id) == {
+            (date(2025, 3, 1), "walk"): (3, 30, 0.0),
+            (date(2025, 3, 2), "walk"): (3, 30, 0.0),
+        }
+
+    def test_daily_endpoint(self, client, owner):
+        _, headers, pet_id = owner
+        for day in (1, 2, 3):
+            _create(client, headers, pet_id, f"2025-03-0{day}T08:00:00", duration=day * 10)
+        response = client.get(f"/pets/{pet_id}/activity-daily?start=2025-03-02", headers=headers)
+        assert response.status_code == 200
+        assert [(row["day"], row["total_duration"]) for row in response.json()] == [
+            ("2025-03-02", 20), ("2025-03-03", 30)
+        ]
+
+    def test_daily_endpoint_other_user(self, client, owner, db_session):
+        _, _, pet_id = owner
+        _, other_headers = create_verified_user_headers(db_session)
+        assert client.get(f"/pets/{pet_id}/activity-daily", headers=other_headers).status_code == 404
+
+
+class TestRebuildAndCheck:
+    """Backfill and consistency checking"""
+
+    def test_check_reports_drift_and_rebuild_repairs(self, owner, db_session):
+        _, _, pet_id = owner
+        # Written around the service, as an import script would
+        db_session.add_all([
+            Activity(pet_id=pet_id, activity_type="walk", title="Walk", duration=30, distance=2.0,
+                     activity_date=datetime(2025, 3, 1, 8)),
+            Activity(pet_id=pet_id, activity_type="play", title="Fetch", duration=15,
+                     activity_date=datetime(2025, 3, 1, 9)),
+        ])
+        db_session.commit()
+
+        mismatches = ActivityRollupService.check(db_session, [pet_id])
+        assert {(m["activity_type"], m["expected"], m["stored"]) for m in mismatches} == {
+            ("walk", (1, 30, 2.0), None), ("play", (1, 15, 0.0), None)
+        }
+
+        assert ActivityRollupService.rebuild(db_session, [pet_id]) == 2
+        db_session.commit()
+        assert ActivityRollupService.check(db_session, [pet_id]) == []
+        assert _rollup(db_session, pet_id)[(date(2025, 3, 1), "walk")] == (1, 30, 2.0)
+
+    def test_pet_delete_removes_rollup(self, client, owner, db_session):
+        _, headers, pet_id = owner
+        _create(client, headers, pet_id, "2025-03-01T08:00:00")
+        assert client.delete(f"/pets/{pet_id}", headers=headers).status_code == 204
+        assert _rollup(db_session, pet_id) == {}
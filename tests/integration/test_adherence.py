@@ -0,0 +1,183 @@
+# tests/integration/test_adherence.py
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.models.medication_adherence_weekly import MedicationAdherenceWeekly
+from app.models.medication_dose import MedicationDose
+from app.models.pet import Pet
+from app.services.adherence_service import AdherenceService, week_start
+from tests.conftest import create_verified_user_headers
+
+@pytest.fixture
+def medication(client, db_session):
+    """A twice-daily medication; returns (headers, medication_id, upcoming doses)."""
+    user, headers = create_verified_user_headers(db_session)
+    pet = Pet(name="Max", species="dog", user_id=user.id)
+    db_session.add(pet)
+    db_session.commit()
+    medication_id = client.post("/medications", json={
+        "pet_id": pet.id, "name": "Apoquel", "dosage": "16mg", "frequency": "twice daily",
+    }, headers=headers).json()["id"]
+    upcoming = client.get("/medications/upcoming?hours=48", headers=headers).json()
+    return headers, medication_id, upcoming
+
+def totals(db_session, medication_id):
+    db_session.expire_all()
+    rows = db_session.query(MedicationAdherenceWeekly) \
+        .filter(MedicationAdherenceWeekly.medication_id == medication_id).all()
+    return tuple(sum(getattr(row, column) for row in rows) for column in ("expected", "given", "skipped"))
+
+
+class TestDoseLog:
+    """Checking doses off and undoing it"""
+
+    def test_expected_follows_materialized_doses(self, client, db_session, medication):
+        headers, medication_id, _ = medication
+        expected, given, skipped = totals(db_session, medication_id)
+        assert expected in (27, 28, 29) and (given, skipped) == (0, 0)
+
+        client.put(f"/medications/{medication_id}", json={"frequency": "once daily"}, headers=headers)
+        assert totals(db_session, medication_id)[0] in (14, 15)
+        assert AdherenceService.check(db_session) == []
+
+    def test_check_off_nearest_dose(self, client, db_session, medication):
+        headers, medication_id, upcoming = medication
+        first = datetime.fromisoformat(upcoming[0]["scheduled_at"])
+
+        response = client.post(f"/medications/{medication_id}/doses",
+                               json={"given_at": (first + timedelta(minutes=20)).isoformat()}, headers=headers)
+        assert response.status_code == 201
+        log = response.json()
+        assert datetime.fromisoformat(log["scheduled_at"]) == first and log["status"] == "given"
+        assert totals(db_session, medication_id)[1:] == (1, 0)
+
+        # Already checked off
+        response = client.post(f"/medications/{medication_id}/doses",
+                               json={"scheduled_at": first.isoformat()}, headers=headers)
+        assert response.status_code == 400
+
+        upcoming = client.get("/medications/upcoming?hours=48", headers=headers).json()
+        assert [dose["status"] for dose in upcoming[:2]] == ["given", None]
+
+        assert client.delete(f"/medications/{medication_id}/doses/{log['id']}", headers=headers).status_code == 204
+        assert totals(db_session, medication_id)[1:] == (0, 0)
+        assert AdherenceService.check(db_session) == []
+
+    def test_times_with_utc_offset(self, client, db_session, medication):
+        headers, medication_id, upcoming = medication
+        first = datetime.fromisoformat(upcoming[0]["scheduled_at"])
+        second = datetime.fromisoformat(upcoming[1]["scheduled_at"])
+
+        response = client.post(f"/medications/{medication_id}/doses",
+                               json={"given_at": (first + timedelta(minutes=5)).isoformat() + "Z"}, headers=headers)
+        assert response.status_code == 201
+        assert datetime.fromisoformat(response.json()["scheduled_at"]) == first
+
+        # The same instant written in another zone matches the stored dose
+        response = client.post(f"/medications/{medication_id}/doses", json={
+            "scheduled_at": (second + timedelta(hours=2)).isoformat() + "+02:00", "status": "skipped",
+        }, headers=headers)
+        assert response.status_code == 201
+        assert datetime.fromisoformat(response.json()["scheduled_at"]) == second
+        assert totals(db_session, medication_id)[1:] == (1, 1)
+
+    def test_timezone_change_moves_doses_and_rebuilds(self, client, db_session, medication):
+        headers, medication_id, upcoming = medication
+        client.post(f"/medications/{medication_id}/doses", json={"scheduled_at": upcoming[0]["scheduled_at"]},
+                    headers=headers)
+
+        response = client.patch("/users/me/preferences", json={"timezone": "Pacific/Auckland"}, headers=headers)
+        assert response.status_code == 200
+        assert AdherenceService.check(db_session) == []
+        assert totals(db_session, medication_id)[1] == 1
+
+        # Upcoming doses are at 08:00 and 20:00 Auckland time
+        auckland = ZoneInfo("Pacific/Auckland")
+        future = db_session.query(MedicationDose.scheduled_at).filter(
+            MedicationDose.medication_id == medication_id, MedicationDose.scheduled_at >= datetime.utcnow()
+        ).all()
+        assert future
+        assert {when.replace(tzinfo=timezone.utc).astimezone(auckland).hour for (when,) in future} == {8, 20}
+
+        # Editing the medication afterwards keeps the rollup consistent
+        client.put(f"/medications/{medication_id}", json={"dosage": "8mg"}, headers=headers)
+        assert AdherenceService.check(db_session) == []
+
+    def test_skipped_and_unscheduled(self, client, db_session, medication):
+        headers, medication_id, upcoming = medication
+        second = upcoming[1]["scheduled_at"]
+        response = client.post(f"/medications/{medication_id}/doses",
+                               json={"scheduled_at": second, "status": "skipped"}, headers=headers)
+        assert response.status_code == 201
+
+        # Nowhere near a scheduled dose: logged, but not part of adherence
+        response = client.post(f"/medications/{medication_id}/doses", json={
+            "given_at": (datetime.utcnow() + timedelta(days=40)).isoformat(), "notes": "extra",
+        }, headers=headers)
+        assert response.json()["scheduled_at"] is None
+        assert totals(db_session, medication_id)[1:] == (0, 1)
+
+        response = client.post(f"/medications/{medication_id}/doses",
+                               json={"scheduled_at": "2031-01-01T03:17:00"}, headers=headers)
+        assert response.status_code == 400
+        assert len(client.get(f"/medications/{medication_id}/doses", headers=headers).json()) == 2
+
+    def test_other_users_cannot_log(self, client, db_session, medication):
+        _, medication_id, _ = medication
+        _, other_headers = create_verified_user_headers(db_session)
+        response = client.post(f"/medications/{medication_id}/doses", json={}, headers=other_headers)
+        assert response.status_code == 404
+
+
+class TestAdherence:
+    """GET /medications/adherence"""
+
+    def test_weekly_ratio(self, client, db_session, medication):
+        headers, medication_id, upcoming = medication
+        for dose in upcoming[:2]:
+            client.post(f"/medications/{medication_id}/doses", json={"scheduled_at": dose["scheduled_at"]},
+                        headers=headers)
+
+        weeks = client.get("/medications/adherence?weeks=4", headers=headers).json()
+        assert {week["name"] for week in weeks} == {"Apoquel"}
+        assert sum(week["given"] for week in weeks) == 2
+        assert weeks == sorted(weeks, key=lambda week: week["week_start"], reverse=True)
+        for week in weeks:
+            assert week["adherence"] == pytest.approx(week["given"] / week["expected"])
+
+    def test_only_due_doses_count(self, client, db_session, medication):
+        headers, medication_id, upcoming = medication
+        now = datetime.utcnow()
+        this_week = week_start(now, "UTC")
+        due = [
+            dose for dose in db_session.query(MedicationDose).filter(MedicationDose.medication_id == medication_id)
+            if dose.scheduled_at <= now and week_start(dose.scheduled_at, "UTC") == this_week
+        ]
+        # Checked off ahead of time: counts as due
+        early = [dose["scheduled_at"] for dose in upcoming
+                 if week_start(datetime.fromisoformat(dose["scheduled_at"]), "UTC") == this_week][:1]
+        for scheduled_at in early:
+            client.post(f"/medications/{medication_id}/doses", json={"scheduled_at": scheduled_at}, headers=headers)
+
+        weeks = client.get("/medications/adherence?weeks=1", headers=headers).json()
+        assert [week["week_start"] for week in weeks] == [str(this_week)]
+        assert weeks[0]["expected"] == len(due) + len(early) and weeks[0]["given"] == len(early)
+        # The rollup itself still holds next week's scheduled doses
+        assert totals(db_session, medication_id)[0] > weeks[0]["expected"]
+
+    def test_rebuild_matches_incremental(self, client, db_session, medication):
+        headers, medication_id, upcoming = medication
+        client.post(f"/medications/{medication_id}/doses", json={"scheduled_at": upcoming[0]["scheduled_at"]},
+                    headers=headers)
+        before = totals(db_session, medication_id)
+        AdherenceService.rebuild(db_session)
+        db_session.commit()
+        assert totals(db_session, medication_id) == before
+
+    def test_week_start_is_local_monday(self):
+        # Monday 02:00 UTC is still Sunday in New York
+        assert str(week_start(datetime(2031, 1, 13, 2), "UTC")) == "2031-01-13"
+        assert str(week_start(datetime(2031, 1, 13, 2), "America/New_York")) == "2031-01-06"
@@ -0,0 +1,99 @@
+# tests/integration/test_chat_cache.py
+
+import pytest
+
+import main
+from app.services.chat_cache import SemanticCache, cache_requests_total, is_shareable, pet_context, shingles
+from benchmarks.fakes import FakeOpenAI
+from tests.conftest import create_verified_user_headers
+
+DOG = [{"name": "Rex", "species": "Dog", "breed": "Beagle"}]
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """Fake LLM and an empty cache."""
+    fake = FakeOpenAI()
+    monkeypatch.setattr(main, "openai_client", fake)
+    main.vet_chat_cache.clear()
+    yield fake
+    main.vet_chat_cache.clear()
+
+
+class TestSemanticCache:
+    """Normalization, MinHash/LSH lookup, threshold and TTL"""
+
+    def test_near_identical_questions_share_shingles(self):
+        assert shingles("My dog just ate some chocolate!!") == shingles("my dog ate chocolate")
+        assert shingles("How often should I feed a kitten?") == shingles("how often to feed my kitten")
+
+    def test_hit_miss_and_context(self):
+        cache = SemanticCache(threshold=0.8)
+        cache.store("My dog ate chocolate", "dog", "Call your vet now.", latency=1.5)
+
+        lookup = cache.lookup("my dog just ate some chocolate", "dog")
+        assert lookup.entry.response == "Call your vet now." and lookup.similarity == 1.0
+        # Different question, different species
+        assert cache.lookup("my dog ate grapes", "dog").entry is None
+        assert cache.lookup("my dog ate chocolate", "cat").entry is None
+
+    def test_threshold_ttl_and_eviction(self):
+        now = [0.0]
+        cache = SemanticCache(threshold=0.8, ttl=60, max_entries=2, clock=lambda: now[0])
+        cache.store("how often should I feed a kitten", "cat", "Three to four meals a day.", 1.0)
+        assert cache.lookup("how often should I feed an adult cat", "cat").entry is None
+
+        now[0] = 61
+        assert cache.lookup("how often should I feed a kitten", "cat").entry is None
+        assert len(cache) == 0
+
+        for i, question in enumerate(["kitten vaccines", "kitten litter training", "kitten teething"]):
+            cache.store(question, "cat", f"answer {i}", 1.0)
+        assert len(cache) == 2 and cache.lookup("kitten vaccines", "cat").entry is None
+
+    def test_context_covers_every_pet_detail_in_the_prompt(self):
+        small = {"species": "Dog", "breed": "Beagle", "age": 3, "weight": 12}
+        assert pet_context([small]) == pet_context([{**small, "name": "Other", "species": "dog "}])
+        assert pet_context([small]) != pet_context([{**small, "weight": 90}])
+        assert pet_context([small]) != pet_context([{**small, "breed": "Mastiff"}])
+        assert pet_context([small]) != pet_context([{**small, "age": 12}])
+        assert pet_context([]) == pet_context([{"name": "Rex"}]) == "any"
+
+    def test_answers_naming_the_pet_are_not_shared(self):
+        assert not is_shareable("Rex should be fine, but watch him.", DOG)
+        assert is_shareable("Rexall is a pharmacy brand.", DOG)
+
+
+class TestVetChatCache:
+    """POST /chat/vet"""
+
+    def test_second_similar_question_is_cached(self, client, db_session, fake_openai):
+        _, headers = create_verified_user_headers(db_session)
+        hits = cache_requests_total.value(result="hit")
+
+        first = client.post("/chat/vet", json={"message": "My dog ate chocolate", "pets": DOG}, headers=headers)
+        assert first.status_code == 200 and first.json()["cached"] is False
+        second = client.post("/chat/vet", json={"message": "my dog just ate some chocolate!", "pets": DOG},
+                             headers=headers)
+        assert second.json() == {"response": first.json()["response"], "cached": True}
+        assert fake_openai.calls == 1
+        assert cache_requests_total.value(result="hit") == hits + 1
+        assert "vet_chat_cache_saved_seconds_total" in client.get("/metrics").text
+
+    def test_bypasses(self, client, db_session, fake_openai):
+        _, headers = create_verified_user_headers(db_session)
+        client.post("/chat/vet", json={"message": "my dog ate chocolate", "pets": DOG}, headers=headers)
+
+        # A heavier dog of the same breed is a different question
+        client.post("/chat/vet", json={"message": "my dog ate chocolate", "pets": [{**DOG[0], "weight": 80}]},
+                    headers=headers)
+        assert fake_openai.calls == 2
+
+        # Follow-ups and questions about a pet's medical history always go to the model
+        client.post("/chat/vet", json={
+            "message": "my dog ate chocolate", "pets": DOG,
+            "conversation_history": [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "Hello!"}],
+        }, headers=headers)
+        client.post("/chat/vet", json={
+            "message": "my dog ate chocolate", "pets": [{**DOG[0], "medical_notes": "Heart murmur"}],
+        }, headers=headers)
+        assert fake_openai.calls == 4
@@ -0,0 +1,124 @@
+# tests/integration/test_conditional_requests.py
+
+from datetime import datetime
+
+import pytest
+from app.models.activity import Activity
+from app.models.reminder import Reminder
+from tests.conftest import create_verified_user_headers
+
+@pytest.fixture
+def owner(owner, db_session):
+    """The conftest owner, whose pet has a single activity."""
+    _, _, pet_id = owner
+    db_session.add(Activity(
+        pet_id=pet_id,
+        activity_type="walk",
+        title="Morning walk",
+        activity_date=datetime.utcnow()
+    ))
+    db_session.commit()
+    return owner
+
+
+class TestCollectionETags:
+    """Weak ETags on the per-user collection endpoints."""
+
+    @pytest.mark.parametrize("path", ["/pets", "/activities", "/medications", "/reminders"])
+    def test_repeat_request_returns_304(self, client, owner, path):
+        """A matching If-None-Match short-circuits to an empty 304."""
+        _, headers, _ = owner
+        first = client.get(path, headers=headers)
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        assert first.headers["cache-control"] == "private, no-cache"
+
+        second = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    def test_etag_changes_after_insert(self, client, owner, db_session):
+        """Adding a row changes the fingerprint."""
+        _, headers, pet_id = owner
+        etag = client.get("/activities", headers=headers).headers["etag"]
+
+        db_session.add(Activity(
+            pet_id=pet_id,
+            activity_type="feeding",
+            title="Dinner",
+            activity_date=datetime.utcnow()
+        ))
+        db_session.commit()
+
+        response = client.get("/activities", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        assert response.headers["etag"] != etag
+
+    def test_etag_changes_after_delete(self, client, owner, db_session):
+        """Removing a row changes the count, even though max(updated_at) may not move."""
+        user, headers, _ = owner
+        db_session.add(Reminder(
+            user_id=user.id,
+            title="Vet",
+            reminder_type="appointment",
+            reminder_date=datetime.utcnow()
+        ))
+        db_session.commit()
+        etag = client.get("/reminders", headers=headers).headers["etag"]
+
+        db_session.query(Reminder).filter(Reminder.user_id == user.id).delete()
+        db_session.commit()
+
+        response = client.get("/reminders", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_etag_depends_on_query_params(self, client, owner):
+        """Different pages of the same collection must not share validators."""
+        _, headers, _ = owner
+        etag = client.get("/pets", headers=headers).headers["etag"]
+        response = client.get("/pets?limit=5", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+
+    def test_etag_is_scoped_to_user(self, client, owner, db_session):
+        """Another user's identical-looking collection gets a different ETag."""
+        _, headers, _ = owner
+        _, other_headers = create_verified_user_headers(db_session)
+        etag = client.get("/medications", headers=headers).headers["etag"]
+        response = client.get("/medications", headers={**other_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+
+
+class TestSinglePetValidators:
+    """ETag and Last-Modified on /pets/{id}."""
+
+    def test_if_none_match(self, client, owner):
+        _, headers, pet_id = owner
+        first = client.get(f"/pets/{pet_id}", headers=headers)
+        assert first.status_code == 200
+        assert "last-modified" in first.headers
+
+        second = client.get(f"/pets/{pet_id}", headers={**headers, "If-None-Match": first.headers["etag"]})
+        assert second.status_code == 304
+
+    def test_if_modified_since(self, client, owner):
+        _, headers, pet_id = owner
+        last_modified = client.get(f"/pets/{pet_id}", headers=headers).headers["last-modified"]
+        response = client.get(f"/pets/{pet_id}", headers={**headers, "If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+    def test_update_invalidates(self, client, owner):
+        _, headers, pet_id = owner
+        etag = client.get(f"/pets/{pet_id}", headers=headers).headers["etag"]
+        client.patch(f"/pets/{pet_id}", json={"name": "Rex"}, headers=headers)
+        response = client.get(f"/pets/{pet_id}", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["name"] == "Rex"
+
+    def test_missing_pet_is_still_404(self, client, owner):
+        _, headers, _ = owner
+        response = client.get("/pets/999999", headers={**headers, "If-None-Match": "*"})
+        assert response.status_code == 404
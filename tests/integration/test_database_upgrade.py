@@ -0,0 +1,51 @@
+# tests/integration/test_database_upgrade.py
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import Base
+from app.database_init import upgrade_db
+
+LEGACY_UPDATED_AT = "2024-03-01 12:00:00.000000"
+
+
+def legacy_database(path):
+    """A database created before the digest and schedule columns existed."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_users_timezone_digest_sent_on"))
+        for table, column in [("users", "timezone"), ("users", "digest_enabled"), ("users", "digest_sent_on"),
+                              ("medications", "schedule"), ("medications", "doses_until")]:
+            connection.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+        connection.execute(text(
+            "INSERT INTO users (id, first_name, last_name, email, username, password_hash, is_active, "
+            "is_verified, is_admin, created_at, updated_at) VALUES ('0f8e2b5c9a7d4e3f8a1b2c3d4e5f6a7b', 'Old', "
+            f"'User', 'old@example.com', 'olduser', 'x', 1, 1, 0, '{LEGACY_UPDATED_AT}', '{LEGACY_UPDATED_AT}')"
+        ))
+        connection.execute(text("INSERT INTO pets (id, name, species, user_id) "
+                                "VALUES (1, 'Max', 'dog', '0f8e2b5c9a7d4e3f8a1b2c3d4e5f6a7b')"))
+        connection.execute(text(
+            "INSERT INTO medications (id, pet_id, name, dosage, frequency, start_date, is_active, updated_at) "
+            f"VALUES (1, 1, 'Apoquel', '16mg', 'twice daily', '2024-03-01 08:00:00.000000', 1, '{LEGACY_UPDATED_AT}')"
+        ))
+    return engine
+
+
+def test_upgrade_adds_columns_and_backfills_schedules(tmp_path):
+    engine = legacy_database(tmp_path / "legacy.db")
+
+    changes = upgrade_db(engine)
+    assert any("ADD COLUMN timezone" in change for change in changes)
+    assert "Backfilled schedule for 1 medications" in changes
+
+    columns = {column["name"] for column in inspect(engine).get_columns("users")}
+    assert {"timezone", "digest_enabled", "digest_sent_on"} <= columns
+    assert "ix_users_timezone_digest_sent_on" in {index["name"] for index in inspect(engine).get_indexes("users")}
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT timezone, digest_enabled FROM users")).one() == ("UTC", 1)
+        schedule, updated_at = connection.execute(text("SELECT schedule, updated_at FROM medications")).one()
+    assert "08:00" in schedule and updated_at == LEGACY_UPDATED_AT
+
+    # Running it again changes nothing
+    assert upgrade_db(engine) == []
+    engine.dispose()
@@ -0,0 +1,124 @@
+# tests/integration/test_digest.py
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.email_outbox import EmailOutbox
+from app.models.medication import Medication
+from app.models.pet import Pet
+from app.models.pet_activity_daily import PetActivityDaily
+from app.models.reminder import Reminder
+from app.models.user import User
+from app.services.digest_service import DigestService, local_day_window
+from tests.conftest import create_verified_user_headers
+
+# 07:30 in New York, 04:30 in Los Angeles, 21:30 in Tokyo
+NOW = datetime(2031, 1, 15, 12, 30)
+
+def make_user(db_session, tz: str = "America/New_York", **fields) -> User:
+    user, _ = create_verified_user_headers(db_session)
+    user.timezone = tz
+    for name, value in fields.items():
+        setattr(user, name, value)
+    db_session.commit()
+    return user
+
+@pytest.fixture
+def new_yorker(db_session):
+    """A New York user with one of everything, plus things that must be left out."""
+    user = make_user(db_session)
+    pet = Pet(name="Max", species="dog", user_id=user.id)
+    db_session.add(pet)
+    db_session.flush()
+    db_session.add_all([
+        # 09:00 local today; tomorrow; completed
+        Reminder(user_id=user.id, pet_id=pet.id, title="Heartworm pill", reminder_type="medication",
+                 reminder_date=datetime(2031, 1, 15, 14, 0)),
+        Reminder(user_id=user.id, title="Order food", reminder_type="other",
+                 reminder_date=datetime(2031, 1, 16, 14, 0)),
+        Reminder(user_id=user.id, title="Done already", reminder_type="other",
+                 reminder_date=datetime(2031, 1, 15, 15, 0), is_completed=True),
+        Medication(pet_id=pet.id, name="Carprofen", dosage="75mg", frequency="twice daily",
+                   start_date=datetime(2031, 1, 1), end_date=datetime(2031, 1, 18, 12, 0)),
+        Medication(pet_id=pet.id, name="Apoquel", dosage="16mg", frequency="daily",
+                   start_date=datetime(2031, 1, 1), end_date=datetime(2031, 3, 1)),
+        PetActivityDaily(pet_id=pet.id, day=date(2031, 1, 14), activity_type="walk",
+                         count=2, total_duration=60, total_distance=3.0),
+        PetActivityDaily(pet_id=pet.id, day=date(2031, 1, 10), activity_type="play",
+                         count=1, total_duration=15, total_distance=0.0),
+        # Today's activity belongs to tomorrow's digest
+        PetActivityDaily(pet_id=pet.id, day=date(2031, 1, 15), activity_type="walk",
+                         count=1, total_duration=30, total_distance=1.0),
+    ])
+    db_session.commit()
+    return user
+
+
+class TestDigestRun:
+    """Timezone buckets, content and idempotency"""
+
+    def test_local_day_window(self):
+        day, start, end = local_day_window("America/New_York", NOW)
+        assert (day, start, end) == (date(2031, 1, 15), datetime(2031, 1, 15, 5, 0), datetime(2031, 1, 16, 5, 0))
+        # Unknown names fall back to UTC
+        assert local_day_window("Nowhere/Special", NOW)[1] == datetime(2031, 1, 15)
+
+    def test_due_timezones(self, db_session):
+        for tz in ("America/New_York", "America/Los_Angeles", "Asia/Tokyo"):
+            make_user(db_session, tz)
+        assert DigestService.due_timezones(db_session, NOW, hour=7) == ["America/New_York", "Asia/Tokyo"]
+
+    def test_digest_content(self, db_session, new_yorker):
+        result = DigestService.run(db_session, NOW, hour=7)
+        assert (result.users, result.queued) == (1, 1)
+
+        message = db_session.query(EmailOutbox).one()
+        assert message.to_email == new_yorker.email and message.status == "pending"
+        assert message.subject == "Your PetWell digest for Wednesday, January 15"
+        text = message.text_content
+        assert "09:00 Heartworm pill (Max)" in text
+        assert "Order food" not in text and "Done already" not in text
+        assert "Carprofen for Max: last dose January 18" in text and "Apoquel" not in text
+        assert "Max: 3 activities, 75 min, 3.0 mi" in text
+        assert "Heartworm pill" in message.html_content
+
+    def test_one_digest_per_local_day(self, db_session, new_yorker):
+        DigestService.run(db_session, NOW, hour=7)
+        assert DigestService.run(db_session, NOW + timedelta(hours=3), hour=7).users == 0
+        # The next local day is a new digest
+        assert DigestService.run(db_session, NOW + timedelta(days=1), hour=7).users == 1
+        db_session.expire_all()
+        assert db_session.get(User, new_yorker.id).digest_sent_on == date(2031, 1, 16)
+
+    def test_chunks_and_skips(self, db_session, new_yorker):
+        for _ in range(4):
+            user = make_user(db_session)
+            db_session.add(Reminder(user_id=user.id, title="Walk", reminder_type="other",
+                                    reminder_date=datetime(2031, 1, 15, 20, 0)))
+        make_user(db_session)  # nothing to report: claimed, no email
+        make_user(db_session, digest_enabled=False)
+        make_user(db_session, is_verified=False)
+        db_session.commit()
+
+        result = DigestService.run(db_session, NOW, hour=7, chunk_size=2)
+        assert (result.users, result.queued) == (6, 5)
+        assert db_session.query(EmailOutbox).count() == 5
+
+
+class TestPreferences:
+    """PATCH /users/me/preferences"""
+
+    def test_update_timezone_and_digest(self, client, db_session):
+        _, headers = create_verified_user_headers(db_session)
+        response = client.patch("/users/me/preferences", json={"timezone": "Europe/Paris"}, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["timezone"] == "Europe/Paris" and response.json()["digest_enabled"] is True
+
+        response = client.patch("/users/me/preferences", json={"digest_enabled": False}, headers=headers)
+        assert (response.json()["timezone"], response.json()["digest_enabled"]) == ("Europe/Paris", False)
+
+    def test_unknown_timezone_rejected(self, client, db_session):
+        _, headers = create_verified_user_headers(db_session)
+        response = client.patch("/users/me/preferences", json={"timezone": "Mars/Olympus"}, headers=headers)
+        assert response.status_code == 400
@@ -0,0 +1,183 @@
+# tests/integration/test_email_outbox.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+import aiosmtplib
+import pytest
+
+from app.config import settings
+from app.models.email_outbox import EmailOutbox
+from app.services.email_outbox import (
+    MESSAGE_SECONDS, EmailOutboxService, EmailOutboxWorker, SMTPConnectionPool, retry_delay
+)
+from benchmarks.fakes import LocalSMTPServer
+from tests.conftest import TestingSessionLocal, create_test_user
+
+@pytest.fixture
+def smtp_configured(monkeypatch):
+    monkeypatch.setattr(settings, "SMTP_USER", "user")
+    monkeypatch.setattr(settings, "SMTP_PASSWORD", "secret")
+
+class Clock:
+    def __init__(self):
+        self.now = datetime.utcnow() + timedelta(seconds=1)
+
+    def __call__(self):
+        return self.now
+
+def make_worker(server: LocalSMTPServer, clock: Clock, pool_size: int = 2, **kwargs) -> EmailOutboxWorker:
+    pool = SMTPConnectionPool(size=pool_size, factory=lambda: aiosmtplib.SMTP(
+        hostname="127.0.0.1", port=server.port, username="user", password="secret",
+        start_tls=False, timeout=5,
+    ))
+    return EmailOutboxWorker(TestingSessionLocal, pool=pool, clock=clock, **kwargs)
+
+def enqueue(db_session, count: int, prefix: str = "owner"):
+    for i in range(count):
+        EmailOutboxService.enqueue(db_session, f"{prefix}{i}@example.com", f"Message {i}", f"<p>Hello {i}</p>", f"Hello {i}")
+    db_session.commit()
+
+
+class TestEnqueue:
+    """Handlers queue email instead of sending it"""
+
+    def test_register_queues_verification_email(self, client, db_session):
+        response = client.post("/users/register", json={
+            "first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com",
+            "username": "ada_l", "password": "SecurePass123!",
+        })
+        assert response.status_code in (200, 201)
+        rows = db_session.query(EmailOutbox).all()
+        assert len(rows) == 1
+        assert rows[0].to_email == "ada@example.com" and rows[0].status == "pending"
+        assert "verify-email?token=" in rows[0].html_content
+
+    def test_resend_verification_queues_new_token(self, client, db_session):
+        user = create_test_user(db_session)
+        response = client.post("/api/resend-verification", params={"email": user.email})
+        assert response.status_code == 200
+        db_session.expire_all()
+        row = db_session.query(EmailOutbox).one()
+        assert db_session.get(type(user), user.id).verification_token in row.html_content
+
+    def test_rolled_back_write_queues_nothing(self, db_session):
+        EmailOutboxService.enqueue(db_session, "a@example.com", "Hi", "<p>Hi</p>")
+        db_session.rollback()
+        assert db_session.query(EmailOutbox).count() == 0
+
+
+class TestWorker:
+    """Delivery over pooled SMTP connections, retries and status"""
+
+    def test_batch_reuses_pooled_connections(self, db_session, smtp_configured):
+        clock = Clock()
+
+        async def run():
+            async with LocalSMTPServer() as server:
+                worker = make_worker(server, clock, pool_size=2)
+                enqueue(db_session, 10)
+                assert await worker.tick() == 10
+                enqueue(db_session, 5, prefix="later")
+                assert await worker.tick() == 5
+                await worker.pool.close()
+                return server
+
+        server = asyncio.run(run())
+        assert len(server.mailbox.messages) == 15
+        # Two pooled connections carried both batches (not one per message)
+        assert server.connections == 2
+        rows = db_session.query(EmailOutbox).all()
+        assert {row.status for row in rows} == {"sent"}
+        assert all(row.attempts == 1 and row.sent_at == clock.now and row.lease_owner is None for row in rows)
+
+    def test_failed_send_is_retried_with_backoff(self, db_session, smtp_configured):
+        clock = Clock()
+
+        async def run():
+            async with LocalSMTPServer() as server:
+                worker = make_worker(server, clock, pool_size=1)
+                enqueue(db_session, 1)
+                server.fail_next = 1
+                await worker.tick()
+                db_session.expire_all()
+                row = db_session.query(EmailOutbox).one()
+                assert (row.status, row.attempts) == ("pending", 1)
+                assert row.next_attempt_at == clock.now + retry_delay(1)
+                assert "451" in row.last_error
+
+                assert await worker.tick() == 0  # not due yet
+                clock.now += retry_delay(1)
+                assert await worker.tick() == 1
+                await worker.pool.close()
+                return server
+
+        server = asyncio.run(run())
+        db_session.expire_all()
+        row = db_session.query(EmailOutbox).one()
+        assert (row.status, row.attempts, row.last_error) == ("sent", 2, None)
+        assert len(server.mailbox.messages) == 1
+
+    def test_gives_up_after_max_attempts(self, db_session, smtp_configured):
+        clock = Clock()
+
+        async def run():
+            async with LocalSMTPServer() as server:
+                worker = make_worker(server, clock, pool_size=1, max_attempts=2)
+                enqueue(db_session, 1)
+                server.fail_next = 2
+                await worker.tick()
+                clock.now += retry_delay(1)
+                await worker.tick()
+                await worker.pool.close()
+
+        asyncio.run(run())
+        row = db_session.query(EmailOutbox).one()
+        assert (row.status, row.attempts) == ("failed", 2)
+
+    def test_unconfigured_smtp_marks_skipped(self, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "SMTP_USER", None)
+        enqueue(db_session, 2)
+        worker = EmailOutboxWorker(TestingSessionLocal, clock=Clock())
+        assert asyncio.run(worker.tick()) == 2
+        assert {row.status for row in db_session.query(EmailOutbox)} == {"skipped"}
+
+    def test_workers_claim_disjoint_batches(self, db_session):
+        enqueue(db_session, 6)
+        clock = Clock()
+        first = EmailOutboxWorker(TestingSessionLocal, batch_size=4, clock=clock)
+        second = EmailOutboxWorker(TestingSessionLocal, batch_size=4, clock=clock)
+        a = {message.id for message in first.claim(clock.now)}
+        b = {message.id for message in second.claim(clock.now)}
+        assert len(a) == 4 and len(b) == 2 and not a & b
+
+
+class TestLeaseAndRetention:
+    """Leases outlast a slow batch; finished mail is purged"""
+
+    def test_lease_covers_a_batch_at_the_smtp_timeout(self):
+        worker = EmailOutboxWorker(TestingSessionLocal, pool=SMTPConnectionPool(size=2), batch_size=50,
+                                   lease_seconds=120)
+        assert worker.lease >= timedelta(seconds=25 * MESSAGE_SECONDS)
+
+    def test_purge_deletes_only_old_finished_messages(self, db_session):
+        enqueue(db_session, 5)
+        clock = Clock()
+        old = clock.now - timedelta(days=31)
+        rows = db_session.query(EmailOutbox).order_by(EmailOutbox.id).all()
+        for row, status, updated_at in zip(rows, ("sent", "skipped", "failed", "pending", "sent"),
+                                           (old, old, old, old, clock.now)):
+            row.status, row.updated_at = status, updated_at
+        db_session.commit()
+        kept = {rows[3].id, rows[4].id}
+
+        worker = EmailOutboxWorker(TestingSessionLocal, clock=clock, retention_days=30)
+        assert worker.purge(clock.now) == 3
+        db_session.expire_all()
+        assert {row.id for row in db_session.query(EmailOutbox)} == kept
+        assert EmailOutboxWorker(TestingSessionLocal, retention_days=0).purge(clock.now + timedelta(days=90)) == 0
+
+
+def test_retry_delay_doubles_and_caps():
+    assert [retry_delay(n).total_seconds() for n in (1, 2, 3)] == [30, 60, 120]
+    assert retry_delay(20) == timedelta(hours=1)
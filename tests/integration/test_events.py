@@ -0,0 +1,188 @@
+# tests/integration/test_events.py
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+from app.models import user as user_model
+from app.models.user import User
+from app.models.reminder import Reminder
+from app.services.event_broker import EventBroker, InMemoryEventBroker, format_sse
+from app.services.reminder_scheduler import ReminderScheduler
+from tests.conftest import TestingSessionLocal, create_verified_user_headers
+
+@pytest.fixture
+def client(client, monkeypatch):
+    """The test client, without AI."""
+    monkeypatch.setattr(main, "openai_client", None)
+    return client
+
+class RecordingBroker(InMemoryEventBroker):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    async def publish(self, user_id, event):
+        self.published.append((str(user_id), event))
+        await super().publish(user_id, event)
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = RecordingBroker()
+    monkeypatch.setattr(main, "event_broker", broker)
+    return broker
+
+
+class TestInMemoryBroker:
+
+    def test_fan_out_per_user(self):
+        async def scenario():
+            broker = InMemoryEventBroker()
+            async with broker.subscribe("alice") as first, broker.subscribe("alice") as second, \
+                    broker.subscribe("bob") as other:
+                assert broker.subscriber_count("alice") == 2
+                await broker.publish("alice", {"resource": "pet", "action": "created", "id": 1})
+                received = [await first.get(0.1), await second.get(0.1), await other.get(0.01)]
+            assert broker.subscriber_count() == 0
+            return received
+
+        first, second, other = asyncio.run(scenario())
+        assert first == second == {"resource": "pet", "action": "created", "id": 1}
+        assert other is None
+
+    def test_slow_subscriber_gets_resync(self):
+        async def scenario():
+            broker = InMemoryEventBroker(queue_size=3)
+            async with broker.subscribe("alice") as subscription:
+                for i in range(5):
+                    await broker.publish("alice", {"resource": "pet", "action": "updated", "id": i})
+                first = await subscription.get(0.1)
+                await broker.publish("alice", {"resource": "pet", "action": "updated", "id": 9})
+                return first, await subscription.get(0.1)
+
+        first, after = asyncio.run(scenario())
+        assert first["resource"] == "resync"
+        assert after["id"] == 9
+
+    def test_format_sse(self):
+        assert format_sse({"resource": "reminder", "action": "deleted", "id": 3}) == (
+            b'event: reminder\ndata: {"resource": "reminder", "action": "deleted", "id": 3}\n\n'
+        )
+
+    def test_incomplete_broker_fails_at_construction(self):
+        class PublishOnly(EventBroker):
+            async def publish(self, user_id, event):
+                pass
+
+        with pytest.raises(TypeError):
+            PublishOnly()
+
+
+class TestEventsEndpoint:
+    """GET /events"""
+
+    def test_requires_valid_ticket(self, client, db_session):
+        _, headers = create_verified_user_headers(db_session)
+        access_token = headers["Authorization"].split()[1]
+        assert client.get("/events").status_code == 401
+        assert client.get("/events?ticket=garbage").status_code == 401
+        # The login token is never accepted in the URL
+        assert client.get(f"/events?ticket={access_token}").status_code == 401
+
+    def test_ticket_only_opens_the_stream(self, client, db_session):
+        user, headers = create_verified_user_headers(db_session)
+        assert client.post("/events/ticket").status_code == 401
+        response = client.post("/events/ticket", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["expires_in"] == 60
+        ticket = response.json()["ticket"]
+        assert User.verify_events_ticket(ticket) == user.id
+        assert User.verify_token(ticket) is None
+        assert client.get("/pets", headers={"Authorization": f"Bearer {ticket}"}).status_code == 401
+
+    def test_expired_ticket_is_rejected(self, db_session, monkeypatch):
+        user, _ = create_verified_user_headers(db_session)
+        monkeypatch.setattr(user_model, "EVENTS_TICKET_SECONDS", -1)
+        assert User.verify_events_ticket(User.create_events_ticket(user.id)) is None
+
+    def test_streams_events_for_the_user(self, db_session, monkeypatch):
+        user, _ = create_verified_user_headers(db_session)
+        broker = InMemoryEventBroker()
+        monkeypatch.setattr(main, "event_broker", broker)
+        monkeypatch.setattr(main.settings, "EVENTS_HEARTBEAT_SECONDS", 0.05)
+        ticket = User.create_events_ticket(user.id)
+
+        class FakeRequest:
+            headers = {}
+            disconnected = False
+
+            async def is_disconnected(self):
+                return self.disconnected
+
+        async def scenario():
+            request = FakeRequest()
+            response = await main.stream_events(request, ticket=ticket, db=TestingSessionLocal())
+            assert response.media_type == "text/event-stream"
+            chunks = response.body_iterator
+            hello = await chunks.__anext__()
+            await broker.publish(user.id, {"resource": "reminder", "action": "created", "id": 7})
+            event = await chunks.__anext__()
+            keepalive = await chunks.__anext__()
+            request.disconnected = True
+            rest = [chunk async for chunk in chunks]
+            return hello, event, keepalive, rest
+
+        hello, event, keepalive, rest = asyncio.run(scenario())
+        assert hello.startswith(b"retry: 5000")
+        assert event.startswith(b"event: reminder\n")
+        assert json.loads(event.split(b"data: ")[1])["id"] == 7
+        assert keepalive == b": keepalive\n\n"
+        assert rest == []
+        assert broker.subscriber_count() == 0
+
+
+class TestHandlersPublish:
+    """Writes announce themselves after commit"""
+
+    def test_crud_events(self, client, broker, db_session):
+        user, headers = create_verified_user_headers(db_session)
+        pet_id = client.post("/pets", json={"name": "Max", "species": "dog"}, headers=headers).json()["id"]
+        activity_id = client.post("/activities", json={
+            "pet_id": pet_id, "activity_date": "2025-03-01T08:00:00", "description": "Walk"
+        }, headers=headers).json()["id"]
+        client.delete(f"/activities/{activity_id}", headers=headers)
+        reminder_id = client.post("/reminders", json={
+            "pet_id": pet_id, "title": "Vet", "reminder_type": "appointment", "reminder_date": "2031-01-01T09:00:00"
+        }, headers=headers).json()["id"]
+        client.put(f"/reminders/{reminder_id}", json={"title": "Vet visit"}, headers=headers)
+
+        assert {user_id for user_id, _ in broker.published} == {str(user.id)}
+        assert [(e["resource"], e["action"], e["id"], e.get("pet_id")) for _, e in broker.published] == [
+            ("pet", "created", pet_id, None),
+            ("activity", "created", activity_id, pet_id),
+            ("activity", "deleted", activity_id, pet_id),
+            ("reminder", "created", reminder_id, pet_id),
+            ("reminder", "updated", reminder_id, pet_id),
+        ]
+
+    def test_failed_writes_publish_nothing(self, client, broker, db_session):
+        _, headers = create_verified_user_headers(db_session)
+        assert client.delete("/pets/999999", headers=headers).status_code == 404
+        assert broker.published == []
+
+    def test_scheduler_announces_notifications(self, broker, db_session):
+        user, _ = create_verified_user_headers(db_session)
+        now = datetime(2031, 1, 1, 9, 0)
+        reminder = Reminder(user_id=user.id, title="Pill", reminder_type="medication",
+                            reminder_date=now - timedelta(minutes=1))
+        db_session.add(reminder)
+        db_session.commit()
+
+        scheduler = ReminderScheduler(TestingSessionLocal, clock=lambda: now, event_broker=broker)
+        asyncio.run(scheduler.tick())
+        assert [(e["resource"], e["action"], e["reminder_id"]) for _, e in broker.published] == [
+            ("notification", "created", reminder.id)
+        ]
@@ -0,0 +1,152 @@
+# tests/integration/test_export.py
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.activity import Activity
+from app.models.medication import Medication
+from app.models.pet import Pet
+from app.models.reminder import Reminder
+from app.services.export_service import ExportService
+from tests.conftest import create_verified_user_headers
+
+@pytest.fixture
+def history(db_session):
+    """Two pets with ten days of walks each, plus a medication and a reminder."""
+    user, headers = create_verified_user_headers(db_session)
+    pets = [Pet(name="Max", species="dog", user_id=user.id), Pet(name="Luna", species="cat", user_id=user.id)]
+    db_session.add_all(pets)
+    db_session.flush()
+    first_day = datetime(2025, 3, 1, 8, 0)
+    for pet in pets:
+        db_session.add_all(
+            Activity(pet_id=pet.id, activity_type="walk", title=f"Walk {i}", description="Park, loop",
+                     duration=30, activity_date=first_day + timedelta(days=i))
+            for i in range(10)
+        )
+    db_session.add(Medication(pet_id=pets[0].id, name="Carprofen", dosage="75mg",
+                              frequency="twice daily", start_date=first_day))
+    db_session.add(Reminder(user_id=user.id, pet_id=None, title="Buy food", reminder_type="other",
+                            reminder_date=first_day))
+    db_session.commit()
+    return headers, [pet.id for pet in pets]
+
+
+class TestExport:
+    """GET /export/{dataset}"""
+
+    def test_csv_activities(self, client, history):
+        headers, pet_ids = history
+        response = client.get("/export/activities", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert response.headers["content-disposition"].startswith('attachment; filename="petwell-activities-')
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 20
+        # Grouped per pet, oldest first
+        assert [row["pet_id"] for row in rows] == [str(pet_ids[0])] * 10 + [str(pet_ids[1])] * 10
+        assert rows[0]["pet_name"] == "Max"
+        assert rows[0]["activity_date"] == "2025-03-01T08:00:00"
+        assert rows[0]["description"] == "Park, loop"
+
+    def test_ndjson_with_date_range_and_pet(self, client, history):
+        headers, pet_ids = history
+        response = client.get(
+            f"/export/activities?format=ndjson&pet_id={pet_ids[1]}&start=2025-03-03&end=2025-03-05",
+            headers=headers
+        )
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["title"] for line in lines] == ["Walk 2", "Walk 3", "Walk 4"]
+        assert f"-pet{pet_ids[1]}-" in response.headers["content-disposition"]
+
+    def test_medications_and_reminders(self, client, history):
+        headers, _ = history
+        medications = list(csv.DictReader(io.StringIO(client.get("/export/medications", headers=headers).text)))
+        assert medications[0]["name"] == "Carprofen"
+        reminders = client.get("/export/reminders?format=ndjson", headers=headers).text.splitlines()
+        assert json.loads(reminders[0])["pet_name"] is None
+
+    def test_other_users_data_is_not_exported(self, client, history, db_session):
+        _, pet_ids = history
+        _, other_headers = create_verified_user_headers(db_session)
+        rows = list(csv.DictReader(io.StringIO(client.get("/export/activities", headers=other_headers).text)))
+        assert rows == []
+        assert client.get(f"/export/activities?pet_id={pet_ids[0]}", headers=other_headers).status_code == 404
+
+    def test_invalid_requests(self, client, history):
+        headers, _ = history
+        assert client.get("/export/users", headers=headers).status_code == 400
+        assert client.get("/export/activities?format=xml", headers=headers).status_code == 400
+        assert client.get("/export/activities?start=2025-03-05&end=2025-03-01", headers=headers).status_code == 400
+        assert client.get("/export/activities").status_code == 401
+
+
+class TestExportStream:
+    """Chunked encoding."""
+
+    def test_one_chunk_per_batch(self, history, db_session):
+        _, pet_ids = history
+        user_id = db_session.get(Pet, pet_ids[0]).user_id
+        stmt = ExportService.build_query("activities", user_id)
+        chunks = list(ExportService.stream(db_session, stmt, "ndjson", batch_size=6))
+        assert len(chunks) == 4  # 20 rows in batches of 6
+        assert sum(chunk.count(b"\n") for chunk in chunks) == 20
+
+
+class TestColumnarExport:
+    """format=arrow / format=parquet"""
+
+    @pytest.fixture
+    def pa(self):
+        return pytest.importorskip("pyarrow")
+
+    def test_parquet_activities(self, client, history, pa):
+        import pyarrow.parquet as pq
+
+        headers, pet_ids = history
+        response = client.get("/export/activities?format=parquet", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/vnd.apache.parquet"
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.num_rows == 20
+        assert str(table.schema.field("activity_date").type) == "timestamp[us]"
+        assert str(table.schema.field("duration").type) == "int64"
+        assert table.column("pet_id").to_pylist() == [pet_ids[0]] * 10 + [pet_ids[1]] * 10
+        assert sum(table.column("duration").to_pylist()) == 600
+
+    def test_arrow_medications(self, client, history, pa):
+        headers, _ = history
+        response = client.get("/export/medications?format=arrow", headers=headers)
+        table = pa.ipc.open_file(pa.py_buffer(response.content)).read_all()
+        assert table.column("name").to_pylist() == ["Carprofen"]
+        assert table.column("is_active").to_pylist() == [True]
+
+    def test_empty_export_keeps_schema(self, client, db_session, pa):
+        _, headers = create_verified_user_headers(db_session)
+        response = client.get("/export/activities?format=arrow", headers=headers)
+        table = pa.ipc.open_file(pa.py_buffer(response.content)).read_all()
+        assert table.num_rows == 0
+        assert "distance" in table.schema.names
+
+    def test_one_record_batch_per_fetch(self, history, db_session, pa):
+        _, pet_ids = history
+        user_id = db_session.get(Pet, pet_ids[0]).user_id
+        stmt = ExportService.build_query("activities", user_id)
+        content = ExportService.write_columnar(db_session, stmt, "arrow", batch_size=6)
+        assert pa.ipc.open_file(pa.py_buffer(content)).num_record_batches == 4
+
+    def test_admin_can_export_any_pet(self, client, history, db_session, pa):
+        _, pet_ids = history
+        admin, admin_headers = create_verified_user_headers(db_session)
+        response = client.get(f"/export/activities?format=arrow&pet_id={pet_ids[1]}", headers=admin_headers)
+        assert response.status_code == 404
+        admin.is_admin = True
+        db_session.commit()
+        response = client.get(f"/export/activities?format=arrow&pet_id={pet_ids[1]}", headers=admin_headers)
+        table = pa.ipc.open_file(pa.py_buffer(response.content)).read_all()
+        assert table.column("pet_name").to_pylist() == ["Luna"] * 10
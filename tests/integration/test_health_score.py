@@ -0,0 +1,65 @@
+# tests/integration/test_health_score.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.activity import Activity
+from app.models.medication import Medication
+from app.models.medication_adherence_weekly import MedicationAdherenceWeekly
+from app.services.adherence_service import week_start
+from app.services.medication_schedule import MedicationScheduleService
+from app.services.rollup_service import ActivityRollupService
+from app.models.pet import Pet
+from tests.conftest import create_verified_user_headers
+
+@pytest.fixture
+def active_dog(db_session):
+    user, headers = create_verified_user_headers(db_session)
+    pet = Pet(name="Max", species="dog", user_id=user.id)
+    db_session.add(pet)
+    db_session.flush()
+    now = datetime.utcnow()
+    # One walk on each of the last 30 UTC days
+    walks = [
+        Activity(pet_id=pet.id, activity_type="walk", title="Walk", duration=60, distance=2.0,
+                 activity_date=now.replace(hour=0, minute=30) - timedelta(days=d))
+        for d in range(30)
+    ]
+    db_session.add_all(walks)
+    ActivityRollupService.add(db_session, walks)
+    medication = Medication(pet_id=pet.id, name="Carprofen", dosage="75mg", frequency="once daily",
+                            start_date=now - timedelta(days=60), is_active=True)
+    MedicationScheduleService.apply_schedule(medication)
+    db_session.add(medication)
+    db_session.flush()
+    # Last week: 5 of 7 daily doses checked off
+    last_week = week_start(now, "UTC") - timedelta(weeks=1)
+    db_session.add(MedicationAdherenceWeekly(medication_id=medication.id, week_start=last_week,
+                                             expected=7, given=5, skipped=0))
+    db_session.commit()
+    return headers, pet.id
+
+
+class TestHealthScore:
+    """GET /pets/{id}/health-score"""
+
+    def test_score(self, client, active_dog):
+        headers, pet_id = active_dog
+        response = client.get(f"/pets/{pet_id}/health-score", headers=headers)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["pet_id"] == pet_id
+        assert body["activity_count"] == 30
+        assert body["minutes_30d"] == 1800
+        assert body["components"]["activity"] == 1.0
+        # From the weekly adherence rollup
+        assert body["medication_adherence"] == round(5 / 7, 3)
+        assert 0 < body["score"] < 100
+        assert len(body["rolling_minutes_7d"]) == 30
+
+    def test_other_users_pet(self, client, active_dog, db_session):
+        _, pet_id = active_dog
+        _, other_headers = create_verified_user_headers(db_session)
+        assert client.get(f"/pets/{pet_id}/health-score", headers=other_headers).status_code == 404
+        assert client.get(f"/pets/{pet_id}/health-score").status_code == 401
@@ -0,0 +1,165 @@
+# tests/integration/test_medication_schedule.py
+
+from datetime import datetime, timedelta
+
+
+from app.models.medication import Medication
+from app.models.medication_dose import MedicationDose
+from app.models.pet import Pet
+from app.services.medication_schedule import MedicationScheduleService
+from tests.conftest import create_verified_user_headers
+
+def doses(db_session, medication_id):
+    db_session.expire_all()
+    return db_session.query(MedicationDose).filter(MedicationDose.medication_id == medication_id) \
+        .order_by(MedicationDose.scheduled_at).all()
+
+def start_of_today() -> str:
+    return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+
+
+class TestMaterialization:
+    """Doses written on create/update"""
+
+    def test_create_parses_and_materializes(self, client, db_session, owner):
+        _, headers, pet_id = owner
+        response = client.post("/medications", json={
+            "pet_id": pet_id, "name": "Carprofen", "dosage": "75mg", "frequency": "every 12 hours",
+            "start_date": start_of_today(),
+        }, headers=headers)
+        assert response.status_code == 201
+        assert response.json()["schedule"] == {"interval_hours": 12.0}
+
+        rows = doses(db_session, response.json()["id"])
+        # 14 days ahead at two a day, from now
+        assert len(rows) in (28, 29)
+        assert all(row.scheduled_at >= datetime.utcnow() - timedelta(minutes=1) for row in rows)
+        assert rows[1].scheduled_at - rows[0].scheduled_at == timedelta(hours=12)
+
+    def test_unrecognized_frequency_has_no_doses(self, client, db_session, owner):
+        _, headers, pet_id = owner
+        response = client.post("/medications", json={
+            "pet_id": pet_id, "name": "Fish oil", "dosage": "1 capsule", "frequency": "with food",
+        }, headers=headers)
+        assert response.status_code == 201 and response.json()["schedule"] is None
+        assert doses(db_session, response.json()["id"]) == []
+
+    def test_update_rewrites_future_doses(self, client, db_session, owner):
+        _, headers, pet_id = owner
+        medication_id = client.post("/medications", json={
+            "pet_id": pet_id, "name": "Apoquel", "dosage": "16mg", "frequency": "twice daily",
+            "start_date": start_of_today(),
+        }, headers=headers).json()["id"]
+        assert len(doses(db_session, medication_id)) in (27, 28, 29)
+
+        response = client.put(f"/medications/{medication_id}", json={"frequency": "once daily"}, headers=headers)
+        assert response.json()["schedule"] == {"times": ["08:00"]}
+        assert len(doses(db_session, medication_id)) in (14, 15)
+
+        client.put(f"/medications/{medication_id}", json={"is_active": False}, headers=headers)
+        assert doses(db_session, medication_id) == []
+
+    def test_end_date_and_delete(self, client, db_session, owner):
+        _, headers, pet_id = owner
+        end = datetime.utcnow() + timedelta(days=2)
+        medication_id = client.post("/medications", json={
+            "pet_id": pet_id, "name": "Cephalexin", "dosage": "250mg", "frequency": "every 8 hours",
+            "end_date": end.isoformat(),
+        }, headers=headers).json()["id"]
+        rows = doses(db_session, medication_id)
+        # Starting now: the first dose is already past, the last is cut off by end_date
+        assert len(rows) == 5 and rows[-1].scheduled_at < end
+
+        assert client.delete(f"/medications/{medication_id}", headers=headers).status_code == 204
+        assert doses(db_session, medication_id) == []
+
+    def test_dates_with_utc_offset_are_stored_naive(self, client, db_session, owner):
+        # The dashboard form sends toISOString(), e.g. "2026-10-19T00:00:00.000Z"
+        _, headers, pet_id = owner
+        start = start_of_today()
+        response = client.post("/medications", json={
+            "pet_id": pet_id, "name": "Carprofen", "dosage": "75mg", "frequency": "every 12 hours",
+            "start_date": start + ".000Z", "end_date": (datetime.utcnow() + timedelta(days=3)).isoformat() + "Z",
+        }, headers=headers)
+        assert response.status_code == 201
+        medication_id = response.json()["id"]
+        db_session.expire_all()
+        medication = db_session.get(Medication, medication_id)
+        assert medication.start_date == datetime.fromisoformat(start) and medication.start_date.tzinfo is None
+        assert len(doses(db_session, medication_id)) in (5, 6)
+
+        response = client.put(f"/medications/{medication_id}", json={
+            "start_date": start.replace("T00:00:00", "T02:00:00") + "+02:00",
+        }, headers=headers)
+        assert response.status_code == 200
+        db_session.expire_all()
+        assert db_session.get(Medication, medication_id).start_date == datetime.fromisoformat(start)
+
+
+class TestUpcoming:
+    """GET /medications/upcoming"""
+
+    def test_next_24_hours(self, client, db_session, owner):
+        user, headers, pet_id = owner
+        for name, frequency in (("Carprofen", "every 6 hours"), ("Heartgard", "monthly")):
+            client.post("/medications", json={
+                "pet_id": pet_id, "name": name, "dosage": "1 tablet", "frequency": frequency,
+                "start_date": (datetime.utcnow() + timedelta(days=3)).isoformat(),
+            }, headers=headers)
+        other_pet = Pet(name="Luna", species="cat", user_id=user.id)
+        db_session.add(other_pet)
+        db_session.commit()
+        client.post("/medications", json={
+            "pet_id": other_pet.id, "name": "Methimazole", "dosage": "2.5mg", "frequency": "every 4 hours",
+        }, headers=headers)
+
+        upcoming = client.get("/medications/upcoming", headers=headers).json()
+        # Starts in three days: only Luna's doses are due
+        assert len(upcoming) == 6
+        assert {dose["pet_name"] for dose in upcoming} == {"Luna"}
+        assert upcoming[0]["name"] == "Methimazole" and upcoming[0]["dosage"] == "2.5mg"
+        assert [dose["scheduled_at"] for dose in upcoming] == sorted(dose["scheduled_at"] for dose in upcoming)
+
+        week = client.get(f"/medications/upcoming?hours=168&pet_id={pet_id}", headers=headers).json()
+        assert {dose["name"] for dose in week} == {"Carprofen", "Heartgard"}
+        assert client.get("/medications/upcoming?hours=0", headers=headers).status_code == 400
+
+    def test_other_users_doses_are_hidden(self, client, db_session, owner):
+        _, headers, pet_id = owner
+        client.post("/medications", json={
+            "pet_id": pet_id, "name": "Carprofen", "dosage": "75mg", "frequency": "every 4 hours",
+        }, headers=headers)
+        _, other_headers = create_verified_user_headers(db_session)
+        assert client.get("/medications/upcoming", headers=other_headers).json() == []
+
+
+class TestHorizon:
+    """Rolling the materialized window forward"""
+
+    def test_extend_horizon_fills_only_the_gap(self, db_session, owner):
+        user, _, pet_id = owner
+        now = datetime(2031, 1, 15, 12, 0)
+        medication = Medication(pet_id=pet_id, name="Apoquel", dosage="16mg", frequency="twice daily",
+                                start_date=datetime(2031, 1, 1))
+        db_session.add(medication)
+        MedicationScheduleService.apply_schedule(medication)
+        MedicationScheduleService.materialize(db_session, medication, user, now, timedelta(days=2))
+        as_needed = Medication(pet_id=pet_id, name="Gabapentin", dosage="100mg", frequency="as needed",
+                               start_date=datetime(2031, 1, 1))
+        db_session.add(as_needed)
+        MedicationScheduleService.apply_schedule(as_needed)
+        db_session.commit()
+        updated_at = medication.updated_at
+        assert len(doses(db_session, medication.id)) == 4
+
+        written = MedicationScheduleService.extend_horizon(db_session, now + timedelta(days=1),
+                                                           timedelta(days=2), chunk_size=1)
+        assert written == 2
+        rows = doses(db_session, medication.id)
+        assert len(rows) == 6 and len({row.scheduled_at for row in rows}) == 6
+        assert db_session.get(Medication, medication.id).doses_until == datetime(2031, 1, 18, 12, 0)
+        # Rolling the horizon is not an edit
+        assert db_session.get(Medication, medication.id).updated_at == updated_at
+        assert db_session.get(Medication, as_needed.id).doses_until is None
+        # Already up to date
+        assert MedicationScheduleService.extend_horizon(db_session, now + timedelta(days=1), timedelta(days=2)) == 0
@@ -0,0 +1,88 @@
+# tests/integration/test_profiler.py
+
+import threading
+
+import pytest
+
+from app.config import settings
+from app.services.profiler_service import StackSampler
+from tests.conftest import create_verified_user_headers
+
+@pytest.fixture
+def client(client, monkeypatch):
+    """The test client, with profiling on."""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    return client
+
+@pytest.fixture
+def admin_headers(db_session):
+    user, headers = create_verified_user_headers(db_session)
+    user.is_admin = True
+    db_session.commit()
+    return headers
+
+
+class TestStackSampler:
+    """Collapsed-stack output."""
+
+    def test_collapsed_format(self):
+        sampler = StackSampler(interval=0.001)
+        result = {}
+        worker = threading.Thread(target=lambda: result.update(output=sampler.run(0.05)))
+        worker.start()
+        while worker.is_alive():
+            sum(range(1000))  # keep this thread on-CPU so it shows up in samples
+        output = result["output"]
+        assert sampler.sample_count > 0
+        stack, count = output.splitlines()[0].rsplit(" ", 1)
+        assert ";" in stack
+        assert int(count) >= 1
+
+
+class TestSamplingEndpoint:
+    """POST /admin/profiler/sample"""
+
+    def test_admin_gets_collapsed_stacks(self, client, admin_headers):
+        response = client.post("/admin/profiler/sample?seconds=0.1&interval_ms=2", headers=admin_headers)
+        assert response.status_code == 200
+        assert "attachment" in response.headers["content-disposition"]
+        assert ";" in response.text
+
+    def test_non_admin_forbidden(self, client, db_session):
+        _, headers = create_verified_user_headers(db_session)
+        response = client.post("/admin/profiler/sample?seconds=0.1", headers=headers)
+        assert response.status_code == 403
+
+    def test_anonymous_unauthorized(self, client):
+        assert client.post("/admin/profiler/sample?seconds=0.1").status_code == 401
+
+    def test_hidden_when_disabled(self, client, admin_headers, monkeypatch):
+        monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+        response = client.post("/admin/profiler/sample?seconds=0.1", headers=admin_headers)
+        assert response.status_code == 404
+
+
+class TestRequestProfiling:
+    """X-Profile header toggle."""
+
+    def test_admin_request_is_profiled(self, client, admin_headers):
+        response = client.get("/pets", headers={**admin_headers, "X-Profile": "1"})
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+
+        report = client.get(f"/admin/profiler/requests/{profile_id}", headers=admin_headers)
+        assert report.status_code == 200
+        assert report.text.startswith("GET /pets")
+        assert "function calls" in report.text
+
+    def test_header_ignored_for_non_admin(self, client, db_session):
+        _, headers = create_verified_user_headers(db_session)
+        response = client.get("/pets", headers={**headers, "X-Profile": "1"})
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+
+    def test_report_requires_admin(self, client, admin_headers, db_session):
+        response = client.get("/pets", headers={**admin_headers, "X-Profile": "1"})
+        _, headers = create_verified_user_headers(db_session)
+        report = client.get(f"/admin/profiler/requests/{response.headers['X-Profile-Id']}", headers=headers)
+        assert report.status_code == 403
@@ -0,0 +1,74 @@
+# tests/integration/test_query_stats.py
+
+import json
+import logging
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.query_stats import QueryStats, current_query_stats, normalize_sql
+from tests.conftest import create_verified_user_headers, test_engine
+
+
+class TestNormalizeSql:
+    """Statement shape normalization for the slow-query log."""
+
+    def test_literals_and_whitespace(self):
+        sql = "SELECT *\n  FROM pets WHERE name = 'Rex' AND age > 3"
+        assert normalize_sql(sql) == "SELECT * FROM pets WHERE name = ? AND age > ?"
+
+    def test_in_lists_collapse(self):
+        assert normalize_sql("SELECT 1 FROM a WHERE id IN (?, ?, ?)") == normalize_sql("SELECT 1 FROM a WHERE id IN (?, ?)")
+
+    def test_identifiers_kept(self):
+        assert "users_1" in normalize_sql("SELECT users_1.id FROM users AS users_1")
+
+
+class TestStatementCounting:
+    """Engine hooks accumulate into the active QueryStats."""
+
+    def test_counts_statements_in_context(self):
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        try:
+            with test_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        finally:
+            current_query_stats.reset(token)
+        assert stats.count == 2
+        assert stats.duration > 0
+
+    def test_slow_query_log(self, monkeypatch, caplog):
+        monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.0)
+        stats = QueryStats(route=lambda: "/pets/{id}")
+        token = current_query_stats.set(stats)
+        try:
+            with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+                with test_engine.connect() as conn:
+                    conn.execute(text("SELECT 'secret' AS x"))
+        finally:
+            current_query_stats.reset(token)
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record["event"] == "slow_query"
+        assert record["route"] == "/pets/{id}"
+        assert record["sql"] == "SELECT ? AS x"
+        assert record["duration_ms"] >= 0
+
+
+class TestResponseHeaders:
+    """X-DB-Queries and Server-Timing on real endpoints."""
+
+    def test_headers_present(self, client, db_session):
+        _, headers = create_verified_user_headers(db_session)
+        response = client.get("/pets", headers=headers)
+        assert response.status_code == 200
+        # user lookup + ETag fingerprint + page query
+        assert int(response.headers["x-db-queries"]) >= 3
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert "app;dur=" in response.headers["server-timing"]
+
+    def test_no_queries_for_static_pages(self, client):
+        response = client.get("/login")
+        assert response.headers["x-db-queries"] == "0"
@@ -0,0 +1,125 @@
+# tests/integration/test_rate_limits.py
+
+import pytest
+
+import main
+from app.models.pet import Pet
+from app.models.rate_limit_bucket import RateLimitBucket
+from app.services.rate_limiter import DatabaseRateLimitStore, InMemoryRateLimitStore, parse_rate, rate_limited_total
+from benchmarks.fakes import FakeOpenAI
+from tests.conftest import TestingSessionLocal, create_verified_user_headers
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Small limits on a fresh in-memory store."""
+    limiter = main.rate_limiter
+    monkeypatch.setattr(limiter, "store", InMemoryRateLimitStore())
+    monkeypatch.setattr(limiter, "enabled", True)
+    monkeypatch.setattr(limiter, "groups", dict(limiter.groups))
+    monkeypatch.setattr(main, "openai_client", FakeOpenAI())
+    main.vet_chat_cache.clear()
+    yield limiter
+    main.vet_chat_cache.clear()
+
+
+class TestAIRateLimits:
+    """Routes that call the model share the "ai" buckets"""
+
+    def test_per_user_limit_returns_429_with_retry_after(self, client, db_session, limits):
+        limits.configure("ai", {"user": "2/minute", "global": "100/minute"})
+        _, headers = create_verified_user_headers(db_session)
+        _, other_headers = create_verified_user_headers(db_session)
+        rejected = rate_limited_total.value(group="ai", scope="user")
+
+        assert client.get("/activities/sorted/ai", headers=headers).status_code == 200
+        assert client.post("/chat/vet", json={"message": "Is chocolate bad for dogs?"}, headers=headers).status_code == 200
+        response = client.post("/chat/vet", json={"message": "Are grapes bad for dogs?"}, headers=headers)
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "30"
+        assert "Too many requests" in response.json()["error"]
+        assert rate_limited_total.value(group="ai", scope="user") == rejected + 1
+        # Another user has their own bucket
+        assert client.get("/activities/sorted/ai", headers=other_headers).status_code == 200
+
+    def test_global_limit_applies_across_users(self, client, db_session, limits):
+        limits.configure("ai", {"user": "10/minute", "global": "1/minute"})
+        _, headers = create_verified_user_headers(db_session)
+        _, other_headers = create_verified_user_headers(db_session)
+
+        assert client.get("/activities/sorted/ai", headers=headers).status_code == 200
+        response = client.get("/activities/sorted/ai", headers=other_headers)
+        assert response.status_code == 429 and response.headers["Retry-After"] == "60"
+
+    def test_activity_imports_pay_per_enrichment_batch(self, client, db_session, limits):
+        limits.configure("ai", {"user": "3/minute", "global": "100/minute"})
+        user, headers = create_verified_user_headers(db_session)
+        pet = Pet(name="Max", species="dog", user_id=user.id)
+        db_session.add(pet)
+        db_session.commit()
+
+        def activity(description, **fields):
+            return {"pet_id": pet.id, "description": description, "activity_date": "2026-10-01T08:00:00", **fields}
+
+        def bulk(count, **fields):
+            items = [activity(f"Walk {i}", **fields) for i in range(count)]
+            return client.post("/activities/bulk", json={"activities": items}, headers=headers)
+
+        # 26 descriptions to categorize are two batches; typed items cost nothing
+        assert bulk(26).status_code == 201
+        assert bulk(30, activity_type="walk", title="Walk").status_code == 201
+        assert client.post("/activities", json=activity("Fed dinner"), headers=headers).status_code == 201
+        assert client.post("/activities", json=activity("Fed breakfast"), headers=headers).status_code == 429
+        assert bulk(1).status_code == 429
+
+    def test_unauthenticated_requests_are_not_counted(self, client, limits):
+        limits.configure("ai", {"user": "1/minute", "global": "1/minute"})
+        assert client.post("/chat/vet", json={"message": "hi"}).status_code == 401
+        assert len(limits.store) == 0
+
+
+class TestLoginRateLimits:
+    """/users/login is limited per client address"""
+
+    def test_login_attempts_are_limited_per_client(self, client, limits):
+        limits.configure("login", {"client": "3/minute", "global": "off"})
+        credentials = {"username": "nobody@example.com", "password": "WrongPass123!"}
+
+        statuses = [client.post("/users/login", json=credentials).status_code for _ in range(4)]
+        assert statuses == [401, 401, 401, 429]
+        # The 401 keeps its WWW-Authenticate header now that handler headers pass through
+        limits.store.reset()
+        assert client.post("/users/login", json=credentials).headers["WWW-Authenticate"] == "Bearer"
+
+    def test_every_login_route_shares_the_default_client_limit(self, client, limits):
+        credentials = {"username": "nobody@example.com", "password": "WrongPass123!"}
+        statuses = [client.post("/login/json", json=credentials).status_code for _ in range(11)]
+        assert statuses == [401] * 10 + [429]
+
+        limits.store.reset()
+        client.post("/users/login", json=credentials)
+        form = {"username": credentials["username"], "password": credentials["password"]}
+        statuses = [client.post("/login", data=form).status_code for _ in range(10)]
+        assert statuses == [401] * 9 + [429]
+
+
+class TestDatabaseStore:
+    """Buckets shared through the rate_limit_buckets table"""
+
+    def test_buckets_are_shared_between_store_instances(self, db_session):
+        now = [5000.0]
+        first = DatabaseRateLimitStore(TestingSessionLocal, clock=lambda: now[0])
+        second = DatabaseRateLimitStore(TestingSessionLocal, clock=lambda: now[0])
+        rate = parse_rate("2/minute")
+        key = "test:user:shared"
+
+        assert first.acquire(key, rate).allowed
+        assert second.acquire(key, rate).allowed
+        denied = first.acquire(key, rate)
+        assert not denied.allowed and denied.retry_after == pytest.approx(30)
+
+        now[0] += 30
+        assert second.acquire(key, rate).allowed
+        bucket = db_session.get(RateLimitBucket, key)
+        assert bucket.tokens == pytest.approx(0) and bucket.updated_at == 5030.0
+        first.reset()
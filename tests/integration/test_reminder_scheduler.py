@@ -0,0 +1,169 @@
+# tests/integration/test_reminder_scheduler.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+from app.models.notification import Notification
+from app.models.pet import Pet
+from app.models.reminder import Reminder
+from app.models.email_outbox import EmailOutbox
+from app.services.reminder_scheduler import ReminderScheduler
+from tests.conftest import TestingSessionLocal, create_verified_user_headers
+
+NOW = datetime(2031, 1, 1, 9, 0)
+
+@pytest.fixture
+def queued_emails(db_session):
+    """(to, subject) of the reminder emails queued in the outbox so far."""
+    def queued():
+        db_session.expire_all()
+        return [(row.to_email, row.subject) for row in db_session.query(EmailOutbox).order_by(EmailOutbox.id)]
+    return queued
+
+@pytest.fixture
+def scheduler():
+    return ReminderScheduler(TestingSessionLocal, clock=lambda: NOW)
+
+@pytest.fixture
+def due_reminders(db_session):
+    """Two reminders due a minute ago, one tomorrow, one completed."""
+    user, headers = create_verified_user_headers(db_session)
+    pet = Pet(name="Max", species="dog", user_id=user.id)
+    db_session.add(pet)
+    db_session.flush()
+    reminders = [
+        Reminder(user_id=user.id, pet_id=pet.id, title="Heartworm pill", reminder_type="medication",
+                 reminder_date=NOW - timedelta(minutes=1)),
+        Reminder(user_id=user.id, title="Order food", reminder_type="other",
+                 reminder_date=NOW - timedelta(minutes=1)),
+        Reminder(user_id=user.id, title="Vet visit", reminder_type="appointment",
+                 reminder_date=NOW + timedelta(days=1)),
+        Reminder(user_id=user.id, title="Done already", reminder_type="other",
+                 reminder_date=NOW - timedelta(minutes=5), is_completed=True),
+    ]
+    db_session.add_all(reminders)
+    db_session.commit()
+    return user, headers, [reminder.id for reminder in reminders]
+
+
+class TestHeap:
+    """Due-time ordering and lazy removal"""
+
+    def test_pop_due_in_order(self, scheduler):
+        scheduler._horizon_end = NOW + timedelta(hours=1)
+        scheduler.schedule(1, NOW + timedelta(minutes=3))
+        scheduler.schedule(2, NOW + timedelta(minutes=1))
+        scheduler.schedule(3, NOW + timedelta(minutes=2))
+        scheduler.unschedule(3)
+        scheduler.schedule(1, NOW + timedelta(minutes=30))  # moved later
+        assert scheduler.pop_due(NOW + timedelta(minutes=10), limit=10) == [2]
+        assert scheduler.next_due() == NOW + timedelta(minutes=30)
+        assert len(scheduler) == 1
+
+    def test_ignores_reminders_past_horizon_and_before_start(self, scheduler):
+        scheduler.schedule(1, NOW)
+        assert len(scheduler) == 0  # not started
+        scheduler._horizon_end = NOW + timedelta(hours=1)
+        scheduler.schedule(2, NOW + timedelta(days=2))
+        assert len(scheduler) == 0
+
+    def test_batch_limit(self, scheduler):
+        scheduler._horizon_end = NOW + timedelta(hours=1)
+        for i in range(5):
+            scheduler.schedule(i, NOW - timedelta(minutes=i))
+        assert scheduler.pop_due(NOW, limit=3) == [4, 3, 2]
+
+
+class TestDispatch:
+    """Claiming, in-app notifications and email"""
+
+    def test_tick_fires_due_reminders(self, scheduler, due_reminders, queued_emails, db_session):
+        user, _, ids = due_reminders
+        assert asyncio.run(scheduler.tick()) is None  # fired a batch, run again
+        assert sorted(subject for _, subject in queued_emails()) == ["Reminder: Heartworm pill for Max", "Reminder: Order food"]
+        assert {to for to, _ in queued_emails()} == {user.email}
+
+        notifications = db_session.query(Notification).order_by(Notification.reminder_id).all()
+        assert [n.reminder_id for n in notifications] == ids[:2]
+        assert notifications[0].body == "Medication for Max"
+        db_session.expire_all()
+        fired = db_session.get(Reminder, ids[0])
+        assert fired.notified_at == NOW and fired.lease_owner is None
+
+        # Nothing left until tomorrow's reminder enters the horizon at the next refill
+        delay = asyncio.run(scheduler.tick())
+        assert delay == scheduler.refill_interval.total_seconds()
+        assert len(queued_emails()) == 2
+
+    def test_leased_reminders_are_skipped_until_expiry(self, scheduler, due_reminders, queued_emails, db_session):
+        _, _, ids = due_reminders
+        db_session.query(Reminder).filter(Reminder.id == ids[0]).update(
+            {Reminder.lease_owner: "other-replica", Reminder.lease_expires_at: NOW + timedelta(minutes=1)}
+        )
+        db_session.commit()
+        assert [due.reminder_id for due in scheduler.claim(ids[:2], NOW)] == [ids[1]]
+
+        later = ReminderScheduler(TestingSessionLocal, clock=lambda: NOW + timedelta(minutes=2))
+        assert [due.reminder_id for due in later.claim(ids[:2], NOW + timedelta(minutes=2))] == [ids[0]]
+
+    def test_each_reminder_fires_once_across_workers(self, due_reminders, queued_emails):
+        _, _, ids = due_reminders
+        first = ReminderScheduler(TestingSessionLocal, clock=lambda: NOW)
+        second = ReminderScheduler(TestingSessionLocal, clock=lambda: NOW)
+        claimed = first.claim(ids, NOW) + second.claim(ids, NOW)
+        assert sorted(due.reminder_id for due in claimed) == ids[:2]
+
+
+class TestHandlersAndEndpoints:
+    """Reminder handlers keep the heap in sync; notification endpoints"""
+
+    def test_handlers_update_heap(self, client, due_reminders, monkeypatch):
+        _, headers, _ = due_reminders
+        scheduler = ReminderScheduler(TestingSessionLocal)
+        scheduler._horizon_end = datetime.utcnow() + timedelta(hours=1)
+        monkeypatch.setattr(main, "reminder_scheduler", scheduler)
+
+        soon = (datetime.utcnow() + timedelta(minutes=10)).isoformat()
+        reminder_id = client.post("/reminders", json={
+            "title": "Walk", "reminder_type": "other", "reminder_date": soon
+        }, headers=headers).json()["id"]
+        assert len(scheduler) == 1
+
+        client.put(f"/reminders/{reminder_id}", json={"is_completed": True}, headers=headers)
+        assert len(scheduler) == 0
+        client.put(f"/reminders/{reminder_id}", json={"is_completed": False}, headers=headers)
+        assert len(scheduler) == 1
+        client.delete(f"/reminders/{reminder_id}", headers=headers)
+        assert len(scheduler) == 0
+
+    def test_rescheduling_rearms_a_fired_reminder(self, client, scheduler, due_reminders, queued_emails, db_session):
+        _, headers, ids = due_reminders
+        asyncio.run(scheduler.tick())
+        body = client.put(f"/reminders/{ids[0]}", json={"reminder_date": "2031-01-02T09:00:00"}, headers=headers)
+        assert body.status_code == 200
+        db_session.expire_all()
+        assert db_session.get(Reminder, ids[0]).notified_at is None
+
+    def test_notifications(self, client, scheduler, due_reminders, queued_emails, db_session):
+        _, headers, _ = due_reminders
+        asyncio.run(scheduler.tick())
+
+        response = client.get("/notifications?unread=true", headers=headers)
+        assert response.status_code == 200
+        notifications = response.json()
+        assert {n["title"] for n in notifications} == {"Heartworm pill", "Order food"}
+        assert client.get("/notifications?unread=true", headers={
+            **headers, "If-None-Match": response.headers["etag"]
+        }).status_code == 304
+
+        read = client.post(f"/notifications/{notifications[0]['id']}/read", headers=headers).json()
+        assert read["read_at"] is not None
+        assert client.post("/notifications/read-all", headers=headers).json() == {"updated": 1}
+        assert client.get("/notifications?unread=true", headers=headers).json() == []
+
+        _, other_headers = create_verified_user_headers(db_session)
+        assert client.get("/notifications", headers=other_headers).json() == []
+        assert client.post(f"/notifications/{notifications[0]['id']}/read", headers=other_headers).status_code == 404
@@ -0,0 +1,107 @@
+# tests/integration/test_search.py
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.models.activity import Activity
+from app.models.medication import Medication
+from app.models.pet import Pet
+from app.models.search_vector import SEARCH_VECTORS
+from app.services.search_service import highlight, parse_query, stem
+from tests.conftest import create_verified_user_headers
+
+@pytest.fixture
+def history(db_session):
+    """Two pets with a little history; returns (headers, max_id, luna_id)."""
+    user, headers = create_verified_user_headers(db_session)
+    max_ = Pet(name="Max", species="dog", user_id=user.id, medical_notes="Allergic to chicken. Vomited after Rimadyl in 2029.")
+    luna = Pet(name="Luna", species="cat", user_id=user.id)
+    db_session.add_all([max_, luna])
+    db_session.flush()
+    start = datetime(2030, 1, 1)
+    db_session.add_all([
+        Activity(pet_id=max_.id, activity_type="other", title="Vomiting after breakfast",
+                 description="Threw up twice, seemed fine by noon", activity_date=start),
+        Activity(pet_id=max_.id, activity_type="vet_visit", title="Annual checkup",
+                 notes="Vet says the vomiting is probably dietary <b>not</b> serious", activity_date=start + timedelta(days=30)),
+        Activity(pet_id=luna.id, activity_type="other", title="Hairball", description="Vomit on the rug",
+                 activity_date=start + timedelta(days=60)),
+        Medication(pet_id=max_.id, name="Rimadyl", dosage="75mg", frequency="twice daily", reason="Hip pain",
+                   start_date=start),
+    ])
+    # Many unrelated walks, so the matches above are rare terms
+    db_session.add_all([
+        Activity(pet_id=max_.id, activity_type="walk", title="Morning walk", description="Around the park",
+                 activity_date=start + timedelta(hours=i)) for i in range(50)
+    ])
+    db_session.commit()
+    return headers, max_.id, luna.id
+
+
+class TestSearchEndpoint:
+    """GET /search (in-memory index on SQLite)"""
+
+    def test_ranks_and_highlights(self, client, history):
+        headers, _, _ = history
+        results = client.get("/search", params={"q": "vomiting"}, headers=headers).json()
+        assert [(r["type"], r["title"]) for r in results][:1] == [("activity", "Vomiting after breakfast")]
+        assert {r["title"] for r in results} == {"Vomiting after breakfast", "Annual checkup", "Hairball", "Max"}
+        assert results == sorted(results, key=lambda r: -r["rank"])
+
+        checkup = next(r for r in results if r["title"] == "Annual checkup")
+        # Escaped user text, marked matches
+        assert "<mark>vomiting</mark>" in checkup["highlight"] and "&lt;b&gt;not&lt;/b&gt;" in checkup["highlight"]
+
+    def test_filters(self, client, history):
+        headers, max_id, luna_id = history
+        results = client.get("/search", params={"q": "rimadyl", "type": "medication"}, headers=headers).json()
+        assert [(r["type"], r["title"], r["pet_id"]) for r in results] == [("medication", "Rimadyl", max_id)]
+
+        results = client.get("/search", params={"q": "vomit", "pet_id": luna_id}, headers=headers).json()
+        assert [r["title"] for r in results] == ["Hairball"]
+        assert client.get("/search", params={"q": "vomit", "type": "reminder"}, headers=headers).status_code == 400
+
+    def test_phrases_and_exclusions(self, client, history):
+        headers, _, _ = history
+        titles = lambda q: {r["title"] for r in client.get("/search", params={"q": q}, headers=headers).json()}
+        assert titles('"threw up"') == {"Vomiting after breakfast"}
+        assert titles('"up threw"') == set()
+        assert titles("vomiting -checkup -hairball") == {"Vomiting after breakfast", "Max"}
+        assert titles("vomiting rug") == {"Hairball"}
+
+    def test_index_follows_writes(self, client, history):
+        headers, max_id, _ = history
+        assert client.get("/search", params={"q": "limping"}, headers=headers).json() == []
+        response = client.post("/activities", json={
+            "pet_id": max_id, "activity_type": "other", "title": "Other",
+            "description": "Limping on back leg", "activity_date": "2030-03-01T09:00:00",
+        }, headers=headers)
+        assert response.status_code in (200, 201)
+        results = client.get("/search", params={"q": "limping"}, headers=headers).json()
+        assert [r["title"] for r in results] == ["Limping on back leg"]
+
+    def test_other_users_data_is_not_searched(self, client, db_session, history):
+        _, other_headers = create_verified_user_headers(db_session)
+        assert client.get("/search", params={"q": "vomiting"}, headers=other_headers).json() == []
+
+
+class TestSearchHelpers:
+    """Query parsing, stemming, excerpts and the PostgreSQL DDL"""
+
+    def test_stem_and_parse(self):
+        assert stem("vomiting") == stem("vomited") == stem("vomits") == "vomit"
+        assert parse_query('dog "hip pain" -walk the') == ([["dog"], ["hip", "pain"]], ["walk"])
+
+    def test_highlight_window(self):
+        text = " ".join(["walk"] * 40 + ["limping"] + ["walk"] * 40)
+        excerpt = highlight(text, {"limp"})
+        assert excerpt.startswith("…") and excerpt.endswith("…") and "<mark>limping</mark>" in excerpt
+
+    def test_postgres_search_vectors(self):
+        assert set(SEARCH_VECTORS) == {"activities", "medications", "pets"}
+        assert "setweight(to_tsvector('english', coalesce(title, '')), 'A')" in SEARCH_VECTORS["activities"]
+        # Not part of the mapped table: other dialects never see the column
+        assert "search_vector" not in str(CreateTable(Activity.__table__).compile(dialect=postgresql.dialect()))
@@ -0,0 +1,96 @@
+# tests/unit/test_asset_manifest.py
+
+import os
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.asset_service import IMMUTABLE_CACHE_CONTROL, PrecompressedStaticFiles
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    """A static tree with fingerprinted and non-fingerprinted files."""
+    (tmp_path / "js").mkdir()
+    (tmp_path / "styles").mkdir()
+    (tmp_path / "images").mkdir()
+    (tmp_path / "js" / "app.js").write_text("console.log('v1');")
+    (tmp_path / "styles" / "site.css").write_text("body { color: red; }")
+    (tmp_path / "images" / "logo.svg").write_text("<svg></svg>")
+    return tmp_path
+
+
+@pytest.fixture
+def static_files(static_dir):
+    static = PrecompressedStaticFiles(directory=str(static_dir))
+    static.build_manifest()
+    return static
+
+
+@pytest.fixture
+def client(static_files):
+    app = FastAPI()
+    app.mount("/static", static_files, name="static")
+    return TestClient(app)
+
+
+class TestManifest:
+    """Fingerprinting of js/ and styles/."""
+
+    def test_manifest_entries(self, static_files):
+        assert set(static_files.manifest) == {"js/app.js", "styles/site.css"}
+        assert re.fullmatch(r"js/app\.[0-9a-f]{12}\.js", static_files.manifest["js/app.js"])
+
+    def test_asset_url(self, static_files):
+        assert static_files.asset_url("js/app.js") == f"/static/{static_files.manifest['js/app.js']}"
+        assert static_files.asset_url("images/logo.svg") == "/static/images/logo.svg"
+
+    def test_hash_follows_content(self, static_dir, static_files):
+        before = static_files.manifest["js/app.js"]
+        (static_dir / "js" / "app.js").write_text("console.log('v2');")
+        static_files.build_manifest()
+        assert static_files.manifest["js/app.js"] != before
+
+    def test_auto_reload(self, static_dir):
+        static = PrecompressedStaticFiles(directory=str(static_dir), auto_reload=True)
+        static.build_manifest()
+        before = static.asset_url("js/app.js")
+        path = static_dir / "js" / "app.js"
+        path.write_text("console.log('changed');")
+        os.utime(path, (0, os.stat(path).st_mtime + 10))
+        assert static.asset_url("js/app.js") != before
+
+
+class TestHashedServing:
+    """Cache headers on hashed vs plain URLs."""
+
+    def test_hashed_url_is_immutable(self, client, static_files):
+        response = client.get(static_files.asset_url("js/app.js"))
+        assert response.status_code == 200
+        assert response.text == "console.log('v1');"
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    def test_plain_url_revalidates(self, client):
+        response = client.get("/static/js/app.js")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_stale_hash_is_not_immutable(self, client):
+        response = client.get("/static/js/app.000000000000.js")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_unknown_file_404(self, client):
+        assert client.get("/static/js/missing.0123456789ab.js").status_code == 404
+
+
+def test_templates_reference_hashed_assets():
+    """The real pages link fingerprinted assets instead of ?v= query strings."""
+    from main import app, static_files
+
+    response = TestClient(app).get("/dashboard")
+    assert response.status_code == 200
+    assert static_files.asset_url("js/dashboard.js") in response.text
+    assert "dashboard.js?v=" not in response.text
@@ -0,0 +1,161 @@
+# tests/unit/test_compression.py
+
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, HAS_BROTLI, negotiate_encoding
+from app.services.asset_service import PrecompressedStaticFiles
+
+LARGE_JSON = {"items": [{"id": i, "name": f"pet {i}"} for i in range(200)]}
+
+
+@pytest.fixture
+def client():
+    """A minimal app wrapped in CompressionMiddleware."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    def large():
+        return LARGE_JSON
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"x" * 2000), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b"line\n" * 200 for _ in range(5)), media_type="text/plain")
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    return TestClient(app)
+
+
+class TestNegotiateEncoding:
+    """Accept-Encoding parsing."""
+
+    def test_prefers_brotli(self):
+        expected = "br" if HAS_BROTLI else "gzip"
+        assert negotiate_encoding("gzip, deflate, br") == expected
+
+    def test_gzip_only(self):
+        assert negotiate_encoding("gzip") == "gzip"
+
+    def test_respects_q_zero(self):
+        assert negotiate_encoding("br;q=0, gzip") == "gzip"
+
+    def test_identity(self):
+        assert negotiate_encoding("") is None
+        assert negotiate_encoding("identity") is None
+
+    def test_wildcard(self):
+        assert negotiate_encoding("*", brotli_available=False) == "gzip"
+
+
+class TestCompressionMiddleware:
+    """Dynamic response compression."""
+
+    def test_large_json_is_gzipped(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == LARGE_JSON
+
+    @pytest.mark.skipif(not HAS_BROTLI, reason="brotli not available")
+    def test_large_json_is_brotli(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+        assert response.headers["content-encoding"] == "br"
+
+    def test_small_response_untouched(self, client):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_no_accept_encoding(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_already_encoded_passthrough(self, client):
+        response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == "x" * 2000
+
+    def test_streaming_response(self, client):
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == "line\n" * 1000
+
+    def test_binary_content_type_skipped(self, client):
+        response = client.get("/image", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+
+class TestPrecompressedStaticFiles:
+    """Serving build-time .gz/.br variants."""
+
+    @pytest.fixture
+    def static_client(self, tmp_path):
+        (tmp_path / "app.js").write_text("console.log('petwell');\n" * 200)
+        (tmp_path / "tiny.css").write_text("body{}")
+        static = PrecompressedStaticFiles(directory=str(tmp_path))
+        stats = static.precompress()
+        app = FastAPI()
+        app.mount("/static", static, name="static")
+        return TestClient(app), tmp_path, stats
+
+    def test_variants_written(self, static_client):
+        _, tmp_path, stats = static_client
+        assert (tmp_path / "app.js.gz").exists()
+        assert not (tmp_path / "tiny.css.gz").exists()
+        assert stats["files"] == 1
+        assert stats["compressed_bytes"] < stats["original_bytes"] * 0.3
+
+    def test_serves_gzip_variant(self, static_client):
+        client, _, _ = static_client
+        response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "javascript" in response.headers["content-type"]
+        assert response.text.startswith("console.log")
+
+    def test_identity_fallback(self, static_client):
+        client, _, _ = static_client
+        response = client.get("/static/app.js", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_variant_revalidation(self, static_client):
+        client, _, _ = static_client
+        first = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+        second = client.get(
+            "/static/app.js",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]},
+        )
+        assert second.status_code == 304
+
+    def test_edited_source_recompressed_with_auto_reload(self, tmp_path):
+        source = tmp_path / "app.js"
+        source.write_text("console.log('old');\n" * 200)
+        static = PrecompressedStaticFiles(directory=str(tmp_path), auto_reload=True)
+        static.precompress()
+        app = FastAPI()
+        app.mount("/static", static, name="static")
+        client = TestClient(app)
+
+        source.write_text("console.log('new');\n" * 200)
+        stat = os.stat(source)
+        os.utime(source, (stat.st_atime, stat.st_mtime + 10))
+        response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text.startswith("console.log('new')")
@@ -0,0 +1,65 @@
+# tests/unit/test_dataset_generator.py
+
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, inspect, select
+
+from benchmarks.dataset import DatasetGenerator, bench_usernames, generate
+from app.models.activity import Activity
+from app.models.medication import Medication
+from app.models.medication_dose import MedicationDose
+from app.models.pet import Pet
+from app.models.user import User
+
+ANCHOR = datetime(2025, 6, 1)
+
+
+class TestDatasetGenerator:
+    """Row generation."""
+
+    def test_deterministic_for_seed(self):
+        first = DatasetGenerator(seed=7, anchor=ANCHOR, activities_per_pet=5).chunk(0, 50, 1)
+        second = DatasetGenerator(seed=7, anchor=ANCHOR, activities_per_pet=5).chunk(0, 50, 1)
+        assert first == second
+
+    def test_pets_per_user_is_heavy_tailed(self):
+        generator = DatasetGenerator(seed=1, anchor=ANCHOR)
+        counts = Counter(generator.pets_for_user() for _ in range(5000))
+        assert counts.most_common(1)[0][0] == 1
+        assert max(counts) > 5
+
+    def test_activities_fall_inside_history(self):
+        rows = DatasetGenerator(seed=3, anchor=ANCHOR, years=2, activities_per_pet=10).chunk(0, 20, 1)
+        dates = [row[6] for row in rows["activities"]]
+        assert dates
+        assert all(ANCHOR.replace(year=2023) <= d <= ANCHOR for d in dates)
+
+
+class TestGenerate:
+    """Bulk load into SQLite."""
+
+    def test_loads_rows_and_rebuilds_indexes(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'bench.db'}")
+        summary = generate(engine, 30, DatasetGenerator(seed=5, anchor=ANCHOR, activities_per_pet=4),
+                           chunk_users=10)
+
+        with engine.connect() as conn:
+            assert conn.execute(select(func.count()).select_from(User)).scalar() == 30
+            assert conn.execute(select(func.count()).select_from(Pet)).scalar() == summary.pets
+            assert conn.execute(select(func.count()).select_from(Activity)).scalar() == summary.activities
+            # Explicit pet ids line up with the activities that reference them
+            orphans = conn.execute(
+                select(func.count()).select_from(Activity).where(~Activity.pet_id.in_(select(Pet.id)))
+            ).scalar()
+            assert orphans == 0
+            # Every seeded frequency parses, and active schedules have upcoming doses
+            assert conn.execute(
+                select(func.count()).select_from(Medication).where(Medication.schedule.is_(None))
+            ).scalar() == 0
+            assert conn.execute(select(func.count()).select_from(MedicationDose)).scalar() == summary.medication_doses
+        assert summary.medication_doses > 0
+
+        index_names = {index["name"] for index in inspect(engine).get_indexes("activities")}
+        assert "ix_activities_pet_id_activity_date" in index_names
+        assert len(bench_usernames(engine)) == 30
@@ -0,0 +1,63 @@
+# tests/unit/test_email_templates.py
+
+from datetime import datetime
+
+import pytest
+from jinja2 import UndefinedError
+
+from app.services.email_service import EmailService
+from app.services.email_templates import CSSInliner, EMAIL_TYPES, EmailTemplates, email_templates
+
+
+class TestCSSInliner:
+    """Build-time CSS inlining"""
+
+    def test_specificity_and_existing_style(self):
+        inliner = CSSInliner("""
+            p { color: black; margin: 0 }
+            .note { color: gray }
+            p.note { font-size: 12px }
+            a:hover { color: red }
+        """)
+        html = inliner.inline('<head></head><p class="note" style="margin: 4px">x</p><p>y</p>')
+        assert '<p class="note" style="color: gray; margin: 4px; font-size: 12px">' in html
+        assert '<p style="color: black; margin: 0">y</p>' in html
+        # Pseudo-classes cannot be inlined and stay in the head
+        assert "<style>\na:hover { color: red }\n</style>\n</head>" in html
+
+    def test_jinja_expressions_in_attributes_survive(self):
+        inliner = CSSInliner(".button { color: white }")
+        assert inliner.inline('<a href="{{ link }}" class="button">') == \
+            '<a href="{{ link }}" class="button" style="color: white">'
+
+
+class TestEmailTemplates:
+    """Compiled email types"""
+
+    def test_every_type_has_subject_html_and_text(self):
+        assert set(email_templates.types) == set(EMAIL_TYPES)
+
+    def test_verification_parts(self):
+        subject, html, text = EmailService.create_verification_email("a@example.com", "<Max>", "tok-1")
+        assert subject == "Verify Your PetWell Account"
+        assert "verify-email?token=tok-1" in html and "verify-email?token=tok-1" in text
+        # HTML is escaped and styled inline; the text part is plain
+        assert "&lt;Max&gt;" in html and "<Max>" in text
+        assert 'class="button" style="' in html and "<" not in text.replace("<Max>", "")
+
+    def test_reminder_optional_fields(self):
+        subject, html, text = EmailService.create_reminder_email(
+            "Ann", "Pill", None, datetime(2031, 1, 1, 9, 0), pet_name=None
+        )
+        assert subject == "Reminder: Pill"
+        assert "Pet:" not in html and "Pet:" not in text
+        assert "January 01, 2031 at 09:00 UTC" in text
+
+    def test_missing_variable_raises(self):
+        with pytest.raises(UndefinedError):
+            email_templates.render("verification", user_name="Max")
+
+    def test_loads_from_any_working_directory(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        # Reads styles.css and every template at construction
+        assert set(EmailTemplates().types) == set(EMAIL_TYPES)
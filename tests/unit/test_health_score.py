@@ -0,0 +1,53 @@
+# tests/unit/test_health_score.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.health_score_service import HealthScoreService
+
+AS_OF = datetime(2025, 6, 1, 20, 0)
+
+
+def _walks(days, minutes=30, distance=1.0):
+    return [((AS_OF - timedelta(days=d)).date(), 1, minutes, distance) for d in days]
+
+
+class TestCompute:
+
+    def test_rolling_minutes(self):
+        columns = HealthScoreService.to_columns(_walks(range(40)), AS_OF)
+        result = HealthScoreService.compute(columns, species="dog")
+        assert result["minutes_7d"] == 7 * 30
+        assert result["minutes_30d"] == 30 * 30
+        assert result["rolling_minutes_7d"] == [210.0] * 30
+        assert result["active_days_30d"] == 30
+        assert result["components"]["activity"] == 0.5  # 30 of 60 target minutes
+        assert result["medication_adherence"] is None
+        assert "adherence" not in result["components"]
+
+    def test_distance_trend(self):
+        # One walk per day, getting longer every week
+        rows = [((AS_OF - timedelta(days=d)).date(), 1, 30, 1.0 + (55 - d) // 7) for d in range(56)]
+        result = HealthScoreService.compute(HealthScoreService.to_columns(rows, AS_OF))
+        assert result["weekly_distance"] == [7.0, 14.0, 21.0, 28.0, 35.0, 42.0, 49.0, 56.0]
+        assert result["distance_trend"] == pytest.approx(7.0)
+        assert result["components"]["trend"] > 0.5
+
+    def test_medication_adherence(self):
+        columns = HealthScoreService.to_columns(_walks(range(30)), AS_OF)
+        without = HealthScoreService.compute(columns, species="dog")
+        result = HealthScoreService.compute(columns, species="dog", adherence=0.5)
+        assert result["medication_adherence"] == 0.5
+        assert result["components"]["adherence"] == 0.5
+        assert result["score"] < without["score"]
+
+    def test_no_activities(self):
+        result = HealthScoreService.compute(HealthScoreService.to_columns([], AS_OF), species="cat")
+        assert result["score"] == int(round((0.1 * 0.5) / 0.75 * 100))
+        assert result["minutes_30d"] == 0
+
+    def test_ignores_old_and_future_rows(self):
+        rows = _walks([200, -3])
+        result = HealthScoreService.compute(HealthScoreService.to_columns(rows, AS_OF))
+        assert result["minutes_30d"] == 0
@@ -0,0 +1,88 @@
+# tests/unit/test_load_test.py
+
+import asyncio
+import json
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from benchmarks.fakes import FakeMailbox, FakeOpenAI
+from benchmarks.load_test import Recorder, compare, percentile
+
+
+class TestPercentile:
+    """Latency percentile helper."""
+
+    def test_empty(self):
+        assert percentile([], 95) == 0.0
+
+    def test_interpolates(self):
+        values = [1, 2, 3, 4, 5]
+        assert percentile(values, 50) == 3
+        assert percentile(values, 0) == 1
+        assert percentile(values, 100) == 5
+        assert percentile(values, 75) == 4
+        assert percentile([10, 20], 50) == 15
+
+    def test_unsorted_input(self):
+        assert percentile([5, 1, 3], 50) == 3
+
+
+class TestRecorder:
+    """Per-endpoint summaries."""
+
+    def test_summary_counts_and_total(self):
+        recorder = Recorder()
+        recorder.record("GET /pets", 0.010, True)
+        recorder.record("GET /pets", 0.030, False)
+        recorder.record("POST /activities", 0.020, True)
+        summary = recorder.summary(elapsed=2.0)
+        assert summary["GET /pets"]["count"] == 2
+        assert summary["GET /pets"]["errors"] == 1
+        assert summary["GET /pets"]["rps"] == 1.0
+        assert summary["GET /pets"]["p50_ms"] == 20.0
+        assert summary["TOTAL"]["count"] == 3
+        assert summary["TOTAL"]["errors"] == 1
+
+
+class TestCompare:
+    """Baseline regression detection."""
+
+    BASE = {"GET /pets": {"count": 100, "errors": 0, "rps": 50.0, "p95_ms": 20.0}}
+
+    def test_within_threshold(self):
+        current = {"GET /pets": {"count": 100, "errors": 0, "rps": 48.0, "p95_ms": 22.0}}
+        assert compare(current, self.BASE, threshold=0.15) == []
+
+    def test_latency_regression(self):
+        current = {"GET /pets": {"count": 100, "errors": 0, "rps": 50.0, "p95_ms": 30.0}}
+        assert compare(current, self.BASE) == ["GET /pets: p95 20.0ms -> 30.0ms"]
+
+    def test_throughput_and_error_regression(self):
+        current = {"GET /pets": {"count": 100, "errors": 3, "rps": 20.0, "p95_ms": 20.0}}
+        regressions = compare(current, self.BASE)
+        assert len(regressions) == 2
+
+    def test_missing_endpoint_ignored(self):
+        assert compare({}, self.BASE) == []
+
+
+class TestFakes:
+    """Local OpenAI and SMTP stand-ins."""
+
+    def test_activity_analyzer_returns_json(self):
+        client = FakeOpenAI()
+        response = client.chat.completions.create(messages=[
+            {"role": "system", "content": "You are an expert pet activity analyzer."},
+            {"role": "user", "content": "Walked 2 miles"},
+        ])
+        assert json.loads(response.choices[0].message.content)["activity_type"] == "walk"
+        assert client.calls == 1
+
+    def test_mailbox_extracts_verification_token(self):
+        mailbox = FakeMailbox()
+        message = MIMEMultipart("alternative")
+        message["To"] = "a@example.com"
+        message.attach(MIMEText('<a href="http://x/verify-email?token=abc-123">Verify</a>', "html"))
+        asyncio.run(mailbox.send(message))
+        assert mailbox.verification_token("a@example.com") == "abc-123"
+        assert mailbox.verification_token("b@example.com") is None
@@ -0,0 +1,73 @@
+# tests/unit/test_medication_schedule.py
+
+from datetime import datetime
+
+import pytest
+
+from app.services.medication_schedule import Recurrence, parse_frequency
+
+# A Wednesday
+START = datetime(2031, 1, 15, 9, 0)
+
+
+class TestParseFrequency:
+    """Free-text frequency -> Recurrence"""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("twice daily", {"times": ["08:00", "20:00"]}),
+        ("BID", {"times": ["08:00", "20:00"]}),
+        ("3x a day", {"times": ["08:00", "14:00", "20:00"]}),
+        ("once daily in the evening", {"times": ["18:00"]}),
+        ("daily at 7am and 7:30pm", {"times": ["07:00", "19:30"]}),
+        ("every 8 hours", {"interval_hours": 8.0}),
+        ("q12h", {"interval_hours": 12.0}),
+        ("every 1.5 hours", {"interval_hours": 1.5}),
+        ("6 times daily", {"interval_hours": 4.0}),
+        ("every other day", {"times": ["08:00"], "every_days": 2}),
+        ("weekly", {"times": ["08:00"], "weekdays": [2]}),
+        ("twice a week", {"times": ["08:00"], "weekdays": [0, 3]}),
+        ("Mondays and Thurs", {"times": ["08:00"], "weekdays": [0, 3]}),
+        ("monthly", {"times": ["08:00"], "month_day": 15}),
+        ("as needed", {"as_needed": True}),
+        ("PRN for pain", {"as_needed": True}),
+    ])
+    def test_understood(self, text, expected):
+        assert parse_frequency(text, START).to_dict() == expected
+
+    @pytest.mark.parametrize("text", ["", "1 tablet", "with food", "every 0.01 hours", "q0.5h", "30 times a day"])
+    def test_not_understood(self, text):
+        assert parse_frequency(text, START) is None
+
+    def test_round_trip(self):
+        recurrence = parse_frequency("Mon and Thu at 9pm", START)
+        assert Recurrence.from_dict(recurrence.to_dict()) == recurrence
+
+
+class TestOccurrences:
+    """Dose instances in a window"""
+
+    def test_times_follow_the_users_timezone(self):
+        recurrence = parse_frequency("twice daily")
+        # New York moves to daylight time on March 9, 2031
+        doses = list(recurrence.occurrences(datetime(2031, 3, 8, 12), datetime(2031, 3, 10, 12),
+                                            datetime(2031, 3, 1), "America/New_York"))
+        assert doses == [datetime(2031, 3, 8, 13), datetime(2031, 3, 9, 1),
+                         datetime(2031, 3, 9, 12), datetime(2031, 3, 10, 0)]
+
+    def test_intervals_count_from_the_start_date(self):
+        doses = list(parse_frequency("every 8 hours").occurrences(
+            datetime(2031, 1, 20, 12), datetime(2031, 1, 21, 12), START))
+        assert doses == [datetime(2031, 1, 20, 17), datetime(2031, 1, 21, 1), datetime(2031, 1, 21, 9)]
+
+    def test_every_other_day_and_start_date(self):
+        doses = list(parse_frequency("every other day").occurrences(START, datetime(2031, 1, 22), START))
+        # 08:00 on the start day is already past
+        assert doses == [datetime(2031, 1, 17, 8), datetime(2031, 1, 19, 8), datetime(2031, 1, 21, 8)]
+
+    def test_monthly_clamps_to_month_end(self):
+        recurrence = parse_frequency("monthly", datetime(2031, 1, 31))
+        doses = list(recurrence.occurrences(datetime(2031, 1, 1), datetime(2031, 4, 1), datetime(2031, 1, 1)))
+        assert doses == [datetime(2031, 1, 31, 8), datetime(2031, 2, 28, 8), datetime(2031, 3, 31, 8)]
+
+    def test_as_needed_has_none(self):
+        assert list(parse_frequency("as needed").occurrences(START, datetime(2031, 2, 1), START)) == []
@@ -0,0 +1,116 @@
+# tests/unit/test_metrics.py
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.metrics import MetricsMiddleware
+from app.services.metrics_service import (
+    MetricsRegistry,
+    http_request_duration_seconds,
+    http_requests_total,
+    pool_collector,
+)
+
+
+class TestRegistry:
+    """Prometheus text exposition."""
+
+    def test_counter_render(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs processed.", ("kind",))
+        counter.inc(kind="email")
+        counter.inc(2, kind="email")
+        text = registry.render()
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{kind="email"} 3' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+        text = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_count 3" in text
+        assert "latency_seconds_sum 5.55" in text
+
+    def test_gauge_inc_dec(self):
+        registry = MetricsRegistry()
+        gauge = registry.gauge("in_flight", "In flight.")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        assert gauge.value() == 1
+
+    def test_label_escaping(self):
+        registry = MetricsRegistry()
+        registry.counter("c", "c", ("path",)).inc(path='a"b')
+        assert 'c{path="a\\"b"} 1' in registry.render()
+
+    def test_register_is_idempotent(self):
+        registry = MetricsRegistry()
+        assert registry.counter("x", "x") is registry.counter("x", "x")
+
+    def test_pool_collector(self):
+        from app.database import engine
+        names = [sample[0] for sample in pool_collector(engine)()]
+        assert all(name.startswith("db_pool_") for name in names)
+
+
+class TestMetricsMiddleware:
+    """Per-route labelling."""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/things/{thing_id}")
+        def get_thing(thing_id: int):
+            return {"id": thing_id}
+
+        return TestClient(app)
+
+    def test_labels_use_path_template(self, client):
+        before = http_requests_total.value(method="GET", route="/things/{thing_id}", status="200")
+        client.get("/things/1")
+        client.get("/things/2")
+        after = http_requests_total.value(method="GET", route="/things/{thing_id}", status="200")
+        assert after - before == 2
+        assert http_request_duration_seconds.count(method="GET", route="/things/{thing_id}") >= 2
+
+    def test_unmatched_routes_collapse(self, client):
+        before = http_requests_total.value(method="GET", route="<unmatched>", status="404")
+        client.get("/nope/123")
+        client.get("/other/456")
+        assert http_requests_total.value(method="GET", route="<unmatched>", status="404") - before == 2
+
+
+class TestMetricsEndpoint:
+    """The /metrics route on the real app."""
+
+    def test_exposes_route_metrics(self):
+        from main import app
+        client = TestClient(app)
+        client.get("/health")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'http_requests_total{method="GET",route="/health",status="200"}' in response.text
+        assert "process_resident_memory_bytes" in response.text
+
+    def test_token_required_when_configured(self, monkeypatch):
+        from main import app, settings
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+        client = TestClient(app)
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+    def test_health_timestamp_is_live(self):
+        from main import app
+        body = TestClient(app).get("/health").json()
+        assert body["timestamp"] != "2025-11-30"
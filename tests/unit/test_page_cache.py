@@ -0,0 +1,96 @@
+# tests/unit/test_page_cache.py
+
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.templating import Jinja2Templates
+from fastapi.testclient import TestClient
+
+from app.services.page_cache import PageCache
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    (tmp_path / "page.html").write_text("<html><body>" + "<p>PetWell</p>" * 200 + "</body></html>")
+    return tmp_path
+
+
+def make_client(template_dir, auto_reload=False):
+    templates = Jinja2Templates(directory=str(template_dir))
+    cache = PageCache(templates, auto_reload=auto_reload)
+    app = FastAPI()
+
+    @app.get("/page")
+    async def page(request: Request):
+        return cache.response(request, "page.html")
+
+    return TestClient(app), cache
+
+
+class TestPageCache:
+    """In-memory pre-rendered pages."""
+
+    def test_renders_once(self, template_dir, monkeypatch):
+        client, cache = make_client(template_dir)
+        calls = []
+        original = cache.render
+        monkeypatch.setattr(cache, "render", lambda name: calls.append(name) or original(name))
+
+        for _ in range(3):
+            assert client.get("/page").status_code == 200
+        assert calls == ["page.html"]
+
+    def test_identity_body(self, template_dir):
+        client, _ = make_client(template_dir)
+        response = client.get("/page", headers={"Accept-Encoding": "identity"})
+        assert response.headers["content-type"].startswith("text/html")
+        assert "content-encoding" not in response.headers
+        assert response.text.count("PetWell") == 200
+
+    def test_gzip_variant(self, template_dir):
+        client, _ = make_client(template_dir)
+        response = client.get("/page", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text.count("PetWell") == 200
+
+    def test_if_none_match(self, template_dir):
+        client, _ = make_client(template_dir)
+        etag = client.get("/page", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        response = client.get("/page", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_etag_differs_per_encoding(self, template_dir):
+        client, _ = make_client(template_dir)
+        gzip_etag = client.get("/page", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        response = client.get("/page", headers={"Accept-Encoding": "identity", "If-None-Match": gzip_etag})
+        assert response.status_code == 200
+
+    def test_auto_reload_picks_up_changes(self, template_dir):
+        client, _ = make_client(template_dir, auto_reload=True)
+        assert "Updated" not in client.get("/page").text
+
+        path = template_dir / "page.html"
+        path.write_text("<html><body>Updated</body></html>")
+        os.utime(path, (0, os.stat(path).st_mtime + 10))
+        assert "Updated" in client.get("/page").text
+
+    def test_without_auto_reload_serves_snapshot(self, template_dir):
+        client, _ = make_client(template_dir)
+        client.get("/page")
+        path = template_dir / "page.html"
+        path.write_text("<html><body>Updated</body></html>")
+        os.utime(path, (0, os.stat(path).st_mtime + 10))
+        assert "Updated" not in client.get("/page").text
+
+
+@pytest.mark.parametrize("path", ["/dashboard", "/reports", "/pets-page", "/appointments", "/profile", "/settings", "/login"])
+def test_app_page_routes(path):
+    """Every page route is served from the cache."""
+    from main import app
+
+    response = TestClient(app).get(path)
+    assert response.status_code == 200
+    assert response.headers["etag"]
+    assert "<html" in response.text.lower()
@@ -0,0 +1,95 @@
+# tests/unit/test_rate_limiter.py
+
+import pytest
+
+from app.services.rate_limiter import (
+    InMemoryRateLimitStore, Rate, RateLimitExceeded, RateLimiter, RateLimitResult, RateLimitStore, parse_rate,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestParseRate:
+    """"<count>/<period>" -> Rate"""
+
+    def test_parses_periods(self):
+        assert parse_rate("20/minute") == Rate(20, 20 / 60)
+        assert parse_rate(" 5 / Second ") == Rate(5, 5)
+        assert parse_rate("off") is None and parse_rate("") is None
+
+    @pytest.mark.parametrize("spec", ["20", "20/fortnight", "-1/minute", "minute/20"])
+    def test_rejects_malformed(self, spec):
+        with pytest.raises(ValueError):
+            parse_rate(spec)
+
+
+class TestInMemoryStore:
+    """Token bucket refill and spend"""
+
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        store = InMemoryRateLimitStore(clock=clock)
+        rate = parse_rate("3/minute")
+
+        assert [store.acquire("k", rate).allowed for _ in range(4)] == [True, True, True, False]
+        assert store.acquire("k", rate).retry_after == pytest.approx(20)
+        clock.now += 20
+        assert store.acquire("k", rate).allowed
+        assert not store.acquire("k", rate).allowed
+        # Idle buckets refill only up to capacity
+        clock.now += 3600
+        assert store.acquire("k", rate).remaining == 2
+
+    def test_evicts_least_recently_used(self):
+        store = InMemoryRateLimitStore(max_keys=2, clock=FakeClock())
+        rate = parse_rate("1/hour")
+        for key in ("a", "b", "a", "c"):
+            store.acquire(key, rate)
+        assert len(store) == 2
+        assert not store.acquire("a", rate).allowed  # kept: used more recently than "b"
+        assert store.acquire("b", rate).allowed  # dropped, so it starts full again
+
+    def test_incomplete_store_fails_at_construction(self):
+        class AcquireOnly(RateLimitStore):
+            def acquire(self, key, rate, cost=1.0):
+                return RateLimitResult(True, 0.0)
+
+        with pytest.raises(TypeError):
+            AcquireOnly()
+
+
+class TestRateLimiter:
+    """Per-subject and global rules"""
+
+    def test_user_limit_is_checked_before_global(self):
+        limiter = RateLimiter(InMemoryRateLimitStore(clock=FakeClock()))
+        limiter.configure("ai", {"user": "2/minute", "global": "3/minute"})
+
+        limiter.hit("ai", user="1")
+        limiter.hit("ai", user="1")
+        with pytest.raises(RateLimitExceeded) as exc:
+            limiter.hit("ai", user="1")
+        assert exc.value.scope == "user" and exc.value.retry_after_header == "30"
+
+        # User 1's rejected request did not spend a global token
+        limiter.hit("ai", user="2")
+        with pytest.raises(RateLimitExceeded) as exc:
+            limiter.hit("ai", user="3")
+        assert exc.value.scope == "global"
+
+    def test_disabled_and_unlimited(self):
+        limiter = RateLimiter(InMemoryRateLimitStore(clock=FakeClock()), enabled=False)
+        limiter.configure("login", {"client": "1/hour", "global": "off"})
+        for _ in range(3):
+            limiter.hit("login", client="203.0.113.9")
+        limiter.enabled = True
+        limiter.hit("login", client="203.0.113.9")
+        with pytest.raises(RateLimitExceeded):
+            limiter.hit("login", client="203.0.113.9")
+        limiter.hit("unconfigured", client="203.0.113.9")